@@ -0,0 +1,50 @@
+"""Noyau Morse partagé : tables, chronologie, synthèse, sorties audio et décodage
+
+Les tables et la chronologie sont importées directement ; la synthèse
+(numpy), les sorties audio et le décodeur ne sont chargés qu'au premier accès.
+"""
+
+from .codes import (MORSE_CODE, REVERSE_MORSE, PUNCTUATION, PROSIGNS,
+                    SPECIAL_CHARS, KOCH_ORDER)
+from .quality import QUALITY_PROFILES, DEFAULT_QUALITY
+from .timeline import tokenize, compile_text, compile_code, duration
+
+_LAZY = {
+    'schedule_text': 'schedule',
+    'schedule_code': 'schedule',
+    'last_unit': 'schedule',
+    'MorseAudio': 'synth',
+    'Band': 'band',
+    'PinkNoise': 'noise',
+    'BrownNoise': 'noise',
+    'ImpulseNoise': 'noise',
+    'AudioPlayer': 'player',
+    'open_backend': 'backends',
+    'AdaptiveDecoder': 'decoder',
+    'AudioDecoder': 'decoder',
+    'RenderCache': 'cache',
+    'WordIndex': 'words',
+    'PlaybackWorker': 'worker',
+    'Warmer': 'worker',
+    'Prefetcher': 'worker',
+    'Session': 'seeds',
+    'EventLog': 'events',
+    'read_events': 'events',
+    'ConfusionMatrix': 'confusion',
+    'Progress': 'stats',
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ['MORSE_CODE', 'REVERSE_MORSE', 'PUNCTUATION', 'PROSIGNS', 'SPECIAL_CHARS',
+           'KOCH_ORDER', 'QUALITY_PROFILES', 'DEFAULT_QUALITY', 'tokenize',
+           'compile_text', 'compile_code', 'duration', *_LAZY]
@@ -0,0 +1,339 @@
+"""Sorties audio : pygame, winsound, flux aplay persistant, afplay ou silence
+
+Chaque sortie joue du PCM 16 bits (bytes ou tableau int16) via play(data),
+bloquant jusqu'à la fin de la lecture ou jusqu'à stop(). stop() reste actif
+(les lectures suivantes sont coupées) jusqu'au prochain reset(). Un tampon mono est
+dupliqué si la sortie est stéréo ; un tampon déjà entrelacé (tableau de
+forme (n, canaux)) est transmis tel quel.
+
+Contrôle du flux aplay avec un lecteur factice : python -m cw_core.backends --selftest
+"""
+
+import io
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from array import array
+
+
+def wav_bytes(data, sample_rate, channels=1):
+    """Fichier WAV complet en mémoire"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(data)
+    return buffer.getvalue()
+
+
+def to_channels(data, channels):
+    """Duplique un signal mono sur plusieurs canaux entrelacés"""
+    mono = array('h', bytes(data))
+    out = array('h', bytes(len(mono) * 2 * channels))
+    for c in range(channels):
+        out[c::channels] = mono
+    return out
+
+
+class NullBackend:
+    """Pas de sortie audio : respecte seulement le timing"""
+
+    name = None
+    channels = 1
+    latency = 0.0  # Retard approximatif entre play() et le son (s)
+
+    def __init__(self, sample_rate=44100):
+        self.sample_rate = sample_rate
+        self._stop = threading.Event()
+
+    def duration(self, data):
+        return len(memoryview(data).cast('B')) / (2 * self.channels * self.sample_rate)
+
+    def reset(self):
+        """Réarme la sortie après un stop()"""
+        self._stop.clear()
+
+    def play(self, data):
+        self._stop.wait(self.duration(data))
+
+    def play_segment(self, data):
+        """Segment d'un flux continu (manipulateur) : rend la main un peu avant la fin"""
+        time.sleep(self.duration(data) * 0.9)
+
+    def silence(self, duration):
+        self._stop.wait(duration)
+
+    def drain(self):
+        pass
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        pass
+
+
+class PygameBackend(NullBackend):
+    """Mixer pygame : lecture directe depuis la mémoire"""
+
+    name = "pygame"
+
+    def __init__(self, sample_rate=44100, channels=1, buffer=512):
+        super().__init__(sample_rate)
+        import pygame
+        self.pygame = pygame
+        init = pygame.mixer.get_init()
+        if init and init[0] != sample_rate:
+            # Le mixer suit le profil de qualité ; on garde ses canaux
+            channels = init[2]
+            pygame.mixer.quit()
+            init = None
+        if not init:
+            pygame.mixer.init(frequency=sample_rate, size=-16, channels=channels, buffer=buffer)
+        # Le mixer peut avoir été initialisé ailleurs : on suit sa configuration
+        self.sample_rate, _, self.channels = pygame.mixer.get_init()
+        self.latency = buffer / self.sample_rate
+
+    def _sound(self, data):
+        if self.channels > 1 and memoryview(data).ndim == 1:
+            data = to_channels(data, self.channels)
+        return self.pygame.mixer.Sound(buffer=data)
+
+    def play(self, data):
+        sound = self._sound(data)
+        sound.play()
+        if self._stop.wait(sound.get_length()):
+            sound.stop()  # stop() a pu arriver juste avant sound.play()
+
+    def play_segment(self, data):
+        sound = self._sound(data)
+        sound.play()
+        time.sleep(sound.get_length() * 0.9)  # Légère superposition
+
+    def stop(self):
+        super().stop()
+        try:
+            self.pygame.mixer.stop()
+        except Exception:
+            pass
+
+    def close(self):
+        self.pygame.mixer.quit()
+
+
+class WinsoundBackend(NullBackend):
+    """winsound (Windows) : WAV en mémoire"""
+
+    name = "winsound"
+
+    def __init__(self, sample_rate=44100):
+        super().__init__(sample_rate)
+        import winsound
+        self.winsound = winsound
+
+    def play(self, data):
+        if not self._stop.is_set():
+            self.winsound.PlaySound(wav_bytes(data, self.sample_rate), self.winsound.SND_MEMORY)
+
+    def play_segment(self, data):
+        self.play(data)
+
+    def stop(self):
+        super().stop()
+        self.winsound.PlaySound(None, 0)  # Interrompt la lecture en cours
+
+
+class AfplayBackend(NullBackend):
+    """afplay (macOS) : ne lit que des fichiers"""
+
+    name = "afplay"
+
+    def _write_file(self, data):
+        fd, filepath = tempfile.mkstemp(suffix='.wav')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(wav_bytes(data, self.sample_rate))
+        return filepath
+
+    def play(self, data):
+        filepath = self._write_file(data)
+        try:
+            process = subprocess.Popen(['afplay', filepath], stderr=subprocess.DEVNULL)
+            if self._stop.wait(self.duration(data)):
+                process.terminate()
+            process.wait()
+        finally:
+            os.remove(filepath)
+
+    def play_segment(self, data):
+        filepath = self._write_file(data)
+        subprocess.Popen(['afplay', filepath], stderr=subprocess.DEVNULL)
+        time.sleep(self.duration(data) * 0.9)
+        os.remove(filepath)
+
+
+class PipeBackend(NullBackend):
+    """Lecteur persistant : un seul processus lit du PCM brut sur son stdin"""
+
+    name = "aplay"
+    BLOCK = 0.02       # Taille des écritures (s)
+    MAX_AHEAD = 0.1    # Avance maximale sur l'horloge de lecture (s)
+    latency = 0.05     # --buffer-time d'aplay
+
+    def __init__(self, sample_rate=44100, command=None):
+        super().__init__(sample_rate)
+        # CW_PIPE_PLAYER permet de substituer un autre lecteur (ex: lecteur factice)
+        self.command = command or os.environ.get('CW_PIPE_PLAYER', '').split() or [
+            'aplay', '-q', '-t', 'raw', '-f', 'S16_LE', '-c', '1',
+            '-r', str(sample_rate), '--buffer-time=50000'
+        ]
+        self.process = None
+        self.lock = threading.Lock()
+        self._clock_start = 0.0
+        self._written = 0  # Échantillons écrits depuis le début de l'horloge
+
+    def _ensure_process(self):
+        if self.process is not None and self.process.poll() is None:
+            return True
+        try:
+            self.process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except OSError:
+            self.process = None
+            return False
+        # Petit tampon de pipe : la contre-pression arrive plus tôt
+        try:
+            import fcntl
+            fcntl.fcntl(self.process.stdin.fileno(), 1031, 4096)  # F_SETPIPE_SZ
+        except (ImportError, OSError):
+            pass
+        self._written = 0
+        return True
+
+    def ahead(self):
+        """Durée déjà écrite mais pas encore jouée (s)"""
+        return self._clock_start + self._written / self.sample_rate - time.monotonic()
+
+    def write(self, data, max_ahead=None):
+        """Écrit du PCM mono 16 bits ; le débit est réglé sur la lecture"""
+        max_ahead = self.MAX_AHEAD if max_ahead is None else max_ahead
+        view = memoryview(data).cast('B')
+        with self.lock:
+            if not self._ensure_process():
+                time.sleep(self.duration(view))
+                return
+            if self._written == 0 or self.ahead() < 0:
+                # Flux vide : l'horloge repart maintenant
+                self._clock_start = time.monotonic()
+                self._written = 0
+            block = 2 * int(self.sample_rate * self.BLOCK)
+            try:
+                for start in range(0, len(view), block):
+                    if self._stop.is_set():
+                        break
+                    chunk = view[start:start + block]
+                    self.process.stdin.write(chunk)
+                    self.process.stdin.flush()
+                    self._written += len(chunk) // 2
+                    ahead = self.ahead()
+                    if ahead > max_ahead:
+                        self._stop.wait(ahead - max_ahead)
+            except OSError:
+                self.process = None
+
+    def play(self, data):
+        self.write(data)
+        self.drain()
+
+    def play_segment(self, data):
+        # Avance limitée pour un arrêt réactif
+        self.write(data, max_ahead=self.duration(data) * 0.5)
+
+    def silence(self, duration):
+        # Écrit sans attendre la fin : l'élément suivant enchaîne sans trou dans le flux
+        self.write(bytes(2 * int(self.sample_rate * duration)))
+
+    def drain(self):
+        """Attend que tout ce qui a été écrit soit joué (ou stop())"""
+        ahead = self.ahead()
+        if ahead > 0:
+            self._stop.wait(ahead)
+
+    def close(self):
+        with self.lock:
+            if self.process is not None:
+                try:
+                    self.process.stdin.close()
+                    self.process.wait(timeout=1)
+                except (OSError, subprocess.TimeoutExpired):
+                    self.process.kill()
+                self.process = None
+
+
+def pipe_check(command=('cat',), duration=1.0, cut=0.3):
+    """Contrôle de PipeBackend avec un lecteur factice (CW_PIPE_PLAYER)
+
+    play() doit durer toute la lecture, et rendre la main peu après un
+    stop() venu d'un autre thread. Retourne [(contrôle, durée mesurée, bon), ...].
+    """
+    saved = os.environ.get('CW_PIPE_PLAYER')
+    os.environ['CW_PIPE_PLAYER'] = ' '.join(command)
+    try:
+        backend = PipeBackend(8000)
+    finally:
+        if saved is None:
+            del os.environ['CW_PIPE_PLAYER']
+        else:
+            os.environ['CW_PIPE_PLAYER'] = saved
+    data = bytes(2 * int(backend.sample_rate * duration))
+    results = []
+    try:
+        start = time.monotonic()
+        backend.play(data)
+        elapsed = time.monotonic() - start
+        results.append(("lecture complète", elapsed, duration - 0.01 <= elapsed < duration + 0.2))
+
+        backend.reset()
+        timer = threading.Timer(cut, backend.stop)
+        timer.start()
+        start = time.monotonic()
+        backend.play(data)
+        elapsed = time.monotonic() - start
+        timer.join()
+        results.append(("arrêt", elapsed, cut <= elapsed < cut + 0.1))
+    finally:
+        backend.close()
+    return results
+
+
+def open_backend(sample_rate=44100, channels=1, buffer=512):
+    """Choisit la meilleure sortie disponible"""
+    try:
+        return PygameBackend(sample_rate, channels, buffer)
+    except Exception:
+        pass
+    try:
+        return WinsoundBackend(sample_rate)
+    except ImportError:
+        pass
+    system = platform.system()
+    if system == "Linux":
+        return PipeBackend(sample_rate)
+    if system == "Darwin":
+        return AfplayBackend(sample_rate)
+    return NullBackend(sample_rate)
+
+
+if __name__ == "__main__":
+    import sys
+    if '--selftest' in sys.argv:
+        checks = pipe_check()
+        for label, elapsed, ok in checks:
+            print(f"{'OK ' if ok else 'ERR'} PipeBackend {label:<18} {elapsed:.3f} s")
+        sys.exit(0 if all(ok for _, _, ok in checks) else 1)
@@ -0,0 +1,238 @@
+"""Simulateur de bande : tranche de 3 kHz, filtre de réception CW et CAG
+
+Le récepteur est accordé sur le signal voulu, au centre d'une tranche de
+SLICE Hz où se répartissent le bruit de bande et jusqu'à MAX_STATIONS
+stations durables (qrm.QrmStation). La tranche passe par le filtre de
+réception (RX_FILTERS), centré sur la tonalité du signal voulu : noyau FIR
+appliqué bloc par bloc par FFT et recouvrement-addition. Le signal voulu,
+au centre de la bande passante, n'est pas filtré (le retard du filtre ne
+porte que sur la bande, un bruit continu) ; la CAG règle ensuite le gain
+de l'ensemble. La bande est dosée par rapport au signal voulu : aucune
+station à moins de GUARD Hz, aucune plus forte que la moitié du signal au
+niveau maximal, et un gain de CAG limité pour que le bruit ne remonte pas
+au niveau du signal entre les mots.
+
+Une station dont la dérive reste hors de la bande passante (gain du filtre
+sous STOPBAND) n'est pas synthétisée : seules sa position et ses phases
+avancent. Avec un filtre étroit, la plupart des stations ne coûtent presque
+rien.
+"""
+
+import math
+
+import numpy as np
+
+from .qrm import QrmStation
+
+SLICE = 3000  # Largeur de la tranche simulée (Hz), centrée sur le signal voulu
+GUARD = 150  # Écart minimal entre une station et le signal voulu (Hz)
+MAX_STATIONS = 20
+DEFAULT_STATIONS = 12
+
+# Filtres de réception : largeur de bande passante (Hz)
+RX_FILTERS = {'250 Hz': 250, '500 Hz': 500, '2.4 kHz': 2400}
+DEFAULT_FILTER = 500
+LOW_CUT = 200  # Bord bas de la bande passante au plus près de 0 Hz (filtres larges)
+
+KERNEL = 0.08  # Durée du noyau FIR (s) : transitions d'environ 70 Hz
+STOPBAND = 1e-3  # Gain (-60 dB) sous lequel une station n'est pas synthétisée
+NOISE = 0.6  # Écart-type du bruit sur toute la tranche, au niveau maximal
+
+
+def passband(frequency, width):
+    """Bande passante (bas, haut) en Hz d'un filtre de `width` Hz centré sur `frequency`"""
+    low = max(LOW_CUT, frequency - width / 2)
+    return low, low + width
+
+
+def bandpass(low, high, sample_rate, taps):
+    """Noyau FIR passe-bande (sinus cardinal fenêtré par Blackman), gain 1 au centre"""
+    k = np.arange(taps) - (taps - 1) / 2
+    kernel = ((2 * high / sample_rate) * np.sinc((2 * high / sample_rate) * k)
+              - (2 * low / sample_rate) * np.sinc((2 * low / sample_rate) * k))
+    kernel *= np.blackman(taps)
+    center = np.exp(-2j * np.pi * (low + high) / 2 / sample_rate * np.arange(taps))
+    return kernel / abs(kernel @ center)
+
+
+class OverlapAdd:
+    """Convolution continue par un noyau FIR : FFT par recouvrement-addition
+
+    Les blocs peuvent avoir n'importe quelle longueur : l'entrée est découpée
+    en tranches de `hop` échantillons, la queue de chaque convolution est
+    ajoutée au début de la suivante.
+    """
+
+    def __init__(self, kernel, sample_rate):
+        self.taps = len(kernel)
+        self.sample_rate = sample_rate
+        self.size = 1 << (4 * self.taps - 1).bit_length()  # FFT d'au moins 4 noyaux
+        self.hop = self.size - self.taps + 1
+        self.spectrum = np.fft.rfft(kernel, self.size)
+        self.magnitude = np.abs(self.spectrum)
+        self.tail = np.zeros(self.taps - 1)
+
+    def reset(self):
+        self.tail.fill(0)
+
+    def gain(self, low, high):
+        """Gain maximal du filtre entre `low` et `high` Hz"""
+        scale = self.size / self.sample_rate
+        first = max(0, math.floor(low * scale))
+        last = min(len(self.magnitude) - 1, math.ceil(high * scale))
+        if last < first:
+            return 0.0
+        return float(self.magnitude[first:last + 1].max())
+
+    def process(self, x, out):
+        """Filtre x (suite du flux) dans out, de même longueur"""
+        for start in range(0, len(x), self.hop):
+            chunk = x[start:start + self.hop]
+            m = len(chunk)
+            y = np.fft.irfft(np.fft.rfft(chunk, self.size) * self.spectrum, self.size)
+            y[:self.taps - 1] += self.tail
+            out[start:start + m] = y[:m]
+            self.tail[:] = y[m:m + self.taps - 1]
+        return out
+
+
+class Agc:
+    """Commande automatique de gain : attaque immédiate, relâchement exponentiel
+
+    Le niveau suit la crête de chaque pas de STEP secondes puis décroît avec
+    la constante de temps RELEASE ; le gain ramène ce niveau à TARGET, sans
+    dépasser MAX_GAIN (le bruit remonte dans les silences, comme sur un
+    vrai récepteur).
+    """
+
+    STEP = 0.002
+    RELEASE = 0.3
+    TARGET = 0.7
+    MAX_GAIN = 2.0
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self._steps = np.empty(0)
+        self.reset()
+
+    def reset(self):
+        self.level = 0.0
+        self.gain = self.MAX_GAIN
+
+    def _positions(self, n):
+        if self._steps.size < n:
+            self._steps = np.arange(max(n, self.sample_rate), dtype=np.float64)
+        return self._steps[:n]
+
+    def process(self, wave, scratch):
+        """Applique le gain à wave (float32, en place) ; scratch : tampon de même taille"""
+        n = len(wave)
+        if not n:
+            return wave
+        step = max(1, int(self.STEP * self.sample_rate))
+        starts = np.arange(0, n, step)
+        peaks = np.maximum.reduceat(np.abs(wave, out=scratch), starts).astype(np.float64)
+        # Crête décroissante niveau_k = max_j (crête_j · d^(k-j)) : en log, un maximum cumulé
+        decay = -step / (self.RELEASE * self.sample_rate)
+        k = np.arange(len(peaks))
+        logs = np.log(np.maximum(peaks, 1e-9)) - decay * k
+        np.maximum.accumulate(logs, out=logs)
+        levels = np.exp(np.maximum(logs, math.log(max(self.level, 1e-9)) + decay) + decay * k)
+        gains = np.minimum(self.TARGET / levels, self.MAX_GAIN)
+        # Gain aux frontières des pas : le plus faible des deux pas voisins (pas de dépassement)
+        edges = np.minimum(np.append(self.gain, gains), np.append(gains, gains[-1]))
+        curve = np.interp(self._positions(n), np.append(starts, n), edges)
+        wave *= curve
+        self.level = float(levels[-1])
+        self.gain = float(gains[-1])
+        return wave
+
+
+class Band:
+    """Tranche de bande : stations durables, bruit, filtre de réception et CAG
+
+    rng : random.Random pour les caractéristiques des stations.
+    """
+
+    def __init__(self, rng, sample_rate, stations=MAX_STATIONS):
+        self.sample_rate = sample_rate
+        self.stations = []
+        for _ in range(stations):
+            # Canal du signal voulu dégagé sur ±GUARD Hz (pas de station au battement nul)
+            offset = rng.uniform(GUARD, SLICE / 2) * rng.choice((-1, 1))
+            station = QrmStation(rng, offset, rng.randint(12, 35), sample_rate)
+            # Stations proches et lointaines, jusqu'à la moitié du signal voulu (niveau maximal)
+            station.volume = 10 ** rng.uniform(-1.5, -0.3)
+            self.stations.append(station)
+        self.filter = None
+        self._filter_key = None
+        self.agc = Agc(sample_rate)
+        self._buffers = {}
+        self.primed = False
+
+    def _scratch(self, name, n):
+        buf = self._buffers.get(name)
+        if buf is None or buf.size < n:
+            buf = self._buffers[name] = np.empty(n, dtype=np.float32)
+        return buf[:n]
+
+    def _configure(self, frequency, width):
+        """Filtre de réception centré sur `frequency`, recalculé si le réglage change"""
+        key = (frequency, width)
+        if key != self._filter_key:
+            low, high = passband(frequency, width)
+            taps = int(KERNEL * self.sample_rate) | 1
+            self.filter = OverlapAdd(bandpass(low, high, self.sample_rate, taps), self.sample_rate)
+            self._filter_key = key
+        return self.filter
+
+    def tune(self, rng):
+        """Point d'écoute de chaque station (rng : random.Random)"""
+        for station in self.stations:
+            station.tune(rng)
+
+    def start(self):
+        """Début de transmission : filtre et CAG repartent de zéro"""
+        if self.filter is not None:
+            self.filter.reset()
+        self.agc.reset()
+        self.primed = False
+
+    def render(self, n, frequency, level, width, count, envelope, rng, out):
+        """n échantillons de bande filtrée (float32, dans out)
+
+        frequency : tonalité du signal voulu ; level : niveau de la bande,
+        relatif au signal voulu (qrm × volume) ; width : filtre (Hz) ; count : stations actives ;
+        envelope(n) : enveloppe en cache d'un élément ; rng : numpy
+        Generator de la synthèse (bruit et dérives).
+        """
+        band_filter = self._configure(frequency, width)
+        if not self.primed:
+            # Remplit le filtre : la bande est déjà là au premier échantillon
+            self.primed = True
+            self.render(band_filter.taps, frequency, level, width, count, envelope, rng,
+                        self._scratch('prime', band_filter.taps))
+        mix = self._scratch('mix', n)
+        rng.standard_normal(dtype=np.float32, out=mix)
+        # Écart-type NOISE sur les SLICE Hz de la tranche, quelle que soit la fréquence d'échantillonnage
+        mix *= NOISE * math.sqrt(self.sample_rate / 2 / SLICE)
+        wave = self._scratch('wave', n)
+        keying = self._scratch('keying', n)
+        for station in self.stations[:count]:
+            pitch = frequency + station.offset
+            margin = station.drift_amount + 5 * station.WALK_SIGMA
+            if band_filter.gain(pitch - margin, pitch + margin) < STOPBAND:
+                station.advance(n, frequency)
+                continue
+            station.keying(keying, envelope)
+            if not keying.any():
+                station.skip(n, frequency)
+                continue
+            freq = station.drift(n, rng)
+            freq += pitch
+            station.osc.modulated(freq, out=wave)
+            wave *= keying
+            wave *= station.volume
+            mix += wave
+        mix *= level
+        return band_filter.process(mix, out)
@@ -0,0 +1,306 @@
+"""Mesures de performance du noyau Morse
+
+Usage: python -m cw_core.bench
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from . import events
+from .band import MAX_STATIONS, RX_FILTERS
+from .cache import RenderCache
+from .noise import BrownNoise, ImpulseNoise, PinkNoise
+from .oscillator import Oscillator
+from .quality import QUALITY_PROFILES
+from .synth import MorseAudio
+from .schedule import schedule_text, total_samples
+from .stats import Progress, downsample
+
+TEXT = "CQ CQ DE F4GBY F4GBY K"
+
+
+def measure(func, repeat=20):
+    """Retourne (ms par appel, pic d'allocation en Kio) d'une fonction"""
+    func()  # Préchauffage (caches de formes, tampons)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024
+
+
+def _legacy_stereo(audio, timeline):
+    """Ancien chemin : élément par élément, concaténation, int16 puis duplication stéréo"""
+    audio._start_transmission()
+    parts = []
+    for i in range(len(timeline)):
+        # Copie float64 : les éléments rendus sont des tampons de travail
+        parts.append(np.array(audio._render_block(timeline[i:i + 1]), dtype=np.float64))
+    wave = (np.concatenate(parts) * 32767).astype(np.int16)
+    return np.column_stack((wave, wave))
+
+
+def bench_stereo(audio):
+    """Sortie stéréo : ancien chemin contre écriture directe dans le tampon"""
+    timeline = audio.schedule(TEXT)
+    total = total_samples(timeline)
+    rows = [
+        ("copie + column_stack", lambda: _legacy_stereo(audio, timeline)),
+        ("stéréo entrelacée", lambda: audio.render_timeline(timeline, audio._output(total, 2), 2)),
+        ("mono", lambda: audio.render_timeline(timeline, audio._output(total, 1), 1)),
+    ]
+    print(f"Rendu de {TEXT!r} à {audio.wpm} WPM ({total / audio.sample_rate:.1f} s)")
+    for label, func in rows:
+        ms, kib = measure(func)
+        print(f"  {label:<22} {ms:7.2f} ms  {kib:9.0f} Kio alloués")
+
+
+def bench_oscillator(seconds=10, stations=3):
+    """Mélange de stations qui dérivent : np.sin(np.cumsum(...)) contre table d'onde"""
+    sample_rate = 44100
+    n = sample_rate * seconds
+    rng = np.random.default_rng(1)
+    freqs = [550.0 + 120 * i + np.cumsum(rng.standard_normal(n)) * 0.005
+             for i in range(stations)]
+    mix = np.zeros(n, dtype=np.float32)
+    wave = np.empty(n, dtype=np.float32)
+    oscillators = [Oscillator(sample_rate) for _ in freqs]
+
+    def direct():
+        mix.fill(0)
+        for freq in freqs:
+            np.add(mix, np.sin(np.cumsum(2 * np.pi * freq / sample_rate)), out=mix)
+
+    def table():
+        mix.fill(0)
+        for osc, freq in zip(oscillators, freqs):
+            np.add(mix, osc.modulated(freq, out=wave), out=mix)
+
+    def direct_fixed():
+        np.sin(2 * np.pi * 650 * np.arange(n) / sample_rate)
+
+    def table_fixed():
+        oscillators[0].fixed(n, 650, out=wave)
+
+    print(f"Oscillateurs, {stations} stations modulées, {seconds} s :")
+    for label, func, ref in (("np.sin(np.cumsum)", direct, None), ("table d'onde", table, direct),
+                             ("np.sin fixe (1 station)", direct_fixed, None),
+                             ("table d'onde fixe", table_fixed, direct_fixed)):
+        ms, kib = measure(func, repeat=5)
+        gain = f"  x{measure(ref, repeat=5)[0] / ms:.1f}" if ref else ""
+        print(f"  {label:<24} {ms:7.2f} ms  {kib:9.0f} Kio alloués{gain}")
+
+
+def _legacy_qrn(rng, out):
+    """Ancien QRN : seuil sur un tirage par échantillon, puis moyenne glissante de 10"""
+    n = len(out)
+    raw = rng.standard_normal(n, dtype=np.float32)
+    pops = rng.random(n, dtype=np.float32) > 0.998
+    raw[pops] = rng.choice([-3, 3], size=np.count_nonzero(pops))
+    out[:] = np.convolve(raw, np.ones(10) / 10, 'same')
+
+
+def bench_noise(seconds=10):
+    """Modèles de bruit par blocs de MorseAudio.BLOCK : coût par seconde d'audio à 44.1 kHz"""
+    sample_rate = 44100
+    rng = np.random.default_rng(1)
+    out = np.zeros(MorseAudio.BLOCK, dtype=np.float32)
+    pink, brown, impulses = PinkNoise(sample_rate), BrownNoise(sample_rate), ImpulseNoise(sample_rate)
+    blocks = seconds * sample_rate // len(out)
+    rows = [("blanc (standard_normal)", lambda: rng.standard_normal(dtype=np.float32, out=out)),
+            ("rose (Voss-McCartney)", lambda: pink.generate(len(out), rng, out)),
+            ("brun (intégrateur)", lambda: brown.generate(len(out), rng, out)),
+            ("QRN ancien (seuil)", lambda: _legacy_qrn(rng, out)),
+            ("impulsions de Poisson", lambda: impulses.add(out, rng))]
+    print("Modèles de bruit, ms par seconde d'audio (44.1 kHz) :")
+    for label, func in rows:
+        ms, _ = measure(lambda: [func() for _ in range(blocks)], repeat=3)
+        print(f"  {label:<24} {ms * sample_rate / (blocks * len(out)):7.3f} ms")
+
+
+def bench_schedule(repeat=200):
+    """Compilation texte -> chronologie : à chaque fois contre mémorisée"""
+    text = "CQ CQ DE F4GBY F4GBY PSE <KN>"
+    print(f"Compilation de {text!r} :")
+    for label, func in (("compilée à chaque fois", lambda: schedule_text.__wrapped__(text, 20, 44100)),
+                        ("mémorisée", lambda: schedule_text(text, 20, 44100))):
+        ms, kib = measure(func, repeat)
+        print(f"  {label:<22} {ms * 1000:7.1f} µs  {kib:9.1f} Kio alloués")
+
+
+def bench_cache(repeat=50):
+    """Indicatifs courants : synthèse complète contre signal propre lu dans le cache disque"""
+    calls = ["F5ABC", "DL1XYZ", "K1ABC", "<AR>", "G3XYZ"]
+    print("Cache disque des rendus propres (5 indicatifs) :")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, qrm in (("propre", 0), ("bruit statique 30 %", 0.3)):
+            audio = MorseAudio()
+            audio.qrm = qrm
+            cache = RenderCache(directory)
+            times = []
+            for audio.cache in (None, cache):
+                ms, _ = measure(lambda: [audio.render(call) for call in calls], repeat)
+                times.append(ms)
+            stats = cache.stats()
+            print(f"  {label:<20} {times[0]:6.2f} ms -> {times[1]:6.2f} ms  "
+                  f"(succès {stats['hit_rate']:.0%}, recherche {stats['lookup_ms']:.3f} ms)")
+
+
+QUALITY_CONDITIONS = [("Propre", "Statique", 0, 0), ("Statique+QSB", "Statique", 0.3, 0.5),
+                      ("QRN", "QRN", 0.3, 0), ("Pile-up", "QRM Pile-up", 0.5, 0)]
+
+
+def bench_quality(repeat=3):
+    """CPU consommé par seconde d'audio rendue, pour chaque profil de qualité"""
+    text = "CQ CQ DE F4GBY F4GBY PSE K " * 3
+    print("CPU par seconde d'audio (ms), 20 WPM :")
+    print("  " + " " * 18 + "".join(f"{c[0]:>13}" for c in QUALITY_CONDITIONS))
+    for name in QUALITY_PROFILES:
+        audio = MorseAudio()
+        audio.set_quality(name)
+        audio.wpm = 20
+        cells = []
+        for _, qrm_type, qrm, qsb in QUALITY_CONDITIONS:
+            audio.qrm_type, audio.qrm, audio.qsb = qrm_type, qrm, qsb
+            out = audio.render(text)  # Préchauffage
+            start = time.process_time()
+            for _ in range(repeat):
+                audio.render(text)
+            cpu = (time.process_time() - start) / repeat
+            cells.append(f"{cpu * 1000 / (len(out) / audio.sample_rate):13.3f}")
+        print(f"  {name:<18}" + "".join(cells))
+
+
+def bench_band(seconds=60):
+    """Simulateur de bande, 20 stations : part d'un cœur consommée en temps réel, par filtre"""
+    print(f"Simulateur de bande ({MAX_STATIONS} stations, rendu par blocs), part d'un cœur :")
+    for name in QUALITY_PROFILES:
+        audio = MorseAudio()
+        audio.set_quality(name)
+        audio.wpm, audio.qrm, audio.qrm_type = 20, 0.5, "Bande 3 kHz"
+        audio.band_stations = MAX_STATIONS
+        timeline = audio.schedule("CQ CQ DE F4GBY F4GBY PSE K " * (seconds // 15))
+        cells = []
+        for label, width in RX_FILTERS.items():
+            audio.rx_filter = width
+            audio.render_timeline(timeline)  # Préchauffage (filtre, tampons)
+            start = time.process_time()
+            out = audio.render_timeline(timeline)
+            cpu = time.process_time() - start
+            cells.append(f"{label} {100 * cpu * audio.sample_rate / len(out):5.2f} %")
+        print(f"  {name:<18}" + "  ".join(cells))
+
+
+def bench_events(days=365, items=300):
+    """Journal d'événements : écriture d'une année de sessions, relecture et agrégation"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/events.bin"
+        log = events.EventLog(path, session=1)
+        start = time.perf_counter()
+        for _ in range(days * items):
+            log.record(events.SHOWN, 'koch', 'K')
+            log.record(events.AUDIO_START, 'koch', 'K', latency=0.01)
+            log.record(events.AUDIO_END, 'koch', 'K', latency=0.4)
+            log.record(events.KEY, 'koch', 'K', 'K', latency=0.9)
+            log.record(events.ANSWER, 'koch', 'K', 'K', 1, latency=1.2)
+        log.close()
+        written = time.perf_counter() - start
+        start = time.perf_counter()
+        data = events.read_events(path)
+        answers = data[data['kind'] == events.ANSWER]
+        day = (answers['time'] // 86400).astype(np.int64)
+        day -= day.min()
+        accuracy = np.bincount(day, answers['correct']) / np.maximum(np.bincount(day), 1)
+        latency = float(np.median(answers['latency']))
+        read = time.perf_counter() - start
+        print(f"Journal : {len(data)} événements ({len(data) * data.itemsize / 2**20:.0f} Mio), "
+              f"écriture {len(data) / written / 1000:.0f} k/s, relecture + réussite par jour "
+              f"{read * 1000:.1f} ms ({len(accuracy)} jour(s), latence médiane {latency:.1f} s)")
+        cache = f"{directory}/stats.npz"
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            progress = Progress.open(path, cache)
+            downsample(progress.series('K')[2], 700)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"Statistiques : premier calcul {timings[0]:.1f} ms, "
+              f"ouverture suivante (cumuls en cache) {timings[1]:.1f} ms")
+
+
+LONG_CONDITIONS = [("Statique", 0, 0), ("Statique", 0.3, 0.5), ("QRN", 0.3, 0),
+                   ("QRM 2 Stations", 0.5, 0)]
+
+
+def peak_rss():
+    """Pic de mémoire résidente du processus (Kio)"""
+    try:
+        # VmHWM repart de zéro à l'exec, contrairement à ru_maxrss
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def long_render(qrm_type, qrm, qsb):
+    """Rendu long (~3 min) : débit et pic de RSS (à lancer dans un processus neuf)"""
+    audio = MorseAudio()
+    audio.wpm = 20
+    audio.qrm_type, audio.qrm, audio.qsb = qrm_type, qrm, qsb
+    audio.render("E")
+    base = peak_rss()
+    start = time.perf_counter()
+    out = audio.render("CQ CQ DE F4GBY F4GBY PSE K " * 12)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss()
+    seconds = len(out) / audio.sample_rate
+    print(f"  {qrm_type:<15} {qrm:4.0%} QSB {qsb:4.0%}  {seconds:4.0f} s  "
+          f"{seconds / elapsed:7.0f}x temps réel  RSS +{(peak - base) / 1024:5.1f} Mio "
+          f"(sortie int16 : {out.nbytes / 2**20:.1f} Mio)")
+
+
+def bench_long():
+    """Rendus longs, chacun dans un processus séparé pour un pic de RSS propre"""
+    print("Rendus longs à 20 WPM :")
+    for qrm_type, qrm, qsb in LONG_CONDITIONS:
+        subprocess.run([sys.executable, "-m", "cw_core.bench", "--long",
+                        qrm_type, str(qrm), str(qsb)], check=False)
+
+
+def main():
+    if sys.argv[1:2] == ["--long"]:
+        long_render(sys.argv[2], float(sys.argv[3]), float(sys.argv[4]))
+        return
+    audio = MorseAudio()
+    bench_stereo(audio)
+    audio.qrm, audio.qrm_type = 0.3, "Statique"
+    print("Avec bruit statique 30 % :")
+    bench_stereo(audio)
+    bench_oscillator()
+    bench_noise()
+    bench_schedule()
+    bench_cache()
+    bench_quality()
+    bench_band()
+    bench_events()
+    try:
+        import resource  # noqa: F401 (Unix uniquement)
+    except ImportError:
+        return
+    bench_long()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Cache disque des rendus propres (sans bruit), adressé par contenu
+
+Chaque entrée est un fichier .npy int16 mono nommé d'après une empreinte
+de la chronologie et des réglages qui fixent le signal propre (fréquence,
+volume, attaque, fréquence d'échantillonnage). Les fichiers sont ouverts en
+mémoire projetée (np.load mmap_mode='r') : rien n'est lu avant d'être joué.
+
+La taille totale est bornée ; les entrées les moins récemment utilisées sont
+supprimées en premier (la date de modification sert de date d'accès).
+Plusieurs processus peuvent partager le même répertoire : les écritures se
+font dans un fichier temporaire renommé ensuite.
+"""
+
+import collections
+import hashlib
+import os
+import time
+
+import numpy as np
+
+FORMAT = b'cw_core-clean-1'  # À changer si le rendu propre change
+
+
+def cache_home():
+    """Répertoire de cache de cw_core (XDG_CACHE_HOME sous Unix)"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "cw_core")
+
+
+def default_directory():
+    return os.path.join(cache_home(), "renders")
+
+
+class RenderCache:
+    """Rendus propres sur disque, avec éviction LRU et statistiques d'accès"""
+
+    def __init__(self, directory=None, max_bytes=64 << 20, max_entry=2 << 20):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.max_entry = max_entry  # Les transmissions plus longues ne sont pas gardées
+        self.hits = 0
+        self.misses = 0
+        self.lookup_time = 0.0  # Cumul des recherches (s)
+        os.makedirs(self.directory, exist_ok=True)
+        # nom -> taille, du moins au plus récemment utilisé
+        self.index = collections.OrderedDict()
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npy'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self.index[name] = size
+        self.size = sum(self.index.values())
+
+    @staticmethod
+    def key(timeline, frequency, volume, rise_time, sample_rate):
+        """Empreinte d'un rendu propre"""
+        digest = hashlib.blake2b(FORMAT, digest_size=16)
+        digest.update(np.ascontiguousarray(timeline).tobytes())
+        digest.update(repr((float(frequency), float(volume), float(rise_time),
+                            int(sample_rate))).encode())
+        return digest.hexdigest()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def __contains__(self, key):
+        """Présence d'une entrée, sans compter de succès ni d'échec"""
+        return os.path.exists(self._path(key + '.npy'))
+
+    def get(self, key):
+        """Tableau int16 projeté en mémoire, ou None"""
+        start = time.perf_counter()
+        name = key + '.npy'
+        path = self._path(name)
+        try:
+            data = np.load(path, mmap_mode='r')
+            os.utime(path)
+            size = self.index.pop(name, None)
+            if size is None:
+                # Écrite par un autre processus
+                size = os.path.getsize(path)
+                self.size += size
+            self.index[name] = size
+            self.hits += 1
+        except (OSError, ValueError):
+            # Absente, évincée par un autre processus ou tronquée
+            self.size -= self.index.pop(name, 0)
+            data = None
+            self.misses += 1
+        self.lookup_time += time.perf_counter() - start
+        return data
+
+    def put(self, key, data):
+        """Enregistre un rendu propre int16 mono"""
+        if data.nbytes > self.max_entry:
+            return
+        name = key + '.npy'
+        temp = self._path(f".{name}.{os.getpid()}.tmp")
+        try:
+            with open(temp, 'wb') as f:
+                np.save(f, np.ascontiguousarray(data, dtype=np.int16))
+                size = f.tell()
+            os.replace(temp, self._path(name))
+        except OSError:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return
+        self.size += size - self.index.pop(name, 0)
+        self.index[name] = size
+        self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and len(self.index) > 1:
+            name, size = self.index.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass  # Déjà supprimée, ou encore projetée (Windows)
+
+    def clear(self):
+        while self.index:
+            name, _ = self.index.popitem()
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+        self.size = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Taux de succès, latence moyenne de recherche et occupation"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'lookup_ms': self.lookup_time * 1000 / lookups if lookups else 0.0,
+            'entries': len(self.index),
+            'bytes': self.size,
+        }
@@ -0,0 +1,49 @@
+"""Tables du code Morse partagées par les deux entraîneurs"""
+
+MORSE_CODE = {
+    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
+    'G': '--.', 'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..',
+    'M': '--', 'N': '-.', 'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.',
+    'S': '...', 'T': '-', 'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-',
+    'Y': '-.--', 'Z': '--..', '0': '-----', '1': '.----', '2': '..---',
+    '3': '...--', '4': '....-', '5': '.....', '6': '-....', '7': '--...',
+    '8': '---..', '9': '----.',
+    # Ponctuation
+    '.': '.-.-.-', ',': '--..--', '?': '..--..', '/': '-..-.', '=': '-...-',
+    '+': '.-.-.', '-': '-....-', '@': '.--.-.',
+    # Prosigns radioamateur
+    'AR': '.-.-.', 'SK': '...-.-', 'BT': '-...-', 'KN': '-.--.',
+    'AS': '.-...', 'HH': '........', 'SOS': '...---...'
+}
+
+# Dictionnaire inversé pour décoder (les caractères simples priment sur les prosigns)
+REVERSE_MORSE = {v: k for k, v in MORSE_CODE.items() if len(k) == 1}
+
+PUNCTUATION = ['.', ',', '?', '/', '=', '+', '-', '@']
+PROSIGNS = ['AR', 'SK', 'BT', 'KN', 'AS', 'HH', 'SOS']
+
+# Caractères spéciaux radioamateur (pour le mode dédié)
+SPECIAL_CHARS = {
+    # Ponctuation courante
+    '.': ('Point', '.-.-.-'),
+    ',': ('Virgule', '--..--'),
+    '?': ('Question', '..--..'),
+    '/': ('Barre', '-..-.'),
+    '=': ('Égal/BT', '-...-'),
+    '+': ('Plus/AR', '.-.-.'),
+    '-': ('Tiret', '-....-'),
+    '@': ('Arobase', '.--.-.'),
+    # Prosigns
+    'AR': ('Fin message', '.-.-.'),
+    'SK': ('Fin contact', '...-.-'),
+    'BT': ('Séparation', '-...-'),
+    'KN': ('À vous seul', '-.--.'),
+    'AS': ('Attendez', '.-...'),
+    'HH': ('Erreur', '........'),
+    'SOS': ('Détresse', '...---...'),
+}
+
+KOCH_ORDER = ['K', 'M', 'R', 'S', 'U', 'A', 'P', 'T', 'L', 'O',
+              'W', 'I', '.', 'N', 'J', 'E', 'F', '0', 'Y', 'V',
+              ',', 'G', '5', '/', 'Q', '9', 'Z', 'H', '3', '8',
+              'B', '?', '4', '2', '7', 'C', '1', 'D', '6', 'X']
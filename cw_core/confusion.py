@@ -0,0 +1,176 @@
+"""Matrice de confusion par symbole : ce qui a été envoyé contre ce qui a été saisi
+
+Une ligne par symbole de MORSE_CODE (caractères et prosigns), une colonne par
+symbole plus une colonne MISSED (rien saisi, ou saisie inconnue). Les bonnes
+réponses vont sur la diagonale, ce qui donne aussi le nombre d'envois de
+chaque symbole. Une mise à jour est un simple incrément.
+
+top() et pairs() donnent les confusions les plus fréquentes (H/5, B/6...) ;
+contrast() en tire un jeu de caractères pour un exercice de contraste.
+
+La matrice est enregistrée creuse (.npz : indices et compteurs non nuls,
+avec la liste des symboles pour rester lisible si MORSE_CODE change), et
+peut être reconstruite depuis le journal d'événements (events.read_events).
+"""
+
+import os
+
+import numpy as np
+
+from .codes import MORSE_CODE
+from .events import ANSWER, MODES, since_reset
+
+SYMBOLS = list(MORSE_CODE)
+INDEX = {s: i for i, s in enumerate(SYMBOLS)}
+MISSED = len(SYMBOLS)  # Colonne des réponses vides ou inconnues
+
+KEY = np.dtype([('mode', 'u1'), ('item', 'S12'), ('text', 'S12')])
+
+
+class ConfusionMatrix:
+    """Compteurs (envoyé, saisi) sur tous les symboles Morse"""
+
+    def __init__(self, counts=None):
+        if counts is None:
+            counts = np.zeros((len(SYMBOLS), len(SYMBOLS) + 1), dtype=np.uint32)
+        self.counts = counts
+
+    def record(self, sent, received, count=1):
+        """Compte une réponse `received` au symbole `sent`"""
+        row = INDEX.get(sent)
+        if row is not None:
+            self.counts[row, INDEX.get(received, MISSED)] += count
+
+    def record_answer(self, sent, received, whole=False, count=1):
+        """Compte une réponse à un élément d'exercice
+
+        Un mot est compté lettre par lettre, à sa position dans la saisie ;
+        avec `whole`, l'élément est un seul symbole (prosign 'AR' compris).
+        """
+        if whole or len(sent) == 1:
+            self.record(sent, received, count)
+            return
+        for i, c in enumerate(sent):
+            self.record(c, received[i:i + 1], count)
+
+    def _errors(self):
+        """Confusions entre symboles (sans diagonale ni colonne MISSED)"""
+        errors = self.counts[:, :MISSED].astype(np.int64)
+        np.fill_diagonal(errors, 0)
+        return errors
+
+    @staticmethod
+    def _allowed(chars):
+        mask = np.zeros(len(SYMBOLS), dtype=bool)
+        mask[[INDEX[c] for c in chars if c in INDEX]] = True
+        return mask
+
+    def sent(self, symbol):
+        """Nombre d'envois d'un symbole"""
+        return int(self.counts[INDEX[symbol]].sum())
+
+    def top(self, k=10, chars=None):
+        """Confusions les plus fréquentes : [(envoyé, saisi, nombre, taux), ...]
+
+        Le taux est rapporté aux envois du symbole ; `chars` limite les deux
+        symboles à un ensemble (caractères pratiqués).
+        """
+        errors = self._errors()
+        if chars is not None:
+            allowed = self._allowed(chars)
+            errors[~allowed] = 0
+            errors[:, ~allowed] = 0
+        flat = np.flatnonzero(errors)
+        flat = flat[np.argsort(errors.flat[flat], kind='stable')[::-1][:k]]
+        totals = self.counts.sum(axis=1)
+        result = []
+        for row, col in zip(*np.unravel_index(flat, errors.shape)):
+            count = int(errors[row, col])
+            result.append((SYMBOLS[row], SYMBOLS[col], count, count / int(totals[row])))
+        return result
+
+    def pairs(self, k=5, chars=None):
+        """Paires confondues dans un sens ou dans l'autre : [(a, b, nombre), ...]"""
+        errors = self._errors()
+        errors += errors.T
+        errors = np.triu(errors)
+        if chars is not None:
+            allowed = self._allowed(chars)
+            errors[~allowed] = 0
+            errors[:, ~allowed] = 0
+        flat = np.flatnonzero(errors)
+        flat = flat[np.argsort(errors.flat[flat], kind='stable')[::-1][:k]]
+        return [(SYMBOLS[row], SYMBOLS[col], int(errors[row, col]))
+                for row, col in zip(*np.unravel_index(flat, errors.shape))]
+
+    def partners(self, symbol, k=3):
+        """Symboles les plus souvent confondus avec `symbol`, dans les deux sens"""
+        errors = self._errors()
+        i = INDEX[symbol]
+        both = errors[i] + errors[:, i]
+        order = np.argsort(both, kind='stable')[::-1][:k]
+        return [SYMBOLS[j] for j in order if both[j]]
+
+    def contrast(self, chars, k=3):
+        """Caractères des k paires les plus confondues parmi `chars` (vide si aucune)"""
+        result = []
+        for a, b, _ in self.pairs(k, chars):
+            for c in (a, b):
+                if c not in result:
+                    result.append(c)
+        return result
+
+    def clear(self):
+        self.counts.fill(0)
+
+    def save(self, path):
+        rows, cols = np.nonzero(self.counts)
+        temp = f"{path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(temp, symbols=np.array('\n'.join(SYMBOLS)),
+                     rows=rows.astype(np.uint8), cols=cols.astype(np.uint8),
+                     counts=self.counts[rows, cols])
+            os.replace(temp, path)
+        except OSError:
+            pass
+
+    @classmethod
+    def load(cls, path):
+        """Matrice enregistrée ; None si le fichier est absent ou illisible"""
+        try:
+            with np.load(path) as data:
+                symbols = str(data['symbols']).split('\n')
+                rows, cols, counts = data['rows'], data['cols'], data['counts']
+        except (OSError, KeyError, ValueError):
+            return None
+        matrix = cls()
+        if symbols == SYMBOLS:
+            matrix.counts[rows, cols] = counts
+            return matrix
+        # Table Morse modifiée depuis l'enregistrement : symbole par symbole
+        for row, col, count in zip(rows.tolist(), cols.tolist(), counts.tolist()):
+            received = symbols[col] if col < len(symbols) else None
+            matrix.record(symbols[row], received, count)
+        return matrix
+
+    @classmethod
+    def from_events(cls, events):
+        """Reconstruit la matrice depuis les réponses du journal (Koch et spéciaux)
+
+        Seules comptent les réponses postérieures à la dernière remise à zéro.
+        """
+        matrix = cls()
+        events = since_reset(events)
+        koch, special = MODES.index('koch'), MODES.index('special')
+        answers = events[(events['kind'] == ANSWER)
+                         & ((events['mode'] == koch) | (events['mode'] == special))]
+        # Quelques centaines de réponses distinctes, même sur une année : dédoublonnées
+        # d'un bloc sur des clés opaques (plus rapide qu'un tri de tableau structuré)
+        keys = np.empty(len(answers), dtype=KEY)
+        for name in KEY.names:
+            keys[name] = answers[name]
+        unique, counts = np.unique(keys.view(f'V{KEY.itemsize}'), return_counts=True)
+        for (mode, item, text), count in zip(unique.view(KEY).tolist(), counts.tolist()):
+            matrix.record_answer(item.decode('utf-8', 'ignore'), text.decode('utf-8', 'ignore'),
+                                 whole=mode == special, count=count)
+        return matrix
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+CW DECODER - Décodage du code Morse
+===================================
+AdaptiveDecoder : classe les appuis et silences en suivant la vitesse réelle.
+AudioDecoder    : décode un signal audio (détecteur Goertzel + seuil adaptatif).
+
+Usage: python -m cw_core.decoder [--wpm N] fichier.wav [fréquence_Hz]
+       python -m cw_core.decoder --selftest
+"""
+
+import sys
+import time
+import wave
+from collections import deque
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .codes import REVERSE_MORSE
+
+
+class AdaptiveDecoder:
+    """Décodeur adaptatif : suit la vitesse réelle de l'opérateur
+
+    Le suivi progressif ne rattrape qu'un écart de vitesse modéré. Si les
+    REACQUIRE derniers appuis tombent tous du même côté du seuil alors que
+    leurs durées s'étalent d'au moins SPREAD (points et traits mêlés), les
+    deux centres sont recalculés directement à partir de ces appuis.
+    """
+
+    REACQUIRE = 8  # Appuis examinés pour la réacquisition
+    SPREAD = 2.5  # Rapport des durées extrêmes : points et traits présents
+
+    def __init__(self, wpm=15, alpha=0.2):
+        self.alpha = alpha  # Poids des nouvelles mesures
+        self.recent = deque(maxlen=self.REACQUIRE)
+        self.reset(wpm)
+
+    def reset(self, wpm):
+        dot = 1.2 / wpm
+        # Deux centres pour les appuis (point / trait)
+        self.dit_mark = dot
+        self.dah_mark = dot * 3
+        # Unité des silences (suivie séparément, tolère le Farnsworth)
+        self.space_unit = dot
+        self.recent.clear()
+
+    @property
+    def dot_threshold(self):
+        """Seuil point/trait : milieu entre les deux centres"""
+        return (self.dit_mark + self.dah_mark) / 2
+
+    @property
+    def char_gap(self):
+        """Silence au-delà duquel le caractère est terminé"""
+        return self.space_unit * 2
+
+    @property
+    def word_gap(self):
+        """Silence au-delà duquel le mot est terminé"""
+        return self.space_unit * 5
+
+    @property
+    def wpm(self):
+        """Vitesse estimée à partir de la durée des points"""
+        return 1.2 / self.dit_mark
+
+    def split(self, marks):
+        """Centres recalculés à partir d'appuis mêlés (coupure au milieu des extrêmes)
+
+        Retourne False si les durées sont trop proches pour séparer points et traits.
+        """
+        low, high = min(marks), max(marks)
+        if high < low * self.SPREAD:
+            return False
+        middle = (low + high) / 2
+        dits = [d for d in marks if d < middle]
+        dahs = [d for d in marks if d >= middle]
+        self.dit_mark = sum(dits) / len(dits)
+        self.dah_mark = max(sum(dahs) / len(dahs), self.dit_mark * 2)
+        # L'ancienne unité des silences est aussi fausse que les anciens centres
+        self.space_unit = self.dit_mark
+        self.recent.clear()
+        return True
+
+    def acquire(self, marks, gaps=()):
+        """Centres initiaux tirés des premiers appuis et silences (sans vitesse a priori)"""
+        if self.split(marks):
+            return
+        # Appuis tous semblables : le plus court silence (entre éléments) donne l'unité
+        unit = min(min(marks), min(gaps, default=min(marks)))
+        self.dit_mark = unit
+        self.dah_mark = unit * 3
+        self.space_unit = unit
+        self.recent.clear()
+
+    def add_mark(self, duration):
+        """Classe un appui en point ou trait et met à jour les centres"""
+        recent = self.recent
+        recent.append(duration)
+        threshold = self.dot_threshold
+        if len(recent) == recent.maxlen and (max(recent) < threshold or min(recent) >= threshold):
+            # Tous du même côté du seuil : vitesse hors de portée du suivi
+            self.split(list(recent))
+        a = self.alpha
+        if duration < self.dot_threshold:
+            symbol = '.'
+            self.dit_mark += a * (duration - self.dit_mark)
+            # Le centre non observé suit doucement (trait ≈ 3 points)
+            self.dah_mark += a / 4 * (self.dit_mark * 3 - self.dah_mark)
+        else:
+            symbol = '-'
+            self.dah_mark += a * (duration - self.dah_mark)
+            self.dit_mark += a / 4 * (self.dah_mark / 3 - self.dit_mark)
+        # Garde les deux centres séparés
+        self.dah_mark = max(self.dah_mark, self.dit_mark * 2)
+        # Un silence entre éléments ne dure pas moins qu'un point
+        self.space_unit = max(self.space_unit, self.dit_mark)
+        return symbol
+
+    def add_space(self, duration):
+        """Classe un silence ('' élément, ' ' caractère, '  ' mot)"""
+        a = self.alpha
+        if duration < self.char_gap:
+            self.space_unit += a * (duration - self.space_unit)
+            return ''
+        if duration < self.word_gap:
+            self.space_unit += a * (duration / 3 - self.space_unit)
+            return ' '
+        # Les longues pauses ne renseignent pas sur la vitesse
+        return '  '
+
+
+class AudioDecoder:
+    """Décodeur audio en flux : Goertzel, enveloppe, seuil et timing adaptatifs"""
+
+    DEBOUNCE = 2  # Trames consécutives nécessaires pour changer d'état
+    ACQUIRE = 8  # Appuis mis en attente pour estimer la vitesse (wpm=None)
+
+    def __init__(self, sample_rate, frequency=None, wpm=None, window=0.02, hop=0.005):
+        self.sample_rate = sample_rate
+        self.frequency = frequency
+        # Fenêtre longue (sélectivité ~50 Hz), pas court (résolution temporelle)
+        self.window = max(16, int(sample_rate * window))
+        self.hop = max(1, int(sample_rate * hop))
+        self.hop_time = self.hop / sample_rate
+        self.timing = AdaptiveDecoder(wpm or 15)
+        # Sans vitesse donnée, les premiers appuis et silences sont gardés puis
+        # classés une fois les centres estimés à partir d'eux
+        self._runs = [] if wpm is None else None
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._coeff = None
+        # Suiveurs de crête et de plancher (constantes de temps en secondes)
+        self.peak = None
+        self.floor = None
+        self.peak_decay = np.exp(-self.hop_time / 3.0)
+        self.floor_rise = self.hop_time / 2.0
+        # Machine à états marque/silence
+        self.state = False
+        self.run = 0
+        self.pending = 0
+        self.current = ''
+        self.text = []
+
+    def _detect_frequency(self, samples):
+        """Trouve la tonalité dominante entre 200 et 1500 Hz"""
+        chunk = samples[:self.sample_rate]
+        spectrum = np.abs(np.fft.rfft(chunk * np.hanning(len(chunk))))
+        freqs = np.fft.rfftfreq(len(chunk), 1 / self.sample_rate)
+        band = (freqs >= 200) & (freqs <= 1500)
+        return float(freqs[band][np.argmax(spectrum[band])])
+
+    def _goertzel(self, frames):
+        """Puissance du bin Goertzel pour chaque trame (vectorisé sur les trames)"""
+        n = frames.shape[0]
+        s1 = np.zeros(n, dtype=np.float32)
+        s2 = np.zeros(n, dtype=np.float32)
+        s0 = np.empty(n, dtype=np.float32)
+        coeff = self._coeff
+        for column in np.ascontiguousarray(frames.T):
+            np.multiply(s1, coeff, out=s0)
+            s0 -= s2
+            s0 += column
+            s1, s2, s0 = s0, s1, s2
+        return s1 * s1 + s2 * s2 - coeff * s1 * s2
+
+    def feed(self, samples):
+        """Ajoute des échantillons et retourne le texte nouvellement décodé"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        if self._coeff is None:
+            if self.frequency is None:
+                self.frequency = self._detect_frequency(samples)
+            self._coeff = np.float32(2 * np.cos(2 * np.pi * self.frequency / self.sample_rate))
+
+        data = np.concatenate((self._tail, samples))
+        n_frames = (len(data) - self.window) // self.hop + 1
+        if n_frames <= 0:
+            self._tail = data
+            return ''
+        frames = np.lib.stride_tricks.sliding_window_view(data, self.window)[::self.hop][:n_frames]
+        self._tail = data[n_frames * self.hop:]
+
+        power = np.maximum(self._goertzel(frames), 0)
+        levels = np.sqrt(power) * (2 / self.window)
+        start = len(self.text)
+        self._process(levels.tolist())
+        return ''.join(self.text[start:])
+
+    def _process(self, levels):
+        """Seuil adaptatif avec hystérésis puis segmentation en marques/silences"""
+        if self.peak is None:
+            # Le signal peut commencer dès le premier échantillon
+            self.peak, self.floor = levels[0], 0.0
+        peak, floor = self.peak, self.floor
+        for x in levels:
+            peak = x if x > peak else floor + (peak - floor) * self.peak_decay
+            floor = x if x < floor else floor + (x - floor) * self.floor_rise
+            span = peak - floor
+            if peak < floor * 1.5 + 1e-6:
+                on = False  # Pas de signal distinct du bruit
+            elif self.state:
+                on = x > floor + 0.45 * span
+            else:
+                on = x > floor + 0.55 * span
+
+            if on == self.state:
+                self.run += 1 + self.pending
+                self.pending = 0
+                if not on and self.current and self.run * self.hop_time > self.timing.word_gap:
+                    self._emit_char()
+            else:
+                self.pending += 1
+                if self.pending >= self.DEBOUNCE:
+                    self._end_run()
+                    self.state = on
+                    self.run = self.pending
+                    self.pending = 0
+        self.peak, self.floor = peak, floor
+
+    def _end_run(self):
+        duration = self.run * self.hop_time
+        if self._runs is None:
+            self._classify(self.state, duration)
+        elif self.state or self._runs:
+            # Mise en attente à partir du premier appui
+            self._runs.append((self.state, duration))
+            if self.state and sum(on for on, _ in self._runs) >= self.ACQUIRE:
+                self._acquired()
+
+    def _acquired(self):
+        """Estime les centres sur les appuis en attente puis les classe"""
+        runs, self._runs = self._runs, None
+        marks = [d for on, d in runs if on]
+        if marks:
+            self.timing.acquire(marks, [d for on, d in runs if not on])
+        for on, duration in runs:
+            self._classify(on, duration)
+
+    def _classify(self, on, duration):
+        if on:
+            self.current += self.timing.add_mark(duration)
+        elif self.current or self.text:
+            # Le silence initial ne renseigne pas sur la vitesse
+            gap = self.timing.add_space(duration)
+            if gap:
+                self._emit_char()
+            if gap == '  ' and self.text and self.text[-1] != ' ':
+                self.text.append(' ')
+
+    def _emit_char(self):
+        if self.current:
+            self.text.append(REVERSE_MORSE.get(self.current, '*'))
+            self.current = ''
+
+    def flush(self):
+        """Termine le flux et retourne le texte restant"""
+        start = len(self.text)
+        if self.state:
+            self._end_run()
+            self.state = False
+            self.run = 0
+        if self._runs is not None:
+            self._acquired()
+        self._emit_char()
+        return ''.join(self.text[start:])
+
+
+def decode_wav(path, frequency=None, wpm=None, chunk_seconds=1.0):
+    """Décode un fichier WAV par blocs et retourne (texte, décodeur)
+
+    wpm : vitesse de départ ; None pour l'estimer sur les premiers appuis.
+    """
+    with wave.open(path, 'rb') as wav_file:
+        channels = wav_file.getnchannels()
+        width = wav_file.getsampwidth()
+        if width not in (1, 2):
+            raise ValueError(f"Format WAV non supporté : {width * 8} bits")
+        decoder = AudioDecoder(wav_file.getframerate(), frequency, wpm)
+        chunk = max(1, int(wav_file.getframerate() * chunk_seconds))
+        parts = []
+        while True:
+            raw = wav_file.readframes(chunk)
+            if not raw:
+                break
+            if width == 2:
+                samples = np.frombuffer(raw, dtype='<i2').astype(np.float32)
+            else:
+                samples = np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128
+            if channels > 1:
+                samples = samples.reshape(-1, channels).mean(axis=1)
+            parts.append(decoder.feed(samples))
+        parts.append(decoder.flush())
+    return ''.join(parts).strip(), decoder
+
+
+def roundtrip_check(audio=None, texts=("CQ CQ DE F4GBY K", "PARIS 73", "5NN TU"),
+                    conditions=(("Statique", 0), ("Statique", 0.3), ("Bruit rose", 0.3),
+                                ("Bruit brun", 0.3), ("QRN", 0.3), ("QRM 2 Stations", 0.5),
+                                ("Bande 3 kHz", 0.5)),
+                    speeds=(5, 25, 35)):
+    """Décode la sortie de MorseAudio.render (contrôle de timing et de qualité)
+
+    Le décodeur ne reçoit pas la vitesse : il l'estime lui-même. Chaque
+    condition est rendue à la vitesse de `audio`, puis chaque vitesse de
+    `speeds` sans perturbation.
+    """
+    if audio is None:
+        from .synth import MorseAudio
+        audio = MorseAudio()
+    cases = [(qrm_type, level, None) for qrm_type, level in conditions]
+    cases += [("Statique", 0, wpm) for wpm in speeds]
+    results = []
+    saved = audio.qrm_type, audio.qrm, audio.wpm
+    try:
+        for qrm_type, level, wpm in cases:
+            audio.qrm_type, audio.qrm = qrm_type, level
+            audio.wpm = wpm or saved[2]
+            condition = f"{qrm_type} {level:.0%}" + (f" {wpm} WPM" if wpm else "")
+            for text in texts:
+                samples = audio.render(text)
+                start = time.perf_counter()
+                decoder = AudioDecoder(audio.sample_rate, audio.frequency)
+                decoded = (decoder.feed(samples) + decoder.flush()).strip()
+                elapsed = time.perf_counter() - start
+                results.append({
+                    'text': text, 'decoded': decoded,
+                    'condition': condition,
+                    'ok': decoded == text.upper(),
+                    'wpm': decoder.timing.wpm,
+                    'realtime': len(samples) / audio.sample_rate / max(elapsed, 1e-9),
+                })
+    finally:
+        audio.qrm_type, audio.qrm, audio.wpm = saved
+    return results
+
+
+def selftest(audio=None):
+    """Affiche le contrôle aller-retour et retourne True si tout est décodé"""
+    results = roundtrip_check(audio)
+    for r in results:
+        print(f"{'OK ' if r['ok'] else 'ERR'} {r['condition']:<20} {r['text']!r} -> {r['decoded']!r} "
+              f"({r['wpm']:.1f} WPM, {r['realtime']:.0f}x)")
+    return all(r['ok'] for r in results)
+
+
+if __name__ == "__main__":
+    if '--selftest' in sys.argv:
+        sys.exit(0 if selftest() else 1)
+    args = sys.argv[1:]
+    wpm = None
+    if '--wpm' in args:
+        index = args.index('--wpm')
+        wpm = float(args[index + 1])
+        del args[index:index + 2]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    freq = float(args[1]) if len(args) > 1 else None
+    start = time.perf_counter()
+    text, decoder = decode_wav(args[0], freq, wpm)
+    elapsed = time.perf_counter() - start
+    with wave.open(args[0], 'rb') as wav_file:
+        duration = wav_file.getnframes() / wav_file.getframerate()
+    print(text)
+    print(f"[{decoder.frequency:.0f} Hz, ~{decoder.timing.wpm:.0f} WPM, "
+          f"{duration / max(elapsed, 1e-9):.0f}x temps réel]")
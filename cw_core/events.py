@@ -0,0 +1,160 @@
+"""Journal binaire des sessions : enregistrements de taille fixe, ajout seul
+
+Chaque événement d'exercice (élément affiché, début et fin d'émission,
+frappe, réponse) est un enregistrement EVENT de 48 octets, écrit à la suite
+dans un fichier tamponné. Une remise à zéro de la progression ajoute un
+événement RESET : les événements antérieurs restent dans le journal mais
+ne comptent plus (since_reset). La relecture projette le fichier en mémoire
+(np.memmap) : une année de sessions se filtre et s'agrège avec numpy, sans
+rien analyser ligne à ligne.
+
+Le fichier commence par un en-tête de HEADER_SIZE octets (format et taille
+d'enregistrement). Un enregistrement incomplet en fin de fichier (arrêt
+brutal) est ignoré à la lecture et tronqué à la réouverture. Un journal du
+format 1 (sans vitesse d'émission) est converti à la lecture et migré à la
+réouverture ; un journal d'un format inconnu est renommé et un nouveau
+journal commence.
+"""
+
+import logging
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+MAGIC = b'CWEVLOG2'
+HEADER = struct.Struct('<8sI4x')
+HEADER_SIZE = HEADER.size
+
+# Types d'événements
+SHOWN, AUDIO_START, AUDIO_END, AUDIO_CUT, KEY, ANSWER, RESET = range(7)
+KINDS = ('affiché', 'début émission', 'fin émission', 'émission coupée', 'frappe', 'réponse',
+         'remise à zéro')
+
+MODES = ('koch', 'special', 'call', 'contest')
+
+# time : horodatage (s depuis l'époque) ; session : graine de session (seeds.Session) ;
+# latency : secondes depuis l'affichage de l'élément ; wpm : vitesse d'émission ;
+# correct : -1 sans objet, 0 ou 1 ;
+# item : élément attendu ; text : réponse saisie ou touche frappée (UTF-8 tronqué)
+EVENT = np.dtype([('time', '<f8'), ('session', '<u8'), ('latency', '<f4'), ('mode', 'u1'),
+                  ('kind', 'u1'), ('correct', 'i1'), ('wpm', 'u1'), ('item', 'S12'),
+                  ('text', 'S12')])
+_RECORD = struct.Struct('<dQfBBbB12s12s')
+assert _RECORD.size == EVENT.itemsize
+
+# Format 1 : mêmes champs sans wpm
+EVENT_V1 = np.dtype([(name, EVENT.fields[name][0]) for name in EVENT.names if name != 'wpm'])
+
+
+def _header():
+    return HEADER.pack(MAGIC, EVENT.itemsize)
+
+
+_FORMATS = {_header(): EVENT, HEADER.pack(b'CWEVLOG1', EVENT_V1.itemsize): EVENT_V1}
+
+
+def _format(data):
+    """Type d'enregistrement désigné par un en-tête (ValueError si inconnu)"""
+    dtype = _FORMATS.get(data)
+    if dtype is None:
+        raise ValueError("Format de journal d'événements inconnu")
+    return dtype
+
+
+def _upgrade(records):
+    """Enregistrements du format 1 au format courant (wpm = 0 : vitesse inconnue)"""
+    events = np.zeros(len(records), dtype=EVENT)
+    for name in EVENT_V1.names:
+        events[name] = records[name]
+    return events
+
+
+class EventLog:
+    """Écriture tamponnée, en ajout seul, des événements d'une session"""
+
+    def __init__(self, path, session=0, buffering=1 << 16):
+        self.path = path
+        self.session = session
+        self.lock = threading.Lock()  # Événements d'émission envoyés par le thread de lecture
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        try:
+            self._repair()
+        except ValueError:
+            # Format inconnu : le fichier est gardé à part, l'enregistrement continue
+            aside = f"{path}.{int(time.time())}.old"
+            os.replace(path, aside)
+            log.warning("Journal d'événements de format inconnu renommé en %s", aside)
+        self.file = open(path, 'ab', buffering=buffering)
+        if self.file.tell() == 0:
+            self.file.write(_header())
+
+    def _repair(self):
+        """Vérifie l'en-tête, retire un enregistrement incomplet en fin de fichier
+        et migre un journal du format 1"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if not size:
+            return
+        with open(self.path, 'rb') as f:
+            dtype = _format(f.read(HEADER_SIZE))
+        extra = (size - HEADER_SIZE) % dtype.itemsize
+        if extra:
+            os.truncate(self.path, size - extra)
+        if dtype != EVENT:
+            events = read_events(self.path)
+            temp = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp, 'wb') as f:
+                f.write(_header())
+                f.write(events.tobytes())
+            os.replace(temp, self.path)
+            log.info("Journal d'événements migré au format courant (%d événements)", len(events))
+
+    def record(self, kind, mode, item='', text='', correct=-1, latency=0.0, wpm=0):
+        """Ajoute un événement (mode : nom de MODES)"""
+        data = _RECORD.pack(time.time(), self.session, latency, MODES.index(mode), kind,
+                            int(correct), min(int(wpm), 255), item.encode('utf-8')[:12],
+                            text.encode('utf-8')[:12])
+        with self.lock:
+            self.file.write(data)
+
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def read_events(path):
+    """Événements du journal en tableau EVENT projeté en mémoire (lecture seule)
+
+    Un journal du format 1 est converti en mémoire (copie).
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+    except OSError:
+        return np.empty(0, dtype=EVENT)
+    if not size:
+        return np.empty(0, dtype=EVENT)
+    dtype = _format(header)
+    count = (size - HEADER_SIZE) // dtype.itemsize
+    if not count:
+        return np.empty(0, dtype=EVENT)
+    records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
+    return records if dtype == EVENT else _upgrade(records)
+
+
+def since_reset(events):
+    """Événements postérieurs à la dernière remise à zéro (tous s'il n'y en a pas)"""
+    resets = np.flatnonzero(events['kind'] == RESET)
+    return events[resets[-1] + 1:] if len(resets) else events
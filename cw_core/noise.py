@@ -0,0 +1,161 @@
+"""Modèles de bruit en continu : bruit rose, bruit brun et QRN impulsionnel
+
+Chaque modèle garde son état d'un bloc à l'autre (le bruit continue sans
+raccord) et tire ses valeurs du numpy Generator de la synthèse : à graine
+identique, bruit identique.
+
+- PinkNoise : algorithme de Voss-McCartney. La rangée k (valeur uniforme)
+  est redessinée tous les 2^k échantillons ; les rangées sont cumulées de
+  la plus lente à la plus rapide, chacune à sa propre cadence, soit
+  environ 2 tirages uniformes et 2 opérations par échantillon quel que
+  soit le nombre de rangées.
+- BrownNoise : intégrateur à fuite (passe-bas du premier ordre d'un bruit
+  blanc), calculé sans boucle par forme close.
+- ImpulseNoise : craquements atmosphériques tirés en liste creuse
+  d'événements (processus de Poisson, amplitudes à queue lourde). Le coût
+  est proportionnel au nombre d'impulsions, pas au nombre d'échantillons.
+"""
+
+import math
+
+import numpy as np
+
+PINK_LOW = 20  # Le bruit rose descend jusqu'à ~PINK_LOW Hz
+BROWN_CORNER = 50  # Fréquence de coupure de l'intégrateur à fuite (Hz)
+
+
+def _halve(values):
+    """Chaque valeur répétée deux fois (période divisée par deux)"""
+    pairs = np.empty((len(values), 2), dtype=values.dtype)
+    pairs[:] = values[:, None]
+    return pairs.ravel()
+
+
+class PinkNoise:
+    """Bruit rose (-3 dB par octave), écart-type 1"""
+
+    def __init__(self, sample_rate):
+        self.rows = max(1, math.ceil(math.log2(sample_rate / PINK_LOW)))
+        self.reset()
+
+    def reset(self):
+        self.count = 0  # Échantillons déjà produits
+        self.values = np.zeros(self.rows, dtype=np.float32)  # Valeur courante de chaque rangée
+
+    def generate(self, n, rng, out):
+        """n échantillons dans out (float32)"""
+        if not n:
+            return out
+        first, last = self.count, self.count + n - 1
+        # Somme des rangées lentes, de la plus lente à la plus rapide : à la rangée k,
+        # une valeur par période de 2^k échantillons, d'indices first >> k à last >> k
+        lo = first >> self.rows
+        total = np.zeros((last >> self.rows) - lo + 1, dtype=np.float32)
+        for k in range(self.rows - 1, 0, -1):
+            start, stop = first >> k, last >> k
+            # Chaque valeur de la rangée k + 1 couvre deux périodes de la rangée k
+            total = _halve(total)[start - 2 * lo:stop - 2 * lo + 1]
+            row = rng.random(stop - start + 1, dtype=np.float32)
+            if self.count and (first - 1) >> k == start:
+                row[0] = self.values[k]  # Période entamée au bloc précédent
+            self.values[k] = row[-1]
+            total += row
+            lo = start
+        # Rangée 0 : redessinée à chaque échantillon (composante blanche)
+        pairs = np.empty((len(total), 2), dtype=np.float32)
+        rng.random(dtype=np.float32, out=pairs)
+        pairs += total[:, None]
+        # Somme de `rows` valeurs uniformes sur [0, 1) : centrée, réduite
+        np.subtract(pairs.ravel()[first - 2 * lo:last - 2 * lo + 1], self.rows / 2, out=out)
+        out *= math.sqrt(12 / self.rows)
+        self.count += n
+        return out
+
+
+class BrownNoise:
+    """Bruit brun (-6 dB par octave au-dessus de BROWN_CORNER), écart-type 1"""
+
+    def __init__(self, sample_rate):
+        self.decay = math.exp(-2 * math.pi * BROWN_CORNER / sample_rate)
+        # Forme close par tranches : a^-k reste loin du dépassement de capacité
+        self.chunk = int(200 / -math.log(self.decay))
+        self._powers = None
+        self.reset()
+
+    def reset(self):
+        self.state = None
+
+    def _weights(self, m):
+        """(a^k, a^-k · pas) pour k = 1..m, calculés une fois pour toute la tranche"""
+        if self._powers is None:
+            self._powers = self.decay ** np.arange(1, self.chunk + 1)
+            # Innovations uniformes centrées, réduites pour un écart-type stationnaire de 1
+            step = math.sqrt(12 * (1 - self.decay ** 2))
+            self._inverse = step / self._powers
+        return self._powers[:m], self._inverse[:m]
+
+    def generate(self, n, rng, out):
+        """n échantillons dans out (float32)"""
+        if self.state is None:
+            self.state = float(rng.standard_normal())
+        for start in range(0, n, self.chunk):
+            m = min(self.chunk, n - start)
+            powers, inverse = self._weights(m)
+            # y_k = a^k (y_0 + somme des a^-j e_j) : intégrateur à fuite, sans boucle
+            values = rng.random(m)
+            values -= 0.5
+            values *= inverse
+            np.cumsum(values, out=values)
+            values += self.state
+            values *= powers
+            out[start:start + m] = values
+            self.state = float(values[-1])
+        return out
+
+
+class ImpulseNoise:
+    """Craquements : impulsions à décroissance exponentielle, instants de Poisson
+
+    `rate` : impulsions par seconde en moyenne. Les amplitudes suivent une loi
+    de Pareto (beaucoup de petits craquements, quelques coups forts), de signe
+    aléatoire ; la fin d'une impulsion débordant du bloc est gardée pour le
+    suivant.
+    """
+
+    DECAY = 0.0004  # Constante de temps d'une impulsion (s)
+    SHAPE = 1.5  # Indice de la loi de Pareto des amplitudes
+    PEAK = 8.0  # Amplitude maximale (en amplitudes minimales)
+
+    def __init__(self, sample_rate, rate=60):
+        self.sample_rate = sample_rate
+        self.rate = rate
+        length = max(1, int(5 * self.DECAY * sample_rate))
+        self.kernel = np.exp(-np.arange(length) / (self.DECAY * sample_rate)).astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        self.carry = np.zeros(len(self.kernel) - 1, dtype=np.float32)
+
+    def add(self, out, rng, level=1.0):
+        """Ajoute à out les impulsions de la suite du flux (len(out) échantillons)"""
+        n = len(out)
+        # Fin des impulsions du bloc précédent
+        spill = self.carry
+        head = min(n, len(spill))
+        out[:head] += spill[:head]
+        carry = np.zeros_like(spill)
+        carry[:len(spill) - head] = spill[head:]
+
+        count = rng.poisson(self.rate * n / self.sample_rate)
+        if count:
+            positions = rng.integers(0, n, count)
+            amplitudes = np.minimum(rng.pareto(self.SHAPE, count) + 1, self.PEAK)
+            amplitudes *= rng.choice((-level, level), count)
+            # Une ligne par impulsion : indices et valeurs de sa forme
+            index = positions[:, None] + np.arange(len(self.kernel))
+            values = (amplitudes[:, None] * self.kernel).astype(np.float32)
+            inside = index < n
+            np.add.at(out, index[inside], values[inside])
+            np.add.at(carry, index[~inside] - n, values[~inside])
+        self.carry = carry
+        return out
@@ -0,0 +1,69 @@
+"""Oscillateur à table d'onde avec accumulateur de phase
+
+La phase est conservée d'un appel à l'autre : des éléments rendus
+successivement forment une seule porteuse continue, sans saut de phase.
+"""
+
+import numpy as np
+
+TABLE_BITS = 16
+TABLE_SIZE = 1 << TABLE_BITS
+
+# Une période de sinus en float32 (256 Kio, partagée par tous les oscillateurs)
+SINE_TABLE = np.sin(2 * np.pi * np.arange(TABLE_SIZE) / TABLE_SIZE).astype(np.float32)
+
+
+class Oscillator:
+    """Sinusoïde à fréquence fixe ou modulée échantillon par échantillon"""
+
+    def __init__(self, sample_rate, phase=0.0):
+        self.sample_rate = sample_rate
+        self.phase = phase % 1.0  # Fraction de période
+        self._acc = np.empty(0)
+        self._index = np.empty(0, dtype=np.intp)
+        self._steps = np.empty(0)
+
+    def _buffers(self, n):
+        if self._acc.size < n:
+            self._acc = np.empty(n)
+            self._index = np.empty(n, dtype=np.intp)
+        return self._acc[:n], self._index[:n]
+
+    def _lookup(self, acc, index, out):
+        """acc (position dans la table, arrondie par +0.5) -> échantillons"""
+        np.copyto(index, acc, casting='unsafe')
+        np.bitwise_and(index, TABLE_SIZE - 1, out=index)
+        return np.take(SINE_TABLE, index, out=out, mode='clip')  # 'raise' copierait out
+
+    def skip(self, n, frequency):
+        """Avance la phase de n échantillons sans rien produire"""
+        self.phase = (self.phase + n * frequency / self.sample_rate) % 1.0
+
+    def fixed(self, n, frequency, out=None):
+        """n échantillons à fréquence constante (float32)"""
+        if out is None:
+            out = np.empty(n, dtype=np.float32)
+        if self._steps.size < n:
+            self._steps = np.arange(max(n, self.sample_rate), dtype=np.float64)
+        acc, index = self._buffers(n)
+        np.multiply(self._steps[:n], frequency * TABLE_SIZE / self.sample_rate, out=acc)
+        acc += self.phase * TABLE_SIZE + 0.5
+        self.skip(n, frequency)
+        return self._lookup(acc, index, out)
+
+    def modulated(self, frequency, out=None):
+        """Un échantillon par fréquence instantanée de `frequency` (Hz, float32)"""
+        n = len(frequency)
+        if out is None:
+            out = np.empty(n, dtype=np.float32)
+        if n == 0:
+            return out
+        acc, index = self._buffers(n)
+        # Somme cumulée exclusive : le premier échantillon est à la phase courante
+        acc[0] = 0
+        np.cumsum(frequency[:-1], out=acc[1:])
+        acc *= TABLE_SIZE / self.sample_rate
+        acc += self.phase * TABLE_SIZE + 0.5
+        end = (acc[-1] - 0.5) / TABLE_SIZE + frequency[-1] / self.sample_rate
+        self.phase = end % 1.0
+        return self._lookup(acc, index, out)
@@ -0,0 +1,168 @@
+"""Lecteur Morse caractère par caractère (fonctionne aussi sans numpy)"""
+
+import math
+import sys
+import threading
+from array import array
+from fractions import Fraction
+
+from .backends import open_backend
+from .codes import MORSE_CODE
+from .timeline import compile_text
+
+try:
+    import numpy as np
+    from .synth import shaped_tone
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class AudioPlayer:
+    """Générateur audio"""
+
+    MAX_PERIOD = 4410  # Cycle précalculé le plus long (0,1 s à 44,1 kHz)
+
+    def __init__(self, frequency=600, wpm=15, backend=None):
+        self.frequency = frequency
+        self.wpm = wpm
+        self.sample_rate = 44100
+        self.is_playing = False
+        self.backend = backend or open_backend(self.sample_rate, channels=1)
+        self._sine_tables = {}
+        self._edge_cache = {}
+        self._char_cache = {}
+
+    def set_wpm(self, wpm):
+        if wpm != self.wpm:
+            self._char_cache.clear()
+        self.wpm = wpm
+
+    def set_frequency(self, freq):
+        if freq != self.frequency:
+            self._char_cache.clear()
+        self.frequency = freq
+
+    def generate_wav_data(self, duration):
+        num_samples = int(self.sample_rate * duration)
+        if NUMPY_AVAILABLE:
+            tone = shaped_tone(num_samples, self.frequency, self.sample_rate, 0.008)
+            return (tone * 0.5 * 32767).astype(np.int16).tobytes()
+        else:
+            pcm, _ = self._sine_table(self.frequency)
+            head, tail = self._edges(self.frequency, num_samples)
+
+            # Corps du signal : simple répétition du cycle précalculé
+            data = pcm * (num_samples // len(pcm) + 1)
+            del data[num_samples:]
+            # Attaque et relâchement précalculés
+            data[:len(head)] = head
+            data[num_samples - len(tail):] = tail
+            return self._to_bytes(data)
+
+    def generate_raw_tone(self, duration, frequency):
+        """Tonalité continue sans enveloppe (segments du manipulateur)"""
+        num_samples = int(self.sample_rate * duration)
+        pcm, _ = self._sine_table(frequency)
+        data = pcm * (num_samples // len(pcm) + 1)
+        del data[num_samples:]
+        return self._to_bytes(data)
+
+    def generate_segment(self, duration, frequency):
+        """Segment du manipulateur, avec fondu si numpy est disponible"""
+        if NUMPY_AVAILABLE:
+            tone = shaped_tone(int(self.sample_rate * duration), frequency, self.sample_rate, 0.005)
+            return (tone * 0.5 * 32767).astype(np.int16).tobytes()
+        return self.generate_raw_tone(duration, frequency)
+
+    def _sine_table(self, frequency):
+        """Cycle complet de la sinusoïde échantillonnée (mis en cache)"""
+        key = (frequency, self.sample_rate)
+        if key not in self._sine_tables:
+            # Le signal échantillonné se répète tous les `period` échantillons. La
+            # fréquence est arrondie à la plus proche dont la période ne dépasse pas
+            # MAX_PERIOD : écart inférieur à sample_rate / (period × MAX_PERIOD) Hz,
+            # quelques millihertz (sinon 612.3 Hz demanderait 147000 échantillons)
+            ratio = (Fraction(frequency) / self.sample_rate).limit_denominator(self.MAX_PERIOD)
+            period, cycles = ratio.denominator, ratio.numerator
+            sines = array('d', [
+                math.sin(2 * math.pi * (i * cycles % period) / period) for i in range(period)
+            ])
+            pcm = array('h', [int(16383.5 * s) for s in sines])
+            self._sine_tables[key] = (pcm, sines)
+        return self._sine_tables[key]
+
+    def _edges(self, frequency, num_samples):
+        """Attaque et relâchement d'une tonalité (mis en cache par durée)"""
+        key = (frequency, self.sample_rate, num_samples)
+        if key not in self._edge_cache:
+            _, sines = self._sine_table(frequency)
+            period = len(sines)
+            attack = int(0.008 * self.sample_rate)
+            release = int(0.008 * self.sample_rate)
+            end = min(attack, num_samples)
+            head = array('h', [
+                int(16383.5 * (i / attack) * sines[i % period]) for i in range(end)
+            ])
+            start = max(num_samples - release + 1, end)
+            tail = array('h', [
+                int(16383.5 * ((num_samples - i) / release) * sines[i % period])
+                for i in range(start, num_samples)
+            ])
+            self._edge_cache[key] = (head, tail)
+        return self._edge_cache[key]
+
+    def _to_bytes(self, data):
+        """Conversion en bloc vers du PCM 16 bits little-endian"""
+        if sys.byteorder == 'big':
+            data.byteswap()
+        return data.tobytes()
+
+    def render_char(self, char):
+        """PCM d'un caractère complet (éléments et espaces internes), mis en cache"""
+        key = (char, self.wpm, self.frequency, self.sample_rate)
+        data = self._char_cache.get(key)
+        if data is None:
+            # Chronologie du caractère sans l'espace final
+            parts = [self.generate_wav_data(dur) if tone
+                     else bytes(2 * int(self.sample_rate * dur))
+                     for tone, dur in compile_text(char, self.wpm)[:-1]]
+            data = b''.join(parts)
+            self._char_cache[key] = data
+        return data
+
+    def play_buffer(self, data):
+        """Joue un tampon PCM mono 16 bits et attend la fin"""
+        self.backend.play(data)
+
+    def play_silence(self, duration):
+        """Silence : écrit dans le flux si possible pour garder le timing"""
+        self.backend.silence(duration)
+
+    def play_tone(self, duration):
+        self.play_buffer(self.generate_wav_data(duration))
+
+    def play_morse(self, text, callback=None):
+        self.is_playing = True
+
+        def _play():
+            char_gap = 1.2 / self.wpm * 3
+            self.backend.reset()
+
+            for char in text.upper():
+                if not self.is_playing:
+                    break
+                if char not in MORSE_CODE:
+                    continue
+                self.play_buffer(self.render_char(char))
+                self.play_silence(char_gap)
+
+            self.backend.drain()
+            self.is_playing = False
+            if callback:
+                callback()
+
+        threading.Thread(target=_play, daemon=True).start()
+
+    def stop(self):
+        self.is_playing = False
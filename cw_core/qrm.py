@@ -0,0 +1,143 @@
+"""Stations QRM : appels CQ, indicatifs et échanges de contest en vrai Morse
+
+Les stations brouilleuses envoient du vrai Morse, compilé par le même
+compilateur de chronologie que le signal principal ; chacune répète son
+texte, séparé par un silence d'écoute.
+
+Une QrmStation est une source durable : texte, écart de tonalité, vitesse,
+volume et paramètres de dérive sont fixés à sa création ; position dans le
+texte, phase de l'oscillateur et dérive avancent d'un bloc à l'autre et
+d'une transmission à l'autre. La dérive (sinusoïde lente plus marche
+aléatoire rappelée vers zéro) est calculée toutes les CONTROL secondes puis
+interpolée : le coût par seconde ne dépend que du nombre de stations.
+"""
+
+import math
+
+import numpy as np
+
+from .oscillator import Oscillator
+from .schedule import schedule_text, total_samples
+from .timeline import TONE
+
+PREFIXES = ['F4', 'F5', 'F6', 'DL', 'DK', 'G3', 'G4', 'M0', 'K', 'W', 'N', 'AA', 'I1', 'IK',
+            'EA', 'ON', 'PA', 'OK', 'SP', 'HB9', 'OE', 'JA', 'VE', 'LA', 'SM', 'OH']
+
+NAMES = ['JEAN', 'PAUL', 'HANS', 'JOHN', 'MIKE', 'LUC', 'ANNA', 'TOM', 'PIET', 'JAN']
+
+TEMPLATES = [
+    "CQ CQ DE {call} {call} K",
+    "CQ CQ CQ DE {call} {call} {call} PSE K",
+    "CQ TEST {call} {call} TEST",
+    "{other} 5NN {nr} {nr}",
+    "TU {call} TEST",
+    "{other} DE {call} UR RST 599 599 NAME {name} {name} HW? {other} DE {call} K",
+    "{other} DE {call} TNX FER QSO 73 <SK>",
+    "QRZ? DE {call} K",
+]
+
+
+def callsign(rng):
+    """Indicatif aléatoire (rng : random.Random)"""
+    prefix = rng.choice(PREFIXES)
+    digit = "" if prefix[-1].isdigit() else str(rng.randint(0, 9))
+    suffix = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(rng.randint(2, 3)))
+    return prefix + digit + suffix
+
+
+def station_text(rng):
+    """Texte répété par une station QRM"""
+    return rng.choice(TEMPLATES).format(
+        call=callsign(rng), other=callsign(rng), nr=f"{rng.randint(1, 999):03d}",
+        name=rng.choice(NAMES))
+
+
+class QrmStation:
+    """Station brouilleuse persistante (rng : random.Random pour ses caractéristiques)"""
+
+    CONTROL = 0.002  # Pas de calcul de la dérive (s)
+    WALK_SIGMA = 1.0  # Marche aléatoire : écart-type en Hz après 1 s...
+    WALK_RETURN = 0.2  # ...et force de rappel vers la tonalité nominale (1/s)
+
+    def __init__(self, rng, offset, wpm, sample_rate):
+        self.offset = offset  # Écart à la tonalité du signal principal (Hz)
+        self.wpm = wpm
+        self.sample_rate = sample_rate
+        self.text = station_text(rng)
+        timeline = schedule_text(self.text, wpm, sample_rate)
+        tones = timeline[timeline['kind'] == TONE]
+        self.starts = tones['start']
+        self.ends = tones['start'] + tones['length']
+        # Silence d'écoute (1 à 3 s) avant que la station ne reprenne son texte
+        self.length = total_samples(timeline) + int(sample_rate * (1 + 2 * rng.random()))
+        # Distance (volume) et VFO instable (dérive lente de 0.1-0.5 Hz, ±10-20 Hz)
+        self.volume = 0.2 + rng.random() * 0.3
+        self.drift_speed = 0.1 + rng.random() * 0.4
+        self.drift_amount = 10 + rng.random() * 10
+        self.osc = Oscillator(sample_rate)
+        self.tune(rng)
+
+    def tune(self, rng):
+        """Point d'écoute : position dans le texte, phases et dérive de départ"""
+        self.position = rng.randrange(self.length)
+        self.osc.phase = rng.random()
+        self.drift_phase = rng.random() * 2 * math.pi
+        self.walk = 0.0
+
+    def keying(self, out, envelope):
+        """Manipulation sur len(out) échantillons depuis la position courante, qui avance
+
+        `envelope(n)` : enveloppe en cache d'un élément de n échantillons.
+        """
+        out.fill(0)
+        pos, done = self.position, 0
+        while done < len(out):
+            stop = min(self.length, pos + len(out) - done)
+            # Tonalités (même entamées) de la fenêtre [pos, stop) du cycle
+            first = int(np.searchsorted(self.ends, pos, 'right'))
+            last = int(np.searchsorted(self.starts, stop))
+            for start, end in zip(self.starts[first:last].tolist(), self.ends[first:last].tolist()):
+                element = envelope(end - start)
+                lo, hi = max(start, pos), min(end, stop)
+                out[done + lo - pos:done + hi - pos] = element[lo - start:hi - start]
+            done += stop - pos
+            pos = stop % self.length
+        self.position = pos
+        return out
+
+    def drift(self, n, rng):
+        """Écart de fréquence (Hz, float64) sur n échantillons ; l'état de la dérive avance
+
+        rng : numpy Generator de la synthèse (marche aléatoire).
+        """
+        step = max(1, int(self.CONTROL * self.sample_rate))
+        points = n // step + 2  # Points de contrôle couvrant [0, n]
+        dt = step / self.sample_rate
+        # Marche rappelée (AR(1)) : w_k = a^k (w_0 + somme des a^-j e_j), sans boucle
+        decay = 1 - self.WALK_RETURN * dt
+        powers = decay ** np.arange(1, points)
+        steps = rng.standard_normal(points - 1) * (self.WALK_SIGMA * math.sqrt(dt))
+        walk = np.empty(points)
+        walk[0] = self.walk
+        walk[1:] = powers * (self.walk + np.cumsum(steps / powers))
+        grid = np.arange(points) * step
+        control = walk + self.drift_amount * np.sin(
+            self.drift_phase + (2 * math.pi * self.drift_speed / self.sample_rate) * grid)
+        self.walk = float(np.interp(n, grid, walk))
+        self.drift_phase = (self.drift_phase
+                            + 2 * math.pi * self.drift_speed * n / self.sample_rate) % (2 * math.pi)
+        return np.interp(np.arange(n), grid, control)
+
+    def skip(self, n, frequency):
+        """Station à l'écoute sur n échantillons : seules ses phases avancent
+
+        `frequency` : tonalité du signal principal (la station est à `offset` Hz).
+        """
+        self.osc.skip(n, frequency + self.offset)
+        self.drift_phase = (self.drift_phase
+                            + 2 * math.pi * self.drift_speed * n / self.sample_rate) % (2 * math.pi)
+
+    def advance(self, n, frequency):
+        """Station ni manipulée ni entendue sur n échantillons : position et phases avancent"""
+        self.position = (self.position + n) % self.length
+        self.skip(n, frequency)
@@ -0,0 +1,16 @@
+"""Profils de qualité audio : fréquence d'échantillonnage et tampon du mixer
+
+Les tonalités CW (400-900 Hz) et le QRM (jusqu'à ~1.2 kHz) tiennent largement
+sous la fréquence de Nyquist du profil 8 kHz ; les profils bas réduisent
+d'autant le calcul, utile sur les petites machines (Raspberry Pi).
+"""
+
+# Tampon du mixer choisi pour une latence d'environ 12-16 ms à chaque fréquence
+QUALITY_PROFILES = {
+    'Éco 8 kHz': {'sample_rate': 8000, 'buffer': 128},
+    'Standard 16 kHz': {'sample_rate': 16000, 'buffer': 256},
+    'Bonne 22 kHz': {'sample_rate': 22050, 'buffer': 256},
+    'Studio 44.1 kHz': {'sample_rate': 44100, 'buffer': 512},
+}
+
+DEFAULT_QUALITY = 'Studio 44.1 kHz'
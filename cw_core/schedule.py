@@ -0,0 +1,57 @@
+"""Chronologie compacte numpy : un enregistrement (début, longueur, type) par élément
+
+Les positions sont en échantillons, pour une fréquence d'échantillonnage
+donnée ; les éléments se suivent sans trou de 0 à total_samples(). Les
+chronologies compilées sont mémorisées par (texte, WPM, fréquence) et
+renvoyées en lecture seule : un même indicatif rejoué ne se recompile pas.
+"""
+
+import functools
+
+import numpy as np
+
+from .timeline import CHAR_GAP, TONE, WORD_GAP, code_units, compile_units
+
+ELEMENT = np.dtype([('start', np.int64), ('length', np.int32), ('kind', np.uint8)])
+
+
+def _schedule(units, wpm, sample_rate):
+    timeline = np.empty(len(units), dtype=ELEMENT)
+    if units:
+        kinds, dots = zip(*units)
+        timeline['kind'] = kinds
+        timeline['length'] = dots
+        timeline['length'] *= int(sample_rate * 1.2 / wpm)
+        np.cumsum(timeline['length'][:-1], out=timeline['start'][1:])
+        timeline['start'][0] = 0
+    timeline.flags.writeable = False
+    return timeline
+
+
+@functools.lru_cache(maxsize=256)
+def schedule_text(text, wpm, sample_rate):
+    """Compile un texte ('<AR>' pour un prosign) en tableau ELEMENT (mémorisé)"""
+    return _schedule(compile_units(text), wpm, sample_rate)
+
+
+@functools.lru_cache(maxsize=64)
+def schedule_code(code, wpm, sample_rate):
+    """Compile un motif brut de points et traits (mémorisé)"""
+    return _schedule(code_units(code), wpm, sample_rate)
+
+
+def total_samples(timeline):
+    """Nombre d'échantillons couverts par la chronologie"""
+    if not len(timeline):
+        return 0
+    return int(timeline['start'][-1]) + int(timeline['length'][-1])
+
+
+def last_unit(timeline, word=False):
+    """Indice du premier élément du dernier caractère (ou du dernier groupe si word)"""
+    tones = np.flatnonzero(timeline['kind'] == TONE)
+    if not len(tones):
+        return 0
+    limit = WORD_GAP if word else CHAR_GAP
+    bounds = np.flatnonzero(timeline['kind'][:tones[-1]] >= limit)
+    return int(bounds[-1]) + 1 if len(bounds) else 0
@@ -0,0 +1,32 @@
+"""Graines reproductibles : une par session, une dérivée par élément d'exercice
+
+Une session tire sa graine (ou la reçoit pour être rejouée) ; les tirages
+d'exercice (caractères, mots, indicatifs) passent par Session.random. Chaque
+élément reçoit en plus sa propre graine, dérivée de (graine de session,
+numéro d'élément), avec laquelle MorseAudio réensemence QRM, QSB et bruit :
+à graines et réglages identiques, les échantillons sont identiques octet
+pour octet, quel que soit l'ordre des rendus (préparation, rejeu).
+"""
+
+import hashlib
+import random
+import secrets
+
+
+def derive(seed, index):
+    """Graine 64 bits de l'élément `index` d'une session"""
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), 'little')
+
+
+class Session:
+    """Générateur des tirages d'une session et des graines de ses éléments"""
+
+    def __init__(self, seed=None):
+        self.seed = secrets.randbits(63) if seed is None else int(seed)
+        self.random = random.Random(self.seed)
+        self.items = 0  # Graines d'élément déjà distribuées
+
+    def next_seed(self):
+        self.items += 1
+        return derive(self.seed, self.items)
@@ -0,0 +1,241 @@
+"""Statistiques de progression : réponses agrégées par jour, puis par semaine
+
+Les réponses du journal d'événements (events.ANSWER) sont cumulées par jour
+local dans des tableaux (symbole, jour) : nombre de réponses, bonnes
+réponses, vitesse et latence. La dernière ligne cumule toutes les réponses,
+tous modes confondus. Les symboles sont comptés lettre par lettre pour les
+mots Koch, en entier pour les caractères spéciaux ; vitesse et latence par
+symbole ne viennent que des éléments d'un seul symbole.
+
+Les cumuls sont gardés sur disque avec le nombre d'événements déjà lus : à
+l'ouverture, seuls les événements ajoutés depuis sont agrégés, quelle que
+soit la longueur de l'historique. Un événement events.RESET vide les
+cumuls : seules les réponses qui le suivent comptent. downsample() réduit ensuite une série à
+la largeur du graphique (moyenne, minimum et maximum par colonne de pixels).
+"""
+
+import os
+import time
+
+import numpy as np
+
+from .codes import MORSE_CODE
+from .events import ANSWER, MODES, RESET, read_events
+
+FORMAT = 'cw_core-stats-3'
+DAY = 86400
+
+SYMBOLS = list(MORSE_CODE)
+INDEX = {s: i for i, s in enumerate(SYMBOLS)}
+ALL = len(SYMBOLS)  # Ligne de toutes les réponses
+
+FIELDS = ('answers', 'correct', 'timed', 'paced', 'latency', 'wpm')
+
+# Code d'octet -> indice de symbole (caractères simples, -1 sinon)
+_BYTE_INDEX = np.full(256, -1, dtype=np.int64)
+for _symbol, _i in INDEX.items():
+    if len(_symbol) == 1:
+        _BYTE_INDEX[ord(_symbol)] = _i
+
+
+def _local_day(times):
+    """Numéro de jour local, au décalage horaire de chaque événement (heure d'été comprise)
+
+    Le décalage est lu une fois par heure distincte : quelques milliers
+    d'appels à time.localtime pour une année de sessions.
+    """
+    hours, inverse = np.unique(times // 3600, return_inverse=True)
+    offsets = np.array([time.localtime(h * 3600).tm_gmtoff for h in hours.tolist()],
+                       dtype=np.float64)
+    return ((times + offsets[inverse.ravel()]) // DAY).astype(np.int64)
+
+
+class Progress:
+    """Cumuls par (symbole, jour) des réponses du journal d'événements
+
+    answers, correct : réponses et bonnes réponses ; timed : réponses dont
+    la latence est comptée ; paced : celles dont la vitesse est connue (wpm
+    nul dans un journal migré du format 1) ; latency, wpm : leurs sommes.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.first_day = 0
+        self.read = 0  # Événements du journal déjà agrégés
+        self.origin = 0.0  # Horodatage du premier événement (détecte un journal remplacé)
+        for name in FIELDS:
+            dtype = np.uint32 if name in ('answers', 'correct', 'timed', 'paced') else np.float64
+            setattr(self, name, np.zeros((ALL + 1, 0), dtype=dtype))
+
+    @property
+    def days(self):
+        return self.answers.shape[1]
+
+    def _extend(self, first, last):
+        """Élargit l'axe des jours pour couvrir [first, last]"""
+        if not self.days:
+            self.first_day = first
+        before = max(0, self.first_day - first)
+        after = max(0, last - (self.first_day + self.days - 1))
+        if before or after:
+            for name in FIELDS:
+                setattr(self, name, np.pad(getattr(self, name), ((0, 0), (before, after))))
+            self.first_day -= before
+
+    def _add(self, rows, days, correct, latency=None, wpm=None):
+        """Cumule des réponses (une par indice) dans les cases (ligne, jour)"""
+        if not len(rows):
+            return
+        cells = rows * self.days + (days - self.first_day)
+        size = self.answers.size
+        self.answers += np.bincount(cells, minlength=size).reshape(self.answers.shape).astype(np.uint32)
+        self.correct += np.bincount(cells, correct, minlength=size).reshape(
+            self.answers.shape).astype(np.uint32)
+        if latency is not None:
+            self.timed += np.bincount(cells, minlength=size).reshape(self.answers.shape).astype(np.uint32)
+            self.latency += np.bincount(cells, latency, minlength=size).reshape(self.answers.shape)
+            self.paced += np.bincount(cells, wpm > 0, minlength=size).reshape(
+                self.answers.shape).astype(np.uint32)
+            self.wpm += np.bincount(cells, wpm, minlength=size).reshape(self.answers.shape)
+
+    def update(self, events):
+        """Agrège les événements ajoutés depuis la dernière mise à jour"""
+        if len(events) < self.read or (self.read and events['time'][0] != self.origin):
+            # Journal remplacé ou tronqué : tout est refait
+            self.clear()
+        if not len(events):
+            return
+        new = events[self.read:]
+        resets = np.flatnonzero(new['kind'] == RESET)
+        if len(resets):
+            # Remise à zéro : les cumuls repartent du dernier marqueur
+            self.clear()
+            new = new[resets[-1] + 1:]
+        self.origin = float(events['time'][0])
+        self.read = len(events)
+        answers = new[new['kind'] == ANSWER]
+        if not len(answers):
+            return
+        days = _local_day(answers['time'])
+        self._extend(int(days.min()), int(days.max()))
+        correct = (answers['correct'] == 1).astype(np.float64)
+        latency = answers['latency'].astype(np.float64)
+        wpm = answers['wpm'].astype(np.float64)
+
+        # Toutes les réponses, tous modes
+        self._add(np.full(len(answers), ALL), days, correct, latency, wpm)
+
+        # Koch : lettre par lettre, à sa position dans la saisie
+        koch = np.flatnonzero(answers['mode'] == MODES.index('koch'))
+        width = answers.dtype['item'].itemsize
+        sent = answers['item'][koch].view(np.uint8).reshape(len(koch), width)
+        received = answers['text'][koch].view(np.uint8).reshape(len(koch), width)
+        item, pos = np.nonzero(sent)
+        rows = _BYTE_INDEX[sent[item, pos]]
+        known = rows >= 0
+        item, pos, rows = item[known], pos[known], rows[known]
+        hits = (sent[item, pos] == received[item, pos]).astype(np.float64)
+        # Vitesse et latence : éléments d'un seul caractère uniquement
+        single = (sent[:, 1] == 0)[item]
+        self._add(rows[~single], days[koch][item[~single]], hits[~single])
+        chosen = koch[item[single]]
+        self._add(rows[single], days[chosen], hits[single], latency[chosen], wpm[chosen])
+
+        # Caractères spéciaux : le symbole entier (prosigns compris)
+        special = np.flatnonzero(answers['mode'] == MODES.index('special'))
+        tokens, inverse = np.unique(answers['item'][special], return_inverse=True)
+        lookup = np.array([INDEX.get(t.decode('utf-8', 'ignore'), -1) for t in tokens.tolist()],
+                          dtype=np.int64)
+        rows = lookup[inverse.ravel()]
+        special, rows = special[rows >= 0], rows[rows >= 0]
+        self._add(rows, days[special], correct[special], latency[special], wpm[special])
+
+    def series(self, symbol=None, bucket='day'):
+        """(premiers jours, réponses, précision, vitesse, latence) par jour ou par semaine
+
+        Précision, vitesse et latence valent NaN sans réponse dans la période.
+        """
+        row = ALL if symbol is None else INDEX[symbol]
+        values = [getattr(self, name)[row].astype(np.float64) for name in FIELDS]
+        starts = self.first_day + np.arange(self.days)
+        if bucket == 'week' and self.days:
+            # Semaines du lundi au dimanche (le 1er janvier 1970 était un jeudi)
+            bounds = np.flatnonzero((starts + 3) % 7 == 0)
+            bounds = np.union1d([0], bounds)
+            values = [np.add.reduceat(v, bounds) for v in values]
+            starts = starts[bounds]
+        answers, correct, timed, paced, latency, wpm = values
+        with np.errstate(invalid='ignore', divide='ignore'):
+            accuracy = np.where(answers > 0, correct / answers, np.nan)
+            speed = np.where(paced > 0, wpm / paced, np.nan)
+            delay = np.where(timed > 0, latency / timed, np.nan)
+        return starts, answers, accuracy, speed, delay
+
+    def totals(self):
+        """Réponses et précision par symbole sur tout l'historique"""
+        answers = self.answers.sum(axis=1)
+        correct = self.correct.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return answers, np.where(answers > 0, correct / answers, np.nan)
+
+    def save(self, path):
+        temp = f"{path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(temp, format=np.array(FORMAT), symbols=np.array('\n'.join(SYMBOLS)),
+                     meta=np.array([self.first_day, self.read], dtype=np.int64),
+                     origin=np.array(self.origin),
+                     **{name: getattr(self, name) for name in FIELDS})
+            os.replace(temp, path)
+        except OSError:
+            pass
+
+    @classmethod
+    def load(cls, path):
+        """Cumuls enregistrés, ou cumuls vides si absents, illisibles ou d'un autre format"""
+        progress = cls()
+        try:
+            with np.load(path) as data:
+                if (str(data['format']) != FORMAT
+                        or str(data['symbols']) != '\n'.join(SYMBOLS)):
+                    return progress
+                progress.first_day, progress.read = (int(v) for v in data['meta'])
+                progress.origin = float(data['origin'])
+                for name in FIELDS:
+                    setattr(progress, name, data[name])
+        except (OSError, KeyError, ValueError):
+            return cls()
+        return progress
+
+    @classmethod
+    def open(cls, events_path, path):
+        """Cumuls à jour du journal `events_path`, gardés dans `path`"""
+        progress = cls.load(path)
+        read = progress.read
+        progress.update(read_events(events_path))
+        if progress.read != read:
+            progress.save(path)
+        return progress
+
+
+def downsample(values, width):
+    """Réduit une série à `width` colonnes : (positions, moyenne, minimum, maximum)
+
+    Les positions sont les indices de début de chaque colonne ; les NaN
+    (périodes sans réponse) sont ignorés, une colonne sans valeur vaut NaN.
+    """
+    n = len(values)
+    if n <= width:
+        index = np.arange(n)
+        return index, values, values, values
+    index = np.linspace(0, n, width, endpoint=False).astype(np.int64)
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0)
+    count = np.add.reduceat(present.astype(np.int64), index)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.add.reduceat(filled, index) / count
+    low = np.fmin.reduceat(values, index)
+    high = np.fmax.reduceat(values, index)
+    mean[count == 0] = np.nan
+    return index, mean, low, high
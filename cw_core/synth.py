@@ -0,0 +1,498 @@
+"""Synthèse audio CW : tonalité, enveloppe, QSB, bruit et QRM (numpy)"""
+
+import random
+import threading
+
+import numpy as np
+
+from .band import DEFAULT_FILTER, DEFAULT_STATIONS, Band
+from .noise import BrownNoise, ImpulseNoise, PinkNoise
+from .oscillator import Oscillator
+from .qrm import QrmStation
+from .quality import DEFAULT_QUALITY, QUALITY_PROFILES
+from .schedule import schedule_code, schedule_text, total_samples
+from .timeline import CHAR_GAP, TONE
+
+
+def shaped_tone(n, frequency, sample_rate, rise):
+    """Tonalité float32 de n échantillons avec attaque et relâchement linéaires"""
+    # Phase calculée en float64, sinus stocké en float32
+    phase = np.arange(n) * (2 * np.pi * frequency / sample_rate)
+    wave = np.sin(phase, out=np.empty(n, dtype=np.float32), casting='same_kind')
+    att = min(int(rise * sample_rate), n // 2)
+    if att > 0:
+        ramp = np.linspace(0, 1, att, dtype=np.float32)
+        wave[:att] *= ramp
+        wave[-att:] *= ramp[::-1]
+    return wave
+
+
+class MorseAudio:
+    BLOCK = 1 << 15  # Échantillons rendus d'un coup au plus (borne la mémoire de travail)
+
+    def __init__(self, backend=None):
+        self.frequency = 650
+        self.wpm = 12
+        self.volume = 0.7
+        self.rise_time = 0.005  # Attaque / relâchement (s)
+        self.qrm = 0  # 0-1 niveau de bruit
+        self.qrm_type = "Statique"
+        self.qsb = 0  # 0-1 niveau de fading
+        self.qsb_speed = 0.5  # Vitesse du fading
+        self.rx_filter = DEFAULT_FILTER  # Filtre de réception du simulateur de bande (Hz)
+        self.band_stations = DEFAULT_STATIONS  # Stations actives dans la bande
+        self.quality = DEFAULT_QUALITY
+        self.sample_rate = QUALITY_PROFILES[DEFAULT_QUALITY]['sample_rate']
+        self.mixer_buffer = QUALITY_PROFILES[DEFAULT_QUALITY]['buffer']
+        self.qsb_phase = 0  # Phase du QSB pour continuité
+        self._backend = backend
+        # Cache disque des signaux propres (cache.RenderCache), désactivé par défaut
+        self.cache = None
+        # Protège les tampons de travail : rendus possibles depuis plusieurs threads
+        self.lock = threading.RLock()
+        # Enveloppes des points et traits, réutilisées d'un élément à l'autre
+        self._envelopes = {}
+        # Porteuse continue : tourne aussi pendant les silences
+        self._carrier = Oscillator(self.sample_rate)
+        # Bruits rose, brun et impulsionnel : états continus d'un bloc à l'autre
+        self._noise_models()
+        # Tampon int16 de lecture, réutilisé d'une transmission à l'autre
+        self._out = None
+        # Tampons de travail float32 (voir _scratch)
+        self._buffers = {}
+        self._ramps = {}
+        # Générateurs de QRM, QSB et bruit, réensemencés par reseed (graine d'élément)
+        self.random = random.Random()
+        self.rng = np.random.default_rng()
+        # Stations QRM durables, recréées seulement si la graine ou la fréquence d'échantillonnage change
+        self.qrm_seed = None
+        self.qrm_stations = []
+        self.regenerate_qrm_stations()
+
+    @property
+    def backend(self):
+        """Sortie audio, ouverte au premier besoin"""
+        with self.lock:
+            if self._backend is None:
+                from .backends import open_backend
+                self._backend = open_backend(self.sample_rate, buffer=self.mixer_buffer)
+                if self._backend.sample_rate != self.sample_rate:
+                    # Fréquence imposée par la sortie : la synthèse s'aligne
+                    self._reset_rate(self._backend.sample_rate)
+            return self._backend
+
+    def set_quality(self, name):
+        """Applique un profil de qualité (synthèse, bruit, QRM et mixer)"""
+        profile = QUALITY_PROFILES[name]
+        self.quality = name
+        self.mixer_buffer = profile['buffer']
+        self.set_sample_rate(profile['sample_rate'])
+
+    def set_sample_rate(self, sample_rate):
+        """Change la fréquence d'échantillonnage ; la sortie est rouverte au besoin"""
+        if sample_rate == self.sample_rate:
+            return
+        with self.lock:
+            self._reset_rate(sample_rate)
+            if self._backend is not None and self._backend.sample_rate != sample_rate:
+                self._backend.close()
+                self._backend = None
+
+    def clean_settings(self):
+        """Réglages dont dépend le signal propre (sans QSB ni bruit)"""
+        return (self.wpm, self.frequency, self.volume, self.rise_time, self.sample_rate)
+
+    def settings(self):
+        """Réglages dont dépend un rendu (un tampon préparé reste valable s'ils sont inchangés)"""
+        return (self.wpm, self.frequency, self.volume, self.rise_time, self.qrm, self.qrm_type,
+                self.qsb, self.qsb_speed, self.sample_rate, self.rx_filter, self.band_stations)
+
+    def _reset_rate(self, sample_rate):
+        """Vide tout ce qui dépend de la fréquence d'échantillonnage"""
+        self.sample_rate = sample_rate
+        self._carrier = Oscillator(sample_rate)
+        self._noise_models()
+        self._envelopes.clear()
+        self._buffers.clear()
+        self._out = None
+        self.regenerate_qrm_stations()
+
+    def _noise_models(self):
+        self.pink = PinkNoise(self.sample_rate)
+        self.brown = BrownNoise(self.sample_rate)
+        self.impulses = ImpulseNoise(self.sample_rate)
+
+    def regenerate_qrm_stations(self):
+        """Crée les stations QRM et celles du simulateur de bande
+
+        Avec qrm_seed, les mêmes stations sont recréées à chaque fois.
+        """
+        rng = self.random if self.qrm_seed is None else random.Random(self.qrm_seed)
+        self.qrm_stations = [
+            QrmStation(rng, rng.randint(-200, -50), rng.randint(12, 25), self.sample_rate),
+            QrmStation(rng, rng.randint(50, 200), rng.randint(10, 20), self.sample_rate),
+            QrmStation(rng, rng.randint(-300, -150), rng.randint(15, 30), self.sample_rate),
+        ]
+        self.band = Band(rng, self.sample_rate)
+
+    def set_qrm_seed(self, seed):
+        """Fixe les stations QRM (ex: graine de session) ; None : stations tirées au hasard"""
+        with self.lock:
+            self.qrm_seed = seed
+            self.regenerate_qrm_stations()
+
+    def _scratch(self, name, n, dtype=np.float32):
+        """Tampon de travail réutilisé, valable jusqu'au prochain appel du même nom"""
+        buf = self._buffers.get(name)
+        if buf is None or buf.size < n or buf.dtype != dtype:
+            buf = self._buffers[name] = np.empty(n, dtype=dtype)
+        return buf[:n]
+
+    def _time(self, n):
+        """Axe des temps t = i / sample_rate (float32, mis en cache)"""
+        key = ('time', self.sample_rate)
+        t = self._buffers.get(key)
+        if t is None or t.size < n:
+            t = np.arange(max(n, self.sample_rate), dtype=np.float32)
+            t /= self.sample_rate
+            self._buffers[key] = t
+        return t[:n]
+
+    def _ramp(self, n):
+        """Rampe 0 -> 1 de n échantillons (mise en cache)"""
+        if n not in self._ramps:
+            self._ramps[n] = np.linspace(0, 1, n, dtype=np.float32)
+        return self._ramps[n]
+
+    def generate_qsb_envelope(self, n_samples):
+        """Génère une enveloppe de fading QSB (tampon de travail)"""
+        fade = self._scratch('qsb', n_samples)
+        if self.qsb == 0:
+            fade.fill(1)
+            return fade
+
+        # Fréquence du fading (0.2 à 2 Hz selon la vitesse)
+        fade_freq = 0.2 + self.qsb_speed * 1.8
+
+        t = self._time(n_samples)
+        tmp = self._scratch('tmp', n_samples)
+
+        # Combinaison de plusieurs sinusoïdes pour un fading plus naturel
+        fade.fill(0)
+        for weight, ratio, phase_ratio in ((0.5, 1, 1), (0.3, 0.7, 1.3), (0.2, 1.3, 0.7)):
+            np.multiply(t, 2 * np.pi * fade_freq * ratio, out=tmp)
+            tmp += self.qsb_phase * phase_ratio
+            np.sin(tmp, out=tmp)
+            tmp *= weight
+            fade += tmp
+
+        # Normaliser entre min_level et 1
+        min_level = 1 - self.qsb * 0.9  # QSB max = signal tombe à 10%
+        fade += 1
+        fade *= (1 - min_level) / 2
+        fade += min_level
+
+        # Mettre à jour la phase pour continuité
+        self.qsb_phase += 2 * np.pi * fade_freq * n_samples / self.sample_rate
+
+        return fade
+
+    def generate_noise(self, n_samples):
+        """Génère du bruit selon le type sélectionné (tampon de travail)"""
+        if self.qrm_type == "Statique":
+            # Bruit blanc classique
+            noise = self._scratch('noise', n_samples)
+            self.rng.standard_normal(dtype=np.float32, out=noise)
+            noise *= self.qrm * 0.3
+
+        elif self.qrm_type in ("Bruit rose", "Bruit brun"):
+            # Bruit coloré : plus grave que le bruit blanc, même niveau
+            model = self.pink if self.qrm_type == "Bruit rose" else self.brown
+            noise = model.generate(n_samples, self.rng, self._scratch('noise', n_samples))
+            noise *= self.qrm * 0.3
+
+        elif self.qrm_type == "QRN":
+            # Bruit atmosphérique : fond rose et craquements (impulsions de Poisson)
+            noise = self.pink.generate(n_samples, self.rng, self._scratch('noise', n_samples))
+            noise *= self.qrm * 0.12
+            self.impulses.add(noise, self.rng, self.qrm * 0.15)
+
+        elif self.qrm_type == "QRM 1 Station":
+            # Une station CW proche
+            noise = self.generate_cw_qrm(n_samples, 1)
+
+        elif self.qrm_type == "QRM 2 Stations":
+            # Deux stations CW
+            noise = self.generate_cw_qrm(n_samples, 2)
+
+        elif self.qrm_type == "QRM Pile-up":
+            # Plusieurs stations (pile-up contest)
+            noise = self.generate_cw_qrm(n_samples, 3)
+
+        elif self.qrm_type == "Bande 3 kHz":
+            # Simulateur de bande : stations et bruit derrière le filtre de réception
+            # Bande rapportée au signal voulu : le rapport signal/bande ne dépend pas du volume
+            noise = self.band.render(n_samples, self.frequency, self.qrm * self.volume, self.rx_filter,
+                                     self.band_stations, lambda n: self._envelope(n, 1.0),
+                                     self.rng, self._scratch('noise', n_samples))
+
+        else:
+            noise = self._scratch('noise', n_samples)
+            noise.fill(0)
+
+        return noise
+
+    def generate_cw_qrm(self, n_samples, num_stations):
+        """Mélange les stations QRM : chacune reprend son texte, sa phase et sa dérive"""
+        noise = self._scratch('noise', n_samples)
+        noise.fill(0)
+        wave = self._scratch('qrm_wave', n_samples)
+        envelope = self._scratch('qrm_envelope', n_samples)
+
+        for station in self.qrm_stations[:num_stations]:
+            base_freq = self.frequency + station.offset
+            station.keying(envelope, lambda n: self._envelope(n, 1.0))
+            if not envelope.any():
+                # Station à l'écoute sur tout le bloc
+                station.skip(n_samples, self.frequency)
+                continue
+
+            # Tonalité dérivant lentement (VFO instable), synthèse FM
+            freq = station.drift(n_samples, self.rng)
+            freq += base_freq
+            station.osc.modulated(freq, out=wave)
+
+            # Ajouter cette station au bruit, à son volume (distance)
+            wave *= envelope
+            wave *= station.volume
+            noise += wave
+
+        # Normaliser et appliquer le niveau QRM
+        noise *= self.qrm * 0.5
+
+        return noise
+
+    def _envelope(self, n, volume=None):
+        """Attaque, plateau au volume et relâchement d'un élément (mis en cache)"""
+        volume = self.volume if volume is None else volume
+        key = (n, self.sample_rate, self.rise_time, volume)
+        if key not in self._envelopes:
+            if len(self._envelopes) > 64:
+                self._envelopes.clear()
+            envelope = np.full(n, volume, dtype=np.float32)
+            att = min(int(self.rise_time * self.sample_rate), n // 2)
+            if att > 0:
+                ramp = self._ramp(att)
+                envelope[:att] *= ramp
+                envelope[-att:] *= ramp[::-1]
+            self._envelopes[key] = envelope
+        return self._envelopes[key]
+
+    def _keying(self, block, origin, n):
+        """Enveloppe de manipulation d'un bloc : chaque tonalité reçoit son enveloppe en cache"""
+        keying = self._scratch('keying', n)
+        keying.fill(0)
+        tones = block[block['kind'] == TONE]
+        # Quelques tonalités par bloc : des copies de tranches, sans index de la taille du bloc
+        for start, length in zip((tones['start'] - origin).tolist(), tones['length'].tolist()):
+            keying[start:start + length] = self._envelope(length)
+        return keying
+
+    def _normalize(self, wave, block, origin):
+        """Ramène chaque tonalité sous ±1 par sa propre crête, écrête les silences"""
+        peaks = np.maximum.reduceat(np.abs(wave, out=self._scratch('tmp', len(wave))),
+                                    block['start'] - origin)
+        peaks[block['kind'] != TONE] = 1
+        if (peaks > 1).any():
+            np.maximum(peaks, 1, out=peaks)
+            wave /= np.repeat(peaks, block['length'])
+        np.clip(wave, -1, 1, out=wave)
+
+    def _render_block(self, block, clean=None, effects=True):
+        """Rend des éléments consécutifs en une passe (tampon de travail float32)
+
+        `clean` : signal propre int16 de toute la transmission (cache disque),
+        auquel seuls QSB et bruit sont ajoutés. Sans `effects`, ni QSB ni bruit.
+        """
+        origin = int(block['start'][0])
+        n = total_samples(block) - origin
+        if (self.qrm == 0 or not effects) and not (block['kind'] == TONE).any():
+            # Silence pur, avec ou sans cache : la porteuse avance sans rien produire
+            self._carrier.skip(n, self.frequency)
+            wave = self._scratch('wave', n)
+            wave.fill(0)
+            return wave
+        if clean is not None:
+            wave = np.multiply(clean[origin:origin + n], 1 / 32767, out=self._scratch('wave', n))
+        else:
+            wave = self._carrier.fixed(n, self.frequency, out=self._scratch('wave', n))
+            wave *= self._keying(block, origin, n)
+            if effects and (self.qsb > 0 or self.qrm > 0):
+                # Même point de départ qu'avec le cache : le signal propre arrondi en int16
+                clean = np.multiply(wave, 32767, out=self._scratch('clean', n, np.int16),
+                                    casting='unsafe')
+                np.multiply(clean, 1 / 32767, out=wave)
+        if not effects:
+            return wave
+        if self.qsb > 0:
+            wave *= self.generate_qsb_envelope(n)
+        if self.qrm > 0:
+            # Ajouter le bruit QRM, puis normaliser pour éviter la saturation
+            wave += self.generate_noise(n)
+            if self.qrm_type == "Bande 3 kHz":
+                # Le récepteur règle son gain sur l'ensemble (CAG), comme en réception réelle
+                self.band.agc.process(wave, self._scratch('tmp', n))
+                np.clip(wave, -1, 1, out=wave)
+            else:
+                self._normalize(wave, block, origin)
+        return wave
+
+    def reseed(self, seed):
+        """Réensemence QRM, QSB et bruit (seeds.Session.next_seed : une graine par élément)"""
+        with self.lock:
+            self.random.seed(seed)
+            self.rng = np.random.default_rng(seed)
+
+    def _start_transmission(self, seed=None):
+        if seed is not None:
+            self.reseed(seed)
+            # Mêmes stations, écoutées à partir d'un point fixé par la graine (générateur
+            # à part : les autres tirages ne dépendent pas des stations)
+            tuning = random.Random(f"{seed}:qrm")
+            for station in self.qrm_stations:
+                station.tune(tuning)
+            self.band.tune(tuning)
+
+        # Reset QSB phase au début de chaque transmission
+        self.qsb_phase = self.random.random() * 2 * np.pi
+        self._carrier.phase = 0.0
+        self.band.start()
+        for model in (self.pink, self.brown, self.impulses):
+            model.reset()
+
+    def _output(self, n, channels):
+        """Tampon de sortie réutilisé (agrandi seulement si nécessaire)"""
+        size = n * channels
+        if self._out is None or self._out.size < size:
+            self._out = np.empty(size, dtype=np.int16)
+        out = self._out[:size]
+        return out.reshape(n, channels) if channels > 1 else out
+
+    def schedule(self, text):
+        """Chronologie compilée (mémorisée) d'un texte aux réglages courants"""
+        return schedule_text(text, self.wpm, self.sample_rate)
+
+    def schedule_code(self, code):
+        return schedule_code(code, self.wpm, self.sample_rate)
+
+    def render_timeline(self, timeline, out=None, channels=1, seed=None):
+        """Rend une chronologie (schedule.ELEMENT) en int16 : mono (n,) ou stéréo (n, canaux)
+
+        Les éléments sont rendus par blocs d'au plus BLOCK échantillons (un
+        élément n'est jamais coupé). Sans `out`, un seul tableau est alloué
+        pour toute la transmission. Avec `seed`, le rendu est reproductible :
+        même graine et mêmes réglages, mêmes octets, avec ou sans cache disque.
+        """
+        with self.lock:
+            self._start_transmission(seed)
+            total = total_samples(timeline)
+            if out is None:
+                out = np.empty((total, channels) if channels > 1 else total, dtype=np.int16)
+            frames = out.reshape(total, channels)
+            clean = None
+            if self.cache is not None and 2 * total <= self.cache.max_entry:
+                clean = self._clean(timeline)
+                if self.qrm == 0 and self.qsb == 0:
+                    np.copyto(frames, clean[:, None])
+                    return out
+            self._render_into(frames, timeline, clean)
+            return out
+
+    def _render_into(self, frames, timeline, clean=None, effects=True):
+        for first, last in self._blocks(timeline, effects):
+            block = timeline[first:last]
+            start = int(block['start'][0])
+            wave = self._render_block(block, clean, effects)
+            np.multiply(wave[:, None], 32767, out=frames[start:start + len(wave)],
+                        casting='unsafe')
+
+    def _clean(self, timeline):
+        """Signal propre int16 mono, lu dans le cache disque ou rendu puis enregistré"""
+        key = self.cache.key(timeline, self.frequency, self.volume, self.rise_time,
+                             self.sample_rate)
+        clean = self.cache.get(key)
+        if clean is None:
+            clean = self._render_clean(key, timeline)
+        return clean
+
+    def _render_clean(self, key, timeline):
+        # La porteuse repart de la phase 0 : le rendu propre ne dépend que de la clé
+        self._carrier.phase = 0.0
+        clean = np.empty(total_samples(timeline), dtype=np.int16)
+        self._render_into(clean[:, None], timeline, effects=False)
+        self.cache.put(key, clean)
+        return clean
+
+    def warm(self, text):
+        """Compile un texte et place son signal propre dans le cache disque (s'il y en a un)
+
+        Retourne les réglages propres utilisés, ou None si rien n'a pu être
+        mis en cache (pas de cache, ou texte trop long pour une entrée).
+        """
+        with self.lock:
+            settings = self.clean_settings()
+            timeline = self.schedule(text)
+            if self.cache is None or 2 * total_samples(timeline) > self.cache.max_entry:
+                return None
+            key = self.cache.key(timeline, self.frequency, self.volume, self.rise_time,
+                                 self.sample_rate)
+            if key not in self.cache:
+                self._render_clean(key, timeline)
+            return settings
+
+    def _blocks(self, timeline, effects=True):
+        """Découpe la chronologie en blocs [first, last) d'au plus BLOCK échantillons
+
+        Sans bruit, chaque silence entre caractères forme son propre bloc :
+        des zéros, sans porteuse à calculer.
+        """
+        ends = timeline['start'] + timeline['length']
+        noisy = effects and self.qrm > 0
+        cuts = np.flatnonzero(timeline['kind'] >= CHAR_GAP) if not noisy else ()
+        first = 0
+        while first < len(timeline):
+            start = int(timeline['start'][first])
+            last = max(first + 1, int(np.searchsorted(ends, start + self.BLOCK, 'right')))
+            if len(cuts):
+                cut = int(cuts[min(np.searchsorted(cuts, first), len(cuts) - 1)])
+                if cut >= first:
+                    last = first + 1 if cut == first else min(last, cut)
+            yield first, last
+            first = last
+
+    def prepare(self, timeline, seed=None):
+        """Rend dans le tampon réutilisé, au format du mixer (valable jusqu'au rendu suivant)"""
+        with self.lock:
+            channels = self.backend.channels
+            out = self._output(total_samples(timeline), channels)
+            return self.render_timeline(timeline, out, channels, seed)
+
+    def play_timeline(self, timeline, seed=None):
+        """Rend puis joue (bloquant)"""
+        data = self.prepare(timeline, seed)
+        self.backend.reset()
+        self.backend.play(data)
+
+    def render(self, text, seed=None):
+        """Rend une transmission complète en échantillons int16 mono ('<AR>' : prosign)"""
+        return self.render_timeline(self.schedule(text), seed=seed)
+
+    def render_code(self, code, seed=None):
+        """Rend un motif brut de points et traits (prosigns)"""
+        return self.render_timeline(self.schedule_code(code), seed=seed)
+
+    def play(self, text, seed=None):
+        self.play_timeline(self.schedule(text), seed)
+
+    def play_code(self, code, seed=None):
+        self.play_timeline(self.schedule_code(code), seed)
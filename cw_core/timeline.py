@@ -0,0 +1,98 @@
+"""Compilation texte -> chronologie d'éléments (tonalité / silence)
+
+Le texte est découpé par un trie construit sur MORSE_CODE : les prosigns
+s'écrivent entre chevrons ('<AR>', '<SK>', '<SOS>') et sont émis sans espace
+entre leurs lettres ; sans chevrons, 'AR' reste la suite de lettres A puis R.
+"""
+
+from .codes import MORSE_CODE
+
+# Types d'éléments, en unités de point
+GAP, TONE, CHAR_GAP, WORD_GAP = 0, 1, 2, 3
+
+
+def _build_trie():
+    trie = {}
+    for key in MORSE_CODE:
+        node = trie
+        for char in key if len(key) == 1 else f'<{key}>':
+            node = node.setdefault(char, {})
+        node[None] = key
+    return trie
+
+
+_TRIE = _build_trie()
+
+
+def tokenize(text):
+    """Découpe un texte en clés de MORSE_CODE (plus ' ' entre les mots)"""
+    text = text.upper()
+    tokens = []
+    i = 0
+    while i < len(text):
+        if text[i] == ' ':
+            tokens.append(' ')
+            i += 1
+            continue
+        # Plus longue correspondance dans le trie
+        node, match, j = _TRIE, None, i
+        while j < len(text) and text[j] in node:
+            node = node[text[j]]
+            j += 1
+            if None in node:
+                match = (node[None], j)
+        if match:
+            tokens.append(match[0])
+            i = match[1]
+        else:
+            i += 1  # Caractère inconnu (ou chevron isolé) : ignoré
+    return tokens
+
+
+def _append_code(units, code):
+    for i, symbol in enumerate(code):
+        if i:
+            units.append((GAP, 1))
+        units.append((TONE, 1 if symbol == '.' else 3))
+    units.append((CHAR_GAP, 3))
+
+
+def compile_units(text):
+    """Compile un texte en [(type, durée en points), ...]"""
+    units = []
+    for token in tokenize(text):
+        if token != ' ':
+            _append_code(units, MORSE_CODE[token])
+        elif units and units[-1][0] in (CHAR_GAP, WORD_GAP):
+            # Espace entre mots : 7 points au total
+            units[-1] = (WORD_GAP, units[-1][1] + 4)
+        else:
+            units.append((WORD_GAP, 4))
+    return units
+
+
+def code_units(code):
+    """Unités d'un motif brut de points et traits (prosigns)"""
+    units = []
+    _append_code(units, [s for s in code if s in '.-'])
+    return units
+
+
+def _seconds(units, wpm):
+    dot = 1.2 / wpm
+    return [(kind == TONE, dot * dots) for kind, dots in units]
+
+
+def compile_text(text, wpm):
+    """Compile un texte en [(est_une_tonalité, durée_s), ...]"""
+    return _seconds(compile_units(text), wpm)
+
+
+def compile_code(code, wpm):
+    """Compile un motif brut de points et traits (prosigns)"""
+    return _seconds(code_units(code), wpm)
+
+
+def duration(timeline):
+    """Durée totale d'une chronologie (s)"""
+    return sum(d for _, d in timeline)
@@ -0,0 +1,176 @@
+"""Index des mots d'entraînement par masque de caractères
+
+Chaque mot reçoit un masque de bits de ses caractères (un bit par caractère
+Morse simple, 44 au total : tient dans un uint64). Pour un ensemble autorisé,
+les mots utilisables sont ceux dont le masque est inclus dans celui de
+l'ensemble ; cette liste est calculée une fois par ensemble, puis chaque
+tirage est un simple indice aléatoire. Les mots sont triés par niveau Koch
+(position du caractère le plus tardif dans KOCH_ORDER) : pour un niveau, les
+mots utilisables forment un préfixe de la liste.
+
+L'index est construit une fois puis gardé sur disque (.npz), avec la
+signature des listes sources pour être reconstruit si elles changent.
+"""
+
+import os
+import random
+
+import numpy as np
+
+from .cache import cache_home
+from .codes import KOCH_ORDER, MORSE_CODE
+
+FORMAT = 'cw_core-words-1'
+
+CHARS = [c for c in MORSE_CODE if len(c) == 1]
+BITS = {c: 1 << i for i, c in enumerate(CHARS)}
+KOCH_RANK = {c: i + 1 for i, c in enumerate(KOCH_ORDER)}
+NO_LEVEL = 255  # Mot contenant un caractère hors de KOCH_ORDER
+
+# Abréviations et codes courants en trafic radioamateur
+HAM_ABBREVIATIONS = [
+    'CQ', 'DE', 'BK', 'RR', 'TU', 'TNX', 'TKS', 'FB', 'OM',
+    'YL', 'XYL', 'OP', 'RST', 'QTH', 'QSL', 'QSO', 'QSY', 'QRZ', 'QRM', 'QRN', 'QRP',
+    'QRO', 'QRS', 'QRQ', 'QRT', 'QRV', 'QRX', 'QSB', 'QSK', 'WX', 'HR', 'UR', 'ES',
+    'FER', 'GM', 'GA', 'GE', 'GN', 'GL', 'GD', 'HW', 'CPY', 'CFM', 'AGN', 'PSE', 'ANT',
+    'RIG', 'PWR', 'DX', 'NR', 'NAME', 'SRI', 'CUL', 'BCNU', 'HPE', 'VY', 'ABT', 'WKD',
+    'WL', 'TEST', '73', '88', '5NN', '599', '579', '559', 'TU73',
+]
+
+# Mots anglais fréquents en CW (complétés par les listes locales, voir word_files)
+COMMON_WORDS = [
+    'THE', 'AND', 'FOR', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'ANY', 'CAN', 'HAD', 'HER',
+    'WAS', 'ONE', 'OUR', 'OUT', 'DAY', 'GET', 'HAS', 'HIM', 'HIS', 'HOW', 'MAN', 'NEW',
+    'NOW', 'OLD', 'SEE', 'TWO', 'WAY', 'WHO', 'BOY', 'DID', 'ITS', 'LET', 'PUT', 'SAY',
+    'SHE', 'TOO', 'USE', 'AM', 'AS', 'AT', 'BE', 'BY', 'DO', 'GO', 'IF', 'IN', 'IS',
+    'IT', 'ME', 'MY', 'NO', 'OF', 'OK', 'ON', 'OR', 'SO', 'TO', 'UP', 'US', 'WE',
+    'ABOUT', 'AFTER', 'AGAIN', 'ALSO', 'BACK', 'BAND', 'BEEN', 'CALL', 'COME', 'COPY',
+    'DOWN', 'EACH', 'FIND', 'FIRST', 'FROM', 'GOOD', 'GREAT', 'HAVE', 'HERE', 'HOME',
+    'INTO', 'JUST', 'KEY', 'KNOW', 'LIKE', 'LITTLE', 'LONG', 'LOOK', 'MAKE', 'MANY',
+    'MORE', 'MOST', 'MUCH', 'MUST', 'NEAR', 'NEXT', 'NICE', 'ONLY', 'OTHER',
+    'OVER', 'PART', 'RADIO', 'RAIN', 'READ', 'SAID', 'SAME', 'SEND', 'SIGNAL', 'SOME',
+    'SOON', 'STATION', 'SUCH', 'SUN', 'TAKE', 'TELL', 'THAN', 'THAT', 'THEM', 'THEN',
+    'THERE', 'THESE', 'THEY', 'THIS', 'TIME', 'TODAY', 'TONE', 'TREE', 'VERY', 'WANT',
+    'WARM', 'WATER', 'WELL', 'WENT', 'WERE', 'WHAT', 'WHEN', 'WHERE', 'WHICH', 'WILL',
+    'WIND', 'WITH', 'WORD', 'WORK', 'WORLD', 'WOULD', 'WRITE', 'YEAR', 'YOUR',
+    'ANTENNA', 'AMATEUR', 'CONTEST', 'MORSE', 'POWER', 'SPEED', 'SUNNY', 'CLOUDY',
+    'WEATHER', 'WIRE', 'DIPOLE', 'VERTICAL', 'TOWER', 'RECEIVER', 'NOISE', 'MARKET',
+    'MOTOR', 'ROAD', 'ROOM', 'ROSE', 'RUST', 'SALT', 'SMART', 'STAR', 'START',
+    'STORM', 'TRUST', 'TURN', 'TRAM', 'MAST', 'MARS', 'MASK', 'PARK', 'PAST',
+]
+
+
+def word_files():
+    """Listes de mots locales présentes sur la machine (un mot par ligne)"""
+    candidates = [os.path.join(os.path.expanduser("~"), "cw_trainer_words.txt"),
+                  "/usr/share/dict/words"]
+    return [path for path in candidates if os.path.isfile(path)]
+
+
+def char_mask(chars):
+    """Masque de bits d'une suite de caractères (les inconnus sont ignorés)"""
+    mask = 0
+    for c in chars:
+        mask |= BITS.get(c, 0)
+    return mask
+
+
+def _normalize(word):
+    word = word.strip().upper()
+    if 2 <= len(word) <= 12 and all(c in BITS for c in word):
+        return word
+    return None
+
+
+def _signature(files):
+    parts = [FORMAT, str(len(HAM_ABBREVIATIONS)), str(len(COMMON_WORDS))]
+    for path in files:
+        stat = os.stat(path)
+        parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return '|'.join(parts)
+
+
+class WordIndex:
+    """Mots triés par niveau Koch, avec leurs masques de caractères"""
+
+    def __init__(self, words, masks, levels):
+        self.words = words
+        self.masks = masks
+        self.levels = levels
+        self._pools = {}  # masque autorisé -> indices des mots utilisables
+
+    @classmethod
+    def build(cls, files=()):
+        """Construit l'index (abréviations, mots courants, puis fichiers)"""
+        seen = {}
+        sources = [HAM_ABBREVIATIONS, COMMON_WORDS]
+        for path in files:
+            with open(path, encoding='utf-8', errors='ignore') as f:
+                sources.append(f.read().split())
+        for source in sources:
+            for word in source:
+                word = _normalize(word)
+                if word and word not in seen:
+                    seen[word] = max(KOCH_RANK.get(c, NO_LEVEL) for c in word)
+        words = sorted(seen, key=lambda w: (seen[w], w))
+        masks = np.fromiter((char_mask(w) for w in words), dtype=np.uint64, count=len(words))
+        levels = np.fromiter((seen[w] for w in words), dtype=np.uint8, count=len(words))
+        return cls(words, masks, levels)
+
+    @classmethod
+    def load(cls, path=None, files=None):
+        """Index gardé sur disque, reconstruit si les listes sources ont changé"""
+        path = path or os.path.join(cache_home(), "words.npz")
+        files = word_files() if files is None else files
+        signature = _signature(files)
+        try:
+            with np.load(path) as data:
+                if str(data['signature']) == signature:
+                    words = data['text'].tobytes().decode('ascii').split('\n')
+                    return cls(words if words != [''] else [], data['masks'], data['levels'])
+        except (OSError, KeyError, ValueError):
+            pass
+        index = cls.build(files)
+        index.save(path, signature)
+        return index
+
+    def save(self, path, signature):
+        text = np.frombuffer('\n'.join(self.words).encode('ascii'), dtype=np.uint8)
+        temp = f"{path}.{os.getpid()}.tmp.npz"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(temp, text=text, masks=self.masks, levels=self.levels,
+                     signature=np.array(signature))
+            os.replace(temp, path)
+        except OSError:
+            pass  # Index utilisable quand même, reconstruit au prochain lancement
+
+    def __len__(self):
+        return len(self.words)
+
+    def pool(self, chars):
+        """Indices des mots formés uniquement des caractères autorisés (mis en cache)"""
+        allowed = char_mask(chars)
+        pool = self._pools.get(allowed)
+        if pool is None:
+            koch = list(KOCH_ORDER[:len(set(chars))])
+            if sorted(koch) == sorted(set(chars)):
+                # Ensemble d'un niveau Koch : préfixe de la liste triée
+                pool = np.arange(np.searchsorted(self.levels, len(koch), 'right'))
+            else:
+                forbidden = np.uint64(~allowed & ((1 << len(CHARS)) - 1))
+                pool = np.flatnonzero((self.masks & forbidden) == 0)
+            if len(self._pools) > 64:
+                self._pools.clear()
+            self._pools[allowed] = pool
+        return pool
+
+    def draw(self, chars, rng=random):
+        """Mot aléatoire formé des caractères autorisés, ou None s'il n'y en a aucun
+
+        `rng` : générateur de la session (seeds.Session.random) pour rejouer les tirages.
+        """
+        pool = self.pool(chars)
+        if not len(pool):
+            return None
+        return self.words[pool[rng.randrange(len(pool))]]
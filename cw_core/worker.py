@@ -0,0 +1,338 @@
+"""Lecture en arrière-plan : un seul thread, une file de commandes bornée
+
+Les éléments sont rendus puis joués dans l'ordre par le même thread. Un
+élément peut être :
+- un texte (str, '<AR>' pour un prosign), rendu avec MorseAudio.render ;
+- une chronologie compilée (schedule.ELEMENT, ex: MorseAudio.schedule_code) ;
+- un tampon déjà rendu (tableau int16 ou bytes, ou Rendered avec sa chronologie).
+
+replace() et cancel() interrompent l'élément en cours via backend.stop() :
+la sortie s'arrête au bloc audio suivant (tampon du mixer ou écriture de 20 ms).
+
+Prefetcher rend à l'avance l'élément suivant d'un exercice sur son propre
+thread ; le délai entre la soumission et la première tonalité se réduit alors
+à la latence du mixer. Ce délai est journalisé (logger cw_core.worker, INFO).
+
+Les dernières transmissions rendues sont gardées en mémoire : replay() rejoue
+le même tampon (mêmes stations QRM, même bruit) sans nouvelle synthèse, en
+entier ou à partir du dernier caractère ou groupe.
+
+Les éléments accompagnés d'une graine (seeds.Session.next_seed) sont rendus
+de façon reproductible, qu'ils le soient par le Prefetcher ou par le worker.
+
+Warmer prépare en fond tout un ensemble (caractères du niveau, groupe de
+caractères spéciaux) : chronologies compilées et signaux propres en cache.
+"""
+
+import collections
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .schedule import last_unit
+
+log = logging.getLogger(__name__)
+
+_CLOSE = object()
+
+
+class Rendered(collections.namedtuple('Rendered', 'timeline data')):
+    """Tampon déjà rendu accompagné de sa chronologie (pour les rejeux partiels)"""
+
+
+class PlaybackWorker:
+    """Thread de lecture unique avec annulation, remplacement et mise en file"""
+
+    def __init__(self, audio, maxsize=8, history=8, on_started=None, on_finished=None,
+                 on_cancelled=None):
+        self.audio = audio
+        self.history_size = history
+        self.history = collections.OrderedDict()  # tag -> (réglages, chronologie, tampon)
+        self.on_started = on_started
+        self.on_finished = on_finished
+        self.on_cancelled = on_cancelled
+        self.queue = queue.Queue(maxsize)
+        self.lock = threading.Lock()
+        self.generation = 0  # Incrémenté à chaque annulation
+        self.current = None
+        # Sortie de l'élément en cours : cancel() l'arrête sans prendre audio.lock,
+        # tenu par le Prefetcher pendant tout un rendu
+        self.output = None
+        self.idle = threading.Event()
+        self.idle.set()
+        self.latencies = collections.deque(maxlen=100)  # Soumission -> première tonalité (s)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def enqueue(self, item, tag=None, seed=None, submitted=None):
+        """Ajoute un élément en fin de file ; False si la file est pleine
+
+        submitted : instant (time.monotonic) d'où se mesure la latence, par
+        défaut maintenant (ex: validation de la réponse précédente).
+        """
+        with self.lock:
+            generation = self.generation
+        try:
+            self.queue.put_nowait((generation, item, item if tag is None else tag,
+                                   time.monotonic() if submitted is None else submitted, seed))
+        except queue.Full:
+            return False
+        return True
+
+    def replace(self, item, tag=None, seed=None, submitted=None):
+        """Coupe l'élément en cours, vide la file et joue `item` à la place"""
+        self.cancel()
+        return self.enqueue(item, tag, seed, submitted)
+
+    def cancel(self, wait=False):
+        """Coupe l'élément en cours et abandonne ceux en attente
+
+        wait=True attend que la lecture coupée soit rendue (avant de fermer la sortie).
+        """
+        with self.lock:
+            self.generation += 1
+            if self.output is not None:
+                self.output.stop()
+        while True:
+            try:
+                entry = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _CLOSE:
+                self._notify(self.on_cancelled, entry[2])
+        if wait:
+            self.idle.wait(timeout=1)
+
+    def replay(self, tag=None, unit=None):
+        """Rejoue une transmission récente (la dernière par défaut) sans la rendre à nouveau
+
+        unit='char' ou 'word' ne rejoue que le dernier caractère ou groupe.
+        Retourne False si la transmission n'est plus en mémoire ou si les
+        réglages ont changé depuis son rendu.
+        """
+        with self.lock:
+            if tag is None and self.history:
+                tag = next(reversed(self.history))
+            entry = self.history.get(tag)
+        if entry is None or entry[0] != self.audio.settings():
+            return False
+        settings, timeline, data = entry
+        if unit is not None:
+            if timeline is None:
+                return False
+            first = last_unit(timeline, word=unit == 'word')
+            data = data[int(timeline['start'][first]):]
+        return self.replace(Rendered(None, data), tag)
+
+    @property
+    def busy(self):
+        return self.current is not None or not self.queue.empty()
+
+    def close(self):
+        self.cancel()
+        self.queue.put(_CLOSE)
+        self.thread.join(timeout=1)
+
+    def _notify(self, callback, tag):
+        if callback:
+            try:
+                callback(tag)
+            except Exception:
+                pass
+
+    def _log_latency(self, tag, item, submitted, rendered, backend):
+        now = time.monotonic()
+        mixer = backend.latency
+        self.latencies.append(now - submitted + mixer)
+        log.info("%r : première tonalité %.1f ms après soumission (rendu %.1f ms%s, mixer %.1f ms)",
+                 tag, (now - submitted + mixer) * 1000, (now - rendered) * 1000,
+                 ", préparé" if isinstance(item, Rendered) else "", mixer * 1000)
+
+    def _render(self, item, seed=None):
+        """(chronologie, tampon) ; les tampons rendus ici ne sont pas réutilisés (historique)"""
+        if isinstance(item, Rendered):
+            return item
+        if isinstance(item, str):
+            item = self.audio.schedule(item)
+        if isinstance(item, np.ndarray) and item.dtype.names:
+            return Rendered(item, self.audio.render_timeline(
+                item, channels=self.audio.backend.channels, seed=seed))
+        return Rendered(None, item)
+
+    def _remember(self, tag, settings, timeline, data):
+        try:
+            hash(tag)
+        except TypeError:
+            return  # Sans tag explicite, un élément liste ou tampon n'est pas rejouable
+        with self.lock:
+            self.history.pop(tag, None)
+            self.history[tag] = (settings, timeline, data)
+            while len(self.history) > self.history_size:
+                self.history.popitem(last=False)
+
+    def _run(self):
+        while True:
+            entry = self.queue.get()
+            if entry is _CLOSE:
+                break
+            generation, item, tag, submitted, seed = entry
+            if generation != self.generation:
+                self._notify(self.on_cancelled, tag)
+                continue
+            rendered = time.monotonic()
+            settings = self.audio.settings()
+            timeline, data = self._render(item, seed)
+            if timeline is not None:
+                self._remember(tag, settings, timeline, data)
+            backend = self.audio.backend
+            with self.lock:
+                if generation != self.generation:
+                    self._notify(self.on_cancelled, tag)
+                    continue
+                backend.reset()
+                self.current = tag
+                self.output = backend
+                self.idle.clear()
+            self._log_latency(tag, item, submitted, rendered, backend)
+            self._notify(self.on_started, tag)
+            backend.play(data)
+            with self.lock:
+                self.current = None
+                self.output = None
+                self.idle.set()
+                cancelled = generation != self.generation
+            self._notify(self.on_cancelled if cancelled else self.on_finished, tag)
+
+
+class Prefetcher:
+    """Rend à l'avance, sur un thread dédié, les prochains éléments d'exercice
+
+    prefetch(key, item, seed) demande le rendu ; take(key, item, seed) renvoie
+    le tampon prêt, ou `item` tel quel s'il ne l'est pas encore, si les
+    réglages de MorseAudio ou la fréquence d'échantillonnage ont changé
+    depuis ou si la graine diffère (le PlaybackWorker le rendra alors
+    lui-même).
+    """
+
+    def __init__(self, audio, maxsize=4):
+        self.audio = audio
+        self.maxsize = maxsize
+        self.requests = queue.Queue()
+        self.ready = collections.OrderedDict()  # key -> (réglages, graine, fréquence, Rendered)
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def prefetch(self, key, item=None, seed=None):
+        """Demande le rendu de `item` (texte par défaut : `key`)"""
+        self.requests.put((key, key if item is None else item, seed))
+
+    def take(self, key, item=None, seed=None):
+        """Rendu préparé (Rendered) pour `key` s'il est encore valable, sinon `item`"""
+        with self.lock:
+            entry = self.ready.pop(key, None)
+        if entry is not None and entry[:3] == (self.audio.settings(), seed, self.audio.sample_rate):
+            return entry[3]
+        return key if item is None else item
+
+    def clear(self):
+        with self.lock:
+            self.ready.clear()
+
+    def close(self):
+        self.requests.put(_CLOSE)
+        self.thread.join(timeout=1)
+
+    def _run(self):
+        while True:
+            entry = self.requests.get()
+            if entry is _CLOSE:
+                break
+            key, item, seed = entry
+            with self.lock:
+                if key in self.ready and self.ready[key][1] == seed:
+                    continue
+            try:
+                with self.audio.lock:
+                    settings = self.audio.settings()
+                    rate = self.audio.sample_rate
+                    timeline = self.audio.schedule(item) if isinstance(item, str) else item
+                    data = self.audio.render_timeline(timeline, channels=self.audio.backend.channels,
+                                                      seed=seed)
+            except Exception:
+                log.exception("Préparation de %r impossible", key)
+                continue
+            with self.lock:
+                self.ready.pop(key, None)
+                self.ready[key] = (settings, seed, rate, Rendered(timeline, data))
+                while len(self.ready) > self.maxsize:
+                    self.ready.popitem(last=False)
+
+
+class Warmer:
+    """Préparation de fond, peu prioritaire, d'un ensemble d'éléments d'exercice
+
+    warm_up(items) remplace l'ensemble en cours ; les éléments déjà prêts aux
+    réglages courants ne sont pas refaits. on_progress(prêts, total) est
+    appelé depuis le thread de préparation.
+    """
+
+    def __init__(self, audio, on_progress=None, pause=0.005):
+        self.audio = audio
+        self.on_progress = on_progress
+        self.pause = pause  # Laisse la main entre deux éléments (s)
+        self.items = []
+        self.done = set()  # (réglages propres, élément)
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def warm_up(self, items):
+        with self.lock:
+            self.items = list(dict.fromkeys(items))
+            self.generation += 1
+        self.wakeup.set()
+
+    def ready(self):
+        """(éléments prêts aux réglages courants, taille de l'ensemble)"""
+        settings = self.audio.clean_settings()
+        with self.lock:
+            items = self.items
+        return sum((settings, item) in self.done for item in items), len(items)
+
+    def _progress(self):
+        if self.on_progress:
+            try:
+                self.on_progress(*self.ready())
+            except Exception:
+                pass
+
+    def _run(self):
+        while True:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            with self.lock:
+                generation, items = self.generation, self.items
+            self._progress()
+            for item in items:
+                if generation != self.generation:
+                    break  # Ensemble ou réglages changés entre-temps
+                if (self.audio.clean_settings(), item) in self.done:
+                    continue
+                try:
+                    settings = self.audio.warm(item)
+                except Exception:
+                    log.exception("Préparation de %r impossible", item)
+                    continue
+                if settings is None:
+                    continue  # Rien de préparé : l'élément ne compte pas comme prêt
+                self.done.add((settings, item))
+                self._progress()
+                time.sleep(self.pause)
+            if len(self.done) > 4096:
+                self.done.clear()
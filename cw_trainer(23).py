@@ -12,59 +12,30 @@ for pkg in ['pygame', 'numpy']:
 import tkinter as tk
 from tkinter import ttk, messagebox
 import numpy as np
-import pygame
-import threading
 import random
-import time
 import json
+import logging
 import os
+import threading
+import time
 from datetime import datetime, timedelta
 
-pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+from cw_core import (MORSE_CODE, SPECIAL_CHARS, KOCH_ORDER, PUNCTUATION, PROSIGNS,
+                     QUALITY_PROFILES)
+from cw_core.band import RX_FILTERS, MAX_STATIONS
+from cw_core.cache import RenderCache, cache_home
+from cw_core.confusion import ConfusionMatrix
+from cw_core.events import (EventLog, read_events, MODES, SHOWN, AUDIO_START, AUDIO_END,
+                            AUDIO_CUT, KEY, ANSWER, RESET)
+from cw_core.seeds import Session
+from cw_core.stats import Progress, downsample, SYMBOLS as STATS_SYMBOLS
+from cw_core.synth import MorseAudio
+from cw_core.words import WordIndex
+from cw_core.worker import PlaybackWorker, Prefetcher, Warmer
 
 SAVE_FILE = os.path.join(os.path.expanduser("~"), "cw_trainer_progress.json")
-
-MORSE_CODE = {
-    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
-    'G': '--.', 'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..',
-    'M': '--', 'N': '-.', 'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.',
-    'S': '...', 'T': '-', 'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-',
-    'Y': '-.--', 'Z': '--..', '0': '-----', '1': '.----', '2': '..---',
-    '3': '...--', '4': '....-', '5': '.....', '6': '-....', '7': '--...',
-    '8': '---..', '9': '----.', 
-    # Ponctuation
-    '.': '.-.-.-', ',': '--..--', '?': '..--..', '/': '-..-.', '=': '-...-',
-    '+': '.-.-.', '-': '-....-', '@': '.--.-.', 
-    # Prosigns radioamateur
-    'AR': '.-.-.', 'SK': '...-.-', 'BT': '-...-', 'KN': '-.--.',
-    'AS': '.-...', 'HH': '........', 'SOS': '...---...'
-}
-
-# Caractères spéciaux radioamateur (pour le mode dédié)
-SPECIAL_CHARS = {
-    # Ponctuation courante
-    '.': ('Point', '.-.-.-'),
-    ',': ('Virgule', '--..--'),
-    '?': ('Question', '..--..'),
-    '/': ('Barre', '-..-.'),
-    '=': ('Égal/BT', '-...-'),
-    '+': ('Plus/AR', '.-.-.'),
-    '-': ('Tiret', '-....-'),
-    '@': ('Arobase', '.--.-.'),
-    # Prosigns
-    'AR': ('Fin message', '.-.-.'),
-    'SK': ('Fin contact', '...-.-'),
-    'BT': ('Séparation', '-...-'),
-    'KN': ('À vous seul', '-.--.'),
-    'AS': ('Attendez', '.-...'),
-    'HH': ('Erreur', '........'),
-    'SOS': ('Détresse', '...---...'),
-}
-
-KOCH_ORDER = ['K', 'M', 'R', 'S', 'U', 'A', 'P', 'T', 'L', 'O', 
-              'W', 'I', '.', 'N', 'J', 'E', 'F', '0', 'Y', 'V',
-              ',', 'G', '5', '/', 'Q', '9', 'Z', 'H', '3', '8',
-              'B', '?', '4', '2', '7', 'C', '1', 'D', '6', 'X']
+EVENTS_FILE = os.path.join(os.path.expanduser("~"), "cw_trainer_events.bin")
+CONFUSION_FILE = os.path.join(os.path.expanduser("~"), "cw_trainer_confusion.npz")
 
 CALLSIGN_PREFIXES = {
     'France': ['F1', 'F2', 'F4', 'F5', 'F6', 'F8'],
@@ -78,219 +49,13 @@ CALLSIGN_PREFIXES = {
     'Canada': ['VA', 'VE'],
 }
 
-def generate_callsign(country=None):
-    if country is None: country = random.choice(list(CALLSIGN_PREFIXES.keys()))
-    prefix = random.choice(CALLSIGN_PREFIXES[country])
-    num = "" if prefix[-1].isdigit() else str(random.randint(1, 9))
-    suffix = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=random.randint(2, 3)))
+def generate_callsign(country=None, rng=random):
+    if country is None: country = rng.choice(list(CALLSIGN_PREFIXES.keys()))
+    prefix = rng.choice(CALLSIGN_PREFIXES[country])
+    num = "" if prefix[-1].isdigit() else str(rng.randint(1, 9))
+    suffix = ''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=rng.randint(2, 3)))
     return f"{prefix}{num}{suffix}", country
 
-class MorseAudio:
-    def __init__(self):
-        self.frequency = 650
-        self.wpm = 12
-        self.volume = 0.7
-        self.qrm = 0  # 0-1 niveau de bruit
-        self.qrm_type = "Statique"
-        self.qsb = 0  # 0-1 niveau de fading
-        self.qsb_speed = 0.5  # Vitesse du fading
-        self.sample_rate = 44100
-        self.qsb_phase = 0  # Phase du QSB pour continuité
-        # Fréquences des stations QRM (générées une fois)
-        self.qrm_stations = []
-        self.regenerate_qrm_stations()
-    
-    def regenerate_qrm_stations(self):
-        """Génère des stations QRM avec des fréquences différentes"""
-        self.qrm_stations = [
-            {'freq': self.frequency + random.randint(-200, -50), 'wpm': random.randint(12, 25)},
-            {'freq': self.frequency + random.randint(50, 200), 'wpm': random.randint(10, 20)},
-            {'freq': self.frequency + random.randint(-300, -150), 'wpm': random.randint(15, 30)},
-        ]
-    
-    def generate_qsb_envelope(self, n_samples):
-        """Génère une enveloppe de fading QSB"""
-        if self.qsb == 0:
-            return np.ones(n_samples)
-        
-        # Fréquence du fading (0.2 à 2 Hz selon la vitesse)
-        fade_freq = 0.2 + self.qsb_speed * 1.8
-        
-        t = np.linspace(0, n_samples/self.sample_rate, n_samples, False)
-        
-        # Combinaison de plusieurs sinusoïdes pour un fading plus naturel
-        fade = (
-            0.5 * np.sin(2 * np.pi * fade_freq * t + self.qsb_phase) +
-            0.3 * np.sin(2 * np.pi * fade_freq * 0.7 * t + self.qsb_phase * 1.3) +
-            0.2 * np.sin(2 * np.pi * fade_freq * 1.3 * t + self.qsb_phase * 0.7)
-        )
-        
-        # Normaliser entre min_level et 1
-        min_level = 1 - self.qsb * 0.9  # QSB max = signal tombe à 10%
-        fade = (fade + 1) / 2  # Normaliser entre 0 et 1
-        fade = min_level + fade * (1 - min_level)
-        
-        # Mettre à jour la phase pour continuité
-        self.qsb_phase += 2 * np.pi * fade_freq * n_samples / self.sample_rate
-        
-        return fade
-        
-    def generate_noise(self, n_samples):
-        """Génère du bruit selon le type sélectionné"""
-        if self.qrm_type == "Statique":
-            # Bruit blanc classique
-            noise = np.random.normal(0, 1, n_samples)
-            noise = noise * self.qrm * 0.3
-            
-        elif self.qrm_type == "QRN":
-            # Bruit atmosphérique (craquements)
-            noise = np.random.normal(0, 1, n_samples)
-            # Ajouter des pops aléatoires
-            pops = np.random.random(n_samples) > 0.998
-            noise[pops] = np.random.choice([-3, 3], size=np.sum(pops))
-            # Filtrage passe-bas pour simuler l'atmosphérique
-            noise = np.convolve(noise, np.ones(10)/10, mode='same')
-            noise = noise * self.qrm * 0.4
-            
-        elif self.qrm_type == "QRM 1 Station":
-            # Une station CW proche
-            noise = self.generate_cw_qrm(n_samples, 1)
-            
-        elif self.qrm_type == "QRM 2 Stations":
-            # Deux stations CW
-            noise = self.generate_cw_qrm(n_samples, 2)
-            
-        elif self.qrm_type == "QRM Pile-up":
-            # Plusieurs stations (pile-up contest)
-            noise = self.generate_cw_qrm(n_samples, 3)
-            
-        else:
-            noise = np.zeros(n_samples)
-        
-        return noise
-    
-    def generate_cw_qrm(self, n_samples, num_stations):
-        """Génère du QRM avec plusieurs stations CW avec variation de tonalité"""
-        noise = np.zeros(n_samples)
-        t = np.linspace(0, n_samples/self.sample_rate, n_samples, False)
-        
-        for i in range(min(num_stations, len(self.qrm_stations))):
-            station = self.qrm_stations[i]
-            base_freq = station['freq']
-            wpm = station['wpm']
-            
-            # Variation de fréquence (drift) - simule un VFO instable
-            # Drift lent (0.1-0.5 Hz) avec amplitude de ±15 Hz
-            drift_speed = 0.1 + random.random() * 0.4
-            drift_amount = 10 + random.random() * 10  # ±10-20 Hz
-            drift_phase = random.random() * 2 * np.pi
-            
-            # Fréquence qui varie dans le temps
-            freq_variation = drift_amount * np.sin(2 * np.pi * drift_speed * t + drift_phase)
-            # Ajouter un drift aléatoire supplémentaire
-            freq_variation += np.cumsum(np.random.normal(0, 0.5, n_samples)) * 0.01
-            
-            instantaneous_freq = base_freq + freq_variation
-            
-            # Générer l'onde avec fréquence variable (FM synthesis)
-            phase = np.cumsum(2 * np.pi * instantaneous_freq / self.sample_rate)
-            wave = np.sin(phase)
-            
-            # Créer un pattern morse aléatoire (on/off)
-            dot_samples = int(self.sample_rate * 1200 / wpm / 1000)
-            envelope = np.zeros(n_samples)
-            pos = 0
-            
-            while pos < n_samples:
-                # Élément aléatoire: point ou trait
-                if random.random() > 0.5:
-                    dur = dot_samples
-                else:
-                    dur = dot_samples * 3
-                
-                # Attack/decay pour éviter les clics
-                if pos + dur < n_samples:
-                    attack = min(int(0.003 * self.sample_rate), dur // 4)
-                    envelope[pos:pos+attack] = np.linspace(0, 1, attack)
-                    envelope[pos+attack:pos+dur-attack] = 1
-                    envelope[pos+dur-attack:pos+dur] = np.linspace(1, 0, attack)
-                
-                pos += dur
-                
-                # Espace entre éléments
-                gap = dot_samples * random.choice([1, 3, 7])
-                pos += gap
-            
-            # Volume variable pour chaque station (simule distances différentes)
-            station_volume = 0.2 + random.random() * 0.3
-            
-            # Ajouter cette station au bruit
-            noise += wave * envelope * station_volume
-        
-        # Normaliser et appliquer le niveau QRM
-        noise = noise * self.qrm * 0.5
-        
-        return noise
-        
-    def play(self, text):
-        # Régénérer les stations QRM pour varier
-        if self.qrm > 0 and "QRM" in self.qrm_type:
-            self.regenerate_qrm_stations()
-        
-        # Reset QSB phase au début de chaque transmission
-        self.qsb_phase = random.random() * 2 * np.pi
-            
-        dot = 1200 / self.wpm
-        for char in text.upper():
-            morse = MORSE_CODE.get(char, '')
-            if not morse: continue
-            for i, sym in enumerate(morse):
-                dur = dot if sym == '.' else dot * 3
-                n = int(self.sample_rate * dur / 1000)
-                t = np.linspace(0, dur/1000, n, False)
-                wave = np.sin(2 * np.pi * self.frequency * t)
-                att = min(int(0.005 * self.sample_rate), n//2)
-                envelope = np.ones(n)
-                envelope[:att] = np.linspace(0, 1, att)
-                envelope[-att:] = np.linspace(1, 0, att)
-                
-                # Appliquer le QSB (fading)
-                qsb_envelope = self.generate_qsb_envelope(n)
-                wave = wave * envelope * self.volume * qsb_envelope
-                
-                # Ajouter le bruit QRM
-                if self.qrm > 0:
-                    noise = self.generate_noise(n)
-                    wave = wave + noise
-                    # Normaliser pour éviter la saturation
-                    max_val = np.max(np.abs(wave))
-                    if max_val > 1:
-                        wave = wave / max_val
-                
-                wave = (wave * 32767).astype(np.int16)
-                sound = pygame.sndarray.make_sound(np.column_stack((wave, wave)))
-                sound.play()
-                time.sleep(dur / 1000)
-                
-                # Bruit entre les éléments
-                if i < len(morse) - 1:
-                    if self.qrm > 0:
-                        gap_n = int(self.sample_rate * dot / 1000)
-                        gap_noise = self.generate_noise(gap_n)
-                        gap_noise = (gap_noise * 32767).astype(np.int16)
-                        gap_sound = pygame.sndarray.make_sound(np.column_stack((gap_noise, gap_noise)))
-                        gap_sound.play()
-                    time.sleep(dot / 1000)
-            
-            # Bruit entre les caractères
-            if self.qrm > 0:
-                gap_n = int(self.sample_rate * dot * 3 / 1000)
-                gap_noise = self.generate_noise(gap_n)
-                gap_noise = (gap_noise * 32767).astype(np.int16)
-                gap_sound = pygame.sndarray.make_sound(np.column_stack((gap_noise, gap_noise)))
-                gap_sound.play()
-            time.sleep(dot * 3 / 1000)
-
 class App:
     BG = '#0d1117'
     BG2 = '#161b22'
@@ -303,13 +68,51 @@ class App:
     TEXT = '#c9d1d9'
     DIM = '#8b949e'
     
-    def __init__(self, root):
+    def __init__(self, root, seed=None):
         self.root = root
         self.root.title("CW Trainer - F4GBY - Méthode Koch")
         self.root.geometry("1050x700")
         self.root.configure(bg=self.BG)
         
         self.audio = MorseAudio()
+        try:
+            # Signaux propres gardés sur disque : caractères et indicatifs déjà rendus
+            self.audio.cache = RenderCache()
+        except OSError:
+            pass
+        # Un seul thread de lecture : un nouvel envoi coupe le précédent
+        self.player = PlaybackWorker(self.audio,
+                                     on_started=self.on_audio_started,
+                                     on_finished=self.on_audio_finished,
+                                     on_cancelled=self.on_audio_cancelled)
+        # Élément suivant de chaque exercice, rendu pendant la saisie de la réponse
+        self.prefetcher = Prefetcher(self.audio)
+        self.upcoming = {}  # exercice -> (élément, graine)
+        # Tirages et audio reproductibles : graine de session, une graine par élément
+        self.session = Session(seed)
+        self.audio.set_qrm_seed(self.session.seed)  # Mêmes stations QRM toute la session
+        self.current_item = (None, None)  # (texte émis, graine) de l'élément en cours
+        logging.getLogger(__name__).info("Graine de session : %d", self.session.seed)
+        # Confusions par symbole (envoyé, saisi), reconstruites du journal au besoin
+        self.confusion = ConfusionMatrix.load(CONFUSION_FILE)
+        if self.confusion is None:
+            try:
+                self.confusion = ConfusionMatrix.from_events(read_events(EVENTS_FILE))
+            except (OSError, ValueError):
+                self.confusion = ConfusionMatrix()
+        # Journal binaire de toutes les sessions (éléments, émissions, frappes, réponses)
+        try:
+            self.events = EventLog(EVENTS_FILE, self.session.seed)
+        except (OSError, ValueError):
+            logging.getLogger(__name__).warning("Journal d'événements indisponible (%s) : session non enregistrée",
+                                                EVENTS_FILE, exc_info=True)
+            self.events = None
+        self.item_shown = time.monotonic()
+        # Ensemble pratiqué préparé en fond, au lancement et après chaque réglage
+        self.warmer = Warmer(self.audio, on_progress=self.on_warm_progress)
+        self.warm_job = None
+        self.word_index = None  # Chargé en fond au premier exercice de mots
+        self.word_loader = None
         self.mode = 'koch'
         
         # Koch
@@ -353,7 +156,8 @@ class App:
         self.build()
         
     def save_progress(self):
-        data = {'koch_level': self.koch_level, 'history': self.history[-50:], 'char_stats': self.char_stats}
+        data = {'koch_level': self.koch_level, 'history': self.history[-50:], 'char_stats': self.char_stats,
+                'quality': self.audio.quality}
         try:
             with open(SAVE_FILE, 'w') as f: json.dump(data, f)
         except: pass
@@ -366,8 +170,24 @@ class App:
                     self.koch_level = data.get('koch_level', 2)
                     self.history = data.get('history', [])
                     self.char_stats = data.get('char_stats', {})
+                    if data.get('quality') in QUALITY_PROFILES:
+                        self.audio.set_quality(data['quality'])
         except: pass
     
+    def set_quality(self, name):
+        # La sortie est rouverte à la nouvelle fréquence : rien ne doit y jouer
+        # pendant ce temps, ni rester préparé à l'ancienne fréquence
+        self.player.cancel(wait=True)
+        self.prefetcher.clear()
+        self.audio.set_quality(name)
+        self.save_progress()
+        self.schedule_warmup()
+    
+    def set_audio(self, name, value):
+        """Réglage du signal propre (vitesse, tonalité, volume) : l'ensemble est re-préparé"""
+        setattr(self.audio, name, value)
+        self.schedule_warmup()
+    
     def reset_progress(self):
         if messagebox.askyesno("Reset", "Tout recommencer à zéro ?"):
             self.koch_level = 2
@@ -375,6 +195,11 @@ class App:
             self.koch_total = 0
             self.history = []
             self.char_stats = {}
+            self.confusion.clear()
+            # Marqueur dans le journal : statistiques et matrice reconstruite l'ignorent en deçà
+            if self.events is not None:
+                self.events.record(RESET, 'koch')
+            self.flush_logs()
             self.save_progress()
             self.set_mode('koch')
     
@@ -385,7 +210,8 @@ class App:
                 'level': self.koch_level,
                 'correct': correct,
                 'total': total,
-                'pct': round(correct / total * 100)
+                'pct': round(correct / total * 100),
+                'seed': self.session.seed
             })
             self.save_progress()
     
@@ -420,17 +246,25 @@ class App:
                                     relief=tk.FLAT, cursor='hand2', command=lambda: self.set_mode('contest'))
         self.btn_contest.pack(pady=2)
         
+        self.btn_stats = tk.Button(sidebar, text="📈 Statistiques", font=('Arial', 11), width=15,
+                                  relief=tk.FLAT, cursor='hand2', command=lambda: self.set_mode('stats'))
+        self.btn_stats.pack(pady=2)
+        
         # Séparateur
         tk.Frame(sidebar, bg=self.DIM, height=1).pack(fill=tk.X, padx=15, pady=20)
         
         # Réglages audio
-        tk.Label(sidebar, text="AUDIO", font=('Arial', 9), fg=self.DIM, bg=self.BG2).pack(pady=(0,10))
+        tk.Label(sidebar, text="AUDIO", font=('Arial', 9), fg=self.DIM, bg=self.BG2).pack(pady=(0,2))
+        self.tx_lbl = tk.Label(sidebar, text="○ Prêt", font=('Arial', 9), fg=self.DIM, bg=self.BG2)
+        self.tx_lbl.pack(pady=(0,2))
+        self.warm_lbl = tk.Label(sidebar, text="", font=('Arial', 8), fg=self.DIM, bg=self.BG2)
+        self.warm_lbl.pack(pady=(0,8))
         
         # Vitesse
         tk.Label(sidebar, text="Vitesse (WPM)", font=('Arial', 9), fg=self.TEXT, bg=self.BG2).pack()
         self.wpm_scale = tk.Scale(sidebar, from_=5, to=35, orient=tk.HORIZONTAL, 
                                  bg=self.BG2, fg=self.TEXT, highlightthickness=0, length=150,
-                                 command=lambda v: setattr(self.audio, 'wpm', int(v)))
+                                 command=lambda v: self.set_audio('wpm', int(v)))
         self.wpm_scale.set(12)
         self.wpm_scale.pack()
         
@@ -438,7 +272,7 @@ class App:
         tk.Label(sidebar, text="Tonalité (Hz)", font=('Arial', 9), fg=self.TEXT, bg=self.BG2).pack(pady=(10,0))
         self.freq_scale = tk.Scale(sidebar, from_=400, to=900, orient=tk.HORIZONTAL, 
                                   bg=self.BG2, fg=self.TEXT, highlightthickness=0, length=150,
-                                  command=lambda v: setattr(self.audio, 'frequency', int(v)))
+                                  command=lambda v: self.set_audio('frequency', int(v)))
         self.freq_scale.set(650)
         self.freq_scale.pack()
         
@@ -446,10 +280,17 @@ class App:
         tk.Label(sidebar, text="Volume", font=('Arial', 9), fg=self.TEXT, bg=self.BG2).pack(pady=(10,0))
         self.vol_scale = tk.Scale(sidebar, from_=0, to=100, orient=tk.HORIZONTAL, 
                                  bg=self.BG2, fg=self.TEXT, highlightthickness=0, length=150,
-                                 command=lambda v: setattr(self.audio, 'volume', int(v)/100))
+                                 command=lambda v: self.set_audio('volume', int(v)/100))
         self.vol_scale.set(70)
         self.vol_scale.pack()
         
+        # Qualité audio (fréquence d'échantillonnage)
+        tk.Label(sidebar, text="Qualité audio", font=('Arial', 9), fg=self.TEXT, bg=self.BG2).pack(pady=(10,0))
+        self.quality_combo = ttk.Combobox(sidebar, values=list(QUALITY_PROFILES), state='readonly', width=14)
+        self.quality_combo.set(self.audio.quality)
+        self.quality_combo.pack(pady=5)
+        self.quality_combo.bind('<<ComboboxSelected>>', lambda e: self.set_quality(self.quality_combo.get()))
+        
         # Séparateur
         tk.Frame(sidebar, bg=self.DIM, height=1).pack(fill=tk.X, padx=15, pady=15)
         
@@ -465,15 +306,32 @@ class App:
         tk.Label(sidebar, text="Type QRM", font=('Arial', 9), fg=self.TEXT, bg=self.BG2).pack(pady=(10,0))
         self.qrm_type = ttk.Combobox(sidebar, values=[
             "Statique", 
+            "Bruit rose",
+            "Bruit brun",
             "QRN", 
             "QRM 1 Station",
             "QRM 2 Stations", 
-            "QRM Pile-up"
+            "QRM Pile-up",
+            "Bande 3 kHz"
         ], state='readonly', width=14)
         self.qrm_type.set("Statique")
         self.qrm_type.pack(pady=5)
         self.qrm_type.bind('<<ComboboxSelected>>', lambda e: setattr(self.audio, 'qrm_type', self.qrm_type.get()))
         
+        # Simulateur de bande : filtre de réception et nombre de stations
+        tk.Label(sidebar, text="Filtre RX (bande)", font=('Arial', 9), fg=self.TEXT, bg=self.BG2).pack(pady=(5,0))
+        self.rx_filter_combo = ttk.Combobox(sidebar, values=list(RX_FILTERS), state='readonly', width=14)
+        self.rx_filter_combo.set(next(k for k, v in RX_FILTERS.items() if v == self.audio.rx_filter))
+        self.rx_filter_combo.pack(pady=5)
+        self.rx_filter_combo.bind('<<ComboboxSelected>>',
+                                  lambda e: setattr(self.audio, 'rx_filter', RX_FILTERS[self.rx_filter_combo.get()]))
+        tk.Label(sidebar, text="Stations (bande)", font=('Arial', 9), fg=self.TEXT, bg=self.BG2).pack()
+        self.band_scale = tk.Scale(sidebar, from_=0, to=MAX_STATIONS, orient=tk.HORIZONTAL, 
+                                   bg=self.BG2, fg=self.TEXT, highlightthickness=0, length=150,
+                                   command=lambda v: setattr(self.audio, 'band_stations', int(v)))
+        self.band_scale.set(self.audio.band_stations)
+        self.band_scale.pack()
+        
         # Séparateur
         tk.Frame(sidebar, bg=self.DIM, height=1).pack(fill=tk.X, padx=15, pady=10)
         
@@ -506,6 +364,8 @@ class App:
         self.set_mode('koch')
     
     def set_mode(self, mode):
+        self.player.cancel()
+        self.upcoming.clear()
         self.mode = mode
         self.koch_running = False
         self.call_running = False
@@ -520,16 +380,116 @@ class App:
                             fg=self.BG if mode=='call' else self.PURPLE)
         self.btn_contest.config(bg=self.ORANGE if mode=='contest' else self.BG3, 
                                fg=self.BG if mode=='contest' else self.ORANGE)
+        self.btn_stats.config(bg=self.TEXT if mode=='stats' else self.BG3, 
+                             fg=self.BG if mode=='stats' else self.TEXT)
         
         for w in self.content.winfo_children(): w.destroy()
         
         if mode == 'koch': self.show_koch()
         elif mode == 'special': self.show_special()
         elif mode == 'call': self.show_call()
+        elif mode == 'stats': self.show_stats()
         else: self.show_contest()
+        self.schedule_warmup()
     
-    def play(self, txt):
-        threading.Thread(target=lambda: self.audio.play(txt), daemon=True).start()
+    def play(self, txt, submitted=None):
+        """Émet un texte ; l'élément en cours garde sa graine, tout autre texte en reçoit une
+
+        submitted : instant de la réponse qui déclenche l'envoi (mesure de latence).
+        """
+        text, seed = self.current_item
+        if txt != text:
+            seed = self.session.next_seed()
+        self.player.replace(self.prefetcher.take(txt, seed=seed), tag=txt, seed=seed,
+                            submitted=submitted)
+    
+    def replay(self, txt, unit=None):
+        """Rejoue le tampon déjà émis (même QRM) ; unit='char' : dernière lettre seulement"""
+        if not txt: return
+        if not self.player.replay(txt, unit):
+            self.play(txt)
+    
+    def next_item(self, drill, choose, valid, text):
+        """Élément courant d'un exercice ; le suivant est tiré et rendu dès maintenant
+
+        Chaque élément reçoit sa graine au tirage : préparé ou non, il sonne pareil.
+        """
+        upcoming = self.upcoming.pop(drill, None)
+        if upcoming is None or not valid(upcoming[0]):
+            upcoming = (choose(), self.session.next_seed())
+        item, seed = upcoming
+        self.current_item = (text(item), seed)
+        self.item_shown = time.monotonic()
+        self.log_event(SHOWN, text(item))
+        following, seed = self.upcoming[drill] = (choose(), self.session.next_seed())
+        self.prefetcher.prefetch(text(following), seed=seed)
+        return item
+    
+    def on_player_state(self, tag):
+        """Appelé par le thread de lecture (début, fin ou annulation d'un envoi)"""
+        self.root.after(0, self.update_tx_state)
+    
+    def on_audio_started(self, tag):
+        self.log_event(AUDIO_START, str(tag))
+        self.on_player_state(tag)
+    
+    def on_audio_finished(self, tag):
+        self.log_event(AUDIO_END, str(tag))
+        self.on_player_state(tag)
+    
+    def on_audio_cancelled(self, tag):
+        self.log_event(AUDIO_CUT, str(tag))
+        self.on_player_state(tag)
+    
+    def log_event(self, kind, item, text='', correct=-1):
+        """Ajoute un événement de l'exercice en cours au journal (latence : depuis l'affichage)"""
+        if self.events is not None and self.mode in MODES:
+            self.events.record(kind, self.mode, item, text, correct,
+                               time.monotonic() - self.item_shown, self.audio.wpm)
+    
+    def log_key(self, event):
+        """Frappe dans une zone de réponse (caractère ou effacement)"""
+        char = '\b' if event.keysym == 'BackSpace' else event.char
+        if char and (char.isprintable() or char == '\b'):
+            self.log_event(KEY, self.current_item[0] or '', char.upper())
+    
+    def flush_logs(self):
+        """Fin d'exercice : journal tamponné et matrice de confusion écrits sur disque"""
+        if self.events is not None:
+            self.events.flush()
+        self.confusion.save(CONFUSION_FILE)
+    
+    def update_tx_state(self):
+        if self.player.current is not None:
+            # Latence du dernier envoi (réponse -> première tonalité), sans --verbose
+            latency = f" · {self.player.latencies[-1] * 1000:.0f} ms" if self.player.latencies else ""
+            self.tx_lbl.config(text=f"● Émission{latency}", fg=self.GREEN)
+        else:
+            self.tx_lbl.config(text="○ Prêt", fg=self.DIM)
+    
+    def warm_items(self):
+        """Textes de l'ensemble pratiqué dans le mode courant"""
+        if self.mode == 'koch':
+            return self.get_practice_chars()
+        if self.mode == 'special':
+            return [self.special_text(c) for c in self.get_special_chars()]
+        return []
+    
+    def schedule_warmup(self):
+        """Une seule préparation après le dernier mouvement d'un curseur"""
+        if self.warm_job is not None:
+            self.root.after_cancel(self.warm_job)
+        self.warm_job = self.root.after(400, self.warm_up)
+    
+    def warm_up(self):
+        self.warm_job = None
+        # Sans cache disque, rien à préparer (pas de compteur trompeur)
+        self.warmer.warm_up(self.warm_items() if self.audio.cache is not None else [])
+    
+    def on_warm_progress(self, ready, total):
+        """Appelé par le thread de préparation"""
+        text = f"Préparés : {ready}/{total}" if total else ""
+        self.root.after(0, lambda: self.warm_lbl.config(text=text))
 
     # ════════════════════════════════════════════════════════════════
     # MÉTHODE KOCH
@@ -564,6 +524,13 @@ class App:
         tk.Radiobutton(mode_f, text="Personnalisé", variable=self.koch_mode_var, value="custom",
                       font=('Arial', 10), fg=self.TEXT, bg=self.BG, selectcolor=self.BG3,
                       activebackground=self.BG, command=self.update_koch_mode).pack(side=tk.LEFT, padx=10)
+        tk.Radiobutton(mode_f, text="Confusions", variable=self.koch_mode_var, value="contrast",
+                      font=('Arial', 10), fg=self.TEXT, bg=self.BG, selectcolor=self.BG3,
+                      activebackground=self.BG, command=self.update_koch_mode).pack(side=tk.LEFT, padx=10)
+        self.koch_words_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(mode_f, text="Mots", variable=self.koch_words_var,
+                      font=('Arial', 10), fg=self.TEXT, bg=self.BG, selectcolor=self.BG3,
+                      activebackground=self.BG, command=self.update_koch_mode).pack(side=tk.LEFT, padx=10)
         
         # Frame pour les caractères Koch
         self.koch_chars_frame = tk.Frame(left, bg=self.BG)
@@ -594,6 +561,7 @@ class App:
                                     justify=tk.CENTER, bg=self.BG3, fg=self.CYAN, insertbackground=self.CYAN)
         self.custom_entry.pack(pady=5)
         self.custom_entry.insert(0, "KMRSU")
+        self.custom_entry.bind('<KeyRelease>', lambda e: self.schedule_warmup())
         
         tk.Label(self.custom_frame, text="(lettres, chiffres, . , ? /)", font=('Arial', 9), 
                 fg=self.DIM, bg=self.BG).pack()
@@ -627,6 +595,7 @@ class App:
                                   bg=self.BG3, fg=self.CYAN, insertbackground=self.CYAN)
         self.koch_entry.pack(pady=5)
         self.koch_entry.bind('<Return>', lambda e: self.koch_enter())
+        self.koch_entry.bind('<Key>', self.log_key)
         
         # Feedback
         self.koch_feedback = tk.Label(left, text="Appuyez sur Démarrer", font=('Arial', 11), fg=self.DIM, bg=self.BG)
@@ -641,7 +610,7 @@ class App:
         self.koch_btn.pack(side=tk.LEFT, padx=5)
         tk.Button(btns, text="🔄 Rejouer", font=('Arial', 11), 
                  fg='white', bg=self.ORANGE, relief=tk.FLAT, padx=20, pady=8,
-                 command=lambda: self.play(self.koch_char) if self.koch_char else None).pack(side=tk.LEFT, padx=5)
+                 command=lambda: self.replay(self.koch_char)).pack(side=tk.LEFT, padx=5)
         self.koch_stop_btn = tk.Button(btns, text="⏹ Stop", font=('Arial', 11), 
                                       fg='white', bg=self.RED, relief=tk.FLAT, padx=20, pady=8,
                                       command=self.koch_stop, state=tk.DISABLED)
@@ -696,6 +665,13 @@ class App:
         gpct = (total_ok / total_all * 100) if total_all > 0 else 0
         tk.Label(right, text=f"Global: {total_ok}/{total_all} ({gpct:.0f}%)", 
                 font=('Consolas', 10, 'bold'), fg=self.CYAN, bg=self.BG2).pack()
+        
+        # Confusions les plus fréquentes (envoyé → saisi)
+        tk.Label(right, text="🔀 Confusions", font=('Arial', 10, 'bold'), fg=self.TEXT, bg=self.BG2).pack(pady=(10, 2))
+        top = self.confusion.top(5)
+        text = '\n'.join(f"{sent} → {received}  {n} ({rate:.0%})" for sent, received, n, rate in top)
+        tk.Label(right, text=text or "-", font=('Consolas', 9), fg=self.ORANGE, bg=self.BG2,
+                justify=tk.LEFT).pack(pady=(0, 10))
     
     def koch_start(self):
         dur = self.koch_dur_combo.get()
@@ -711,10 +687,12 @@ class App:
     
     def koch_stop(self):
         self.koch_running = False
+        self.player.cancel()
         self.koch_btn.config(state=tk.NORMAL, text="▶ Démarrer")
         self.koch_stop_btn.config(state=tk.DISABLED)
         if self.koch_total > 0:
             self.add_session(self.koch_correct, self.koch_total)
+        self.flush_logs()
         self.koch_feedback.config(text="Entraînement terminé", fg=self.ORANGE)
     
     def update_koch_timer(self):
@@ -739,15 +717,34 @@ class App:
         elif self.koch_char:
             ans = self.koch_entry.get().strip().upper()
             if ans:
+                answered = time.monotonic()
                 self.koch_check()
-                self.root.after(600, self.koch_next)
+                self.koch_next(answered)
             else:
                 self.koch_next()
     
-    def koch_next(self):
+    def koch_next(self, answered=None):
+        """Élément suivant ; après une réponse (answered), il part aussitôt et le verdict reste affiché"""
         if not self.koch_running: return
+        self.koch_char = self.next_item('koch', self.koch_choose, self.koch_valid, str)
+        self.koch_entry.delete(0, tk.END)
+        if answered is None:
+            self.koch_display.config(text="?", fg=self.ORANGE, font=('Consolas', 64, 'bold'))
+            self.koch_feedback.config(text="Écoutez...", fg=self.DIM)
+        self.play(self.koch_char, answered)
+        self.koch_entry.focus()
+    
+    def koch_choose(self):
         chars = self.get_practice_chars()
         
+        # Mots formés uniquement des caractères pratiqués
+        # (caractères seuls tant que l'index, chargé en fond, n'est pas prêt)
+        if self.koch_words_var.get():
+            index = self.get_word_index()
+            word = index.draw(chars, self.session.random) if index is not None else None
+            if word:
+                return word
+        
         # Pondération du nouveau caractère uniquement en mode Koch
         if self.koch_mode_var.get() == "koch" and self.koch_level > 2:
             new = KOCH_ORDER[self.koch_level - 1]
@@ -755,12 +752,30 @@ class App:
         else:
             pool = chars
         
-        self.koch_char = random.choice(pool)
-        self.koch_entry.delete(0, tk.END)
-        self.koch_display.config(text="?", fg=self.ORANGE)
-        self.koch_feedback.config(text="Écoutez...", fg=self.DIM)
-        self.play(self.koch_char)
-        self.koch_entry.focus()
+        return self.session.random.choice(pool)
+    
+    def koch_valid(self, item):
+        """Élément tiré à l'avance encore conforme au jeu de caractères et au mode mots
+
+        En mode mots, un caractère seul reste valable : c'est le repli de koch_choose
+        (index pas encore chargé, ou aucun mot possible avec ces caractères).
+        """
+        chars = self.get_practice_chars()
+        return all(c in chars for c in item) and (len(item) == 1 or self.koch_words_var.get())
+    
+    def get_word_index(self):
+        """Index des mots, chargé en fond au premier appel ; None tant qu'il n'est pas prêt"""
+        if self.word_index is None and self.word_loader is None:
+            self.word_loader = threading.Thread(target=self.load_word_index, daemon=True)
+            self.word_loader.start()
+        return self.word_index
+    
+    def load_word_index(self):
+        # Première construction : plusieurs centaines de ms, hors du thread Tk
+        try:
+            self.word_index = WordIndex.load()
+        except Exception:
+            logging.getLogger(__name__).exception("Index des mots impossible à charger")
     
     def koch_check(self):
         if not self.koch_char: return
@@ -768,18 +783,25 @@ class App:
         if not ans: return
         
         self.koch_total += 1
-        if self.koch_char not in self.char_stats:
-            self.char_stats[self.koch_char] = [0, 0]
-        self.char_stats[self.koch_char][1] += 1
-        
+        # Statistiques par caractère (pour un mot : lettre par lettre, à sa position)
+        for i, c in enumerate(self.koch_char):
+            if c not in self.char_stats:
+                self.char_stats[c] = [0, 0]
+            self.char_stats[c][1] += 1
+            if ans[i:i + 1] == c:
+                self.char_stats[c][0] += 1
+        
+        self.log_event(ANSWER, self.koch_char, ans, ans == self.koch_char)
+        self.confusion.record_answer(self.koch_char, ans)
+        code = ' '.join(MORSE_CODE[c] for c in self.koch_char)
+        size = 64 if len(self.koch_char) == 1 else 36
         if ans == self.koch_char:
             self.koch_correct += 1
-            self.char_stats[self.koch_char][0] += 1
-            self.koch_display.config(text=self.koch_char, fg=self.GREEN)
-            self.koch_feedback.config(text=f"✓ {MORSE_CODE[self.koch_char]}", fg=self.GREEN)
+            self.koch_display.config(text=self.koch_char, fg=self.GREEN, font=('Consolas', size, 'bold'))
+            self.koch_feedback.config(text=f"✓ {code}", fg=self.GREEN)
         else:
-            self.koch_display.config(text=self.koch_char, fg=self.RED)
-            self.koch_feedback.config(text=f"✗ C'était {self.koch_char} ({MORSE_CODE[self.koch_char]})", fg=self.RED)
+            self.koch_display.config(text=self.koch_char, fg=self.RED, font=('Consolas', size, 'bold'))
+            self.koch_feedback.config(text=f"✗ C'était {self.koch_char} ({code})", fg=self.RED)
         
         pct = (self.koch_correct / self.koch_total * 100) if self.koch_total > 0 else 0
         self.koch_stats_lbl.config(text=f"{self.koch_correct}/{self.koch_total} ({pct:.0f}%)")
@@ -807,12 +829,19 @@ class App:
                 self.set_mode('koch')
     
     def update_koch_mode(self):
-        """Bascule entre mode Koch et personnalisé"""
-        if self.koch_mode_var.get() == "koch":
+        """Bascule entre mode Koch, confusions et personnalisé"""
+        if self.koch_words_var.get():
+            self.get_word_index()  # Chargement en fond dès la case cochée
+        self.schedule_warmup()
+        mode = self.koch_mode_var.get()
+        if mode != "custom":
             self.custom_frame.pack_forget()
             self.koch_chars_frame.pack(pady=5)
             if self.koch_new_lbl:
-                self.koch_new_lbl.pack(pady=5)
+                if mode == "koch":
+                    self.koch_new_lbl.pack(pady=5)
+                else:
+                    self.koch_new_lbl.pack_forget()
         else:
             self.koch_chars_frame.pack_forget()
             if self.koch_new_lbl:
@@ -825,6 +854,10 @@ class App:
             custom = self.custom_entry.get().upper()
             chars = [c for c in custom if c in MORSE_CODE]
             return chars if chars else ['K', 'M']
+        elif self.koch_mode_var.get() == "contrast":
+            # Paires les plus confondues parmi les caractères appris (H/5, B/6...)
+            learned = KOCH_ORDER[:self.koch_level]
+            return self.confusion.contrast(learned) or learned
         else:
             return KOCH_ORDER[:self.koch_level]
 
@@ -854,7 +887,7 @@ class App:
         punct_frame.pack(pady=5)
         tk.Label(punct_frame, text="Ponctuation:", font=('Arial', 9), fg=self.DIM, bg=self.BG2).pack(side=tk.LEFT, padx=5)
         
-        for char in ['.', ',', '?', '/', '=', '+', '-', '@']:
+        for char in PUNCTUATION:
             name, morse = SPECIAL_CHARS[char]
             btn = tk.Label(punct_frame, text=f" {char} ", font=('Consolas', 12, 'bold'), 
                           fg=self.CYAN, bg=self.BG3, cursor='hand2')
@@ -866,7 +899,7 @@ class App:
         pro_frame.pack(pady=5)
         tk.Label(pro_frame, text="Prosigns:", font=('Arial', 9), fg=self.DIM, bg=self.BG2).pack(side=tk.LEFT, padx=5)
         
-        for char in ['AR', 'SK', 'BT', 'KN', 'AS', 'HH', 'SOS']:
+        for char in PROSIGNS:
             name, morse = SPECIAL_CHARS[char]
             btn = tk.Label(pro_frame, text=f" {char} ", font=('Consolas', 12, 'bold'), 
                           fg=self.ORANGE, bg=self.BG3, cursor='hand2')
@@ -883,6 +916,7 @@ class App:
         ], state='readonly', width=15)
         self.special_combo.set("Tous")
         self.special_combo.pack(side=tk.LEFT, padx=10)
+        self.special_combo.bind('<<ComboboxSelected>>', lambda e: self.schedule_warmup())
         
         tk.Label(select_frame, text="Durée :", font=('Arial', 10), fg=self.TEXT, bg=self.BG).pack(side=tk.LEFT, padx=(20,0))
         self.special_dur_combo = ttk.Combobox(select_frame, values=["2", "5", "10", "15", "∞"], width=5, state='readonly')
@@ -910,6 +944,7 @@ class App:
                                      bg=self.BG3, fg=self.GREEN, insertbackground=self.GREEN)
         self.special_entry.pack(pady=10)
         self.special_entry.bind('<Return>', lambda e: self.special_enter())
+        self.special_entry.bind('<Key>', self.log_key)
         
         # Feedback
         self.special_feedback = tk.Label(main, text="Appuyez sur Démarrer", font=('Arial', 11), fg=self.DIM, bg=self.BG)
@@ -924,7 +959,7 @@ class App:
         self.special_btn.pack(side=tk.LEFT, padx=5)
         tk.Button(btns, text="🔄 Rejouer", font=('Arial', 11), 
                  fg='white', bg=self.ORANGE, relief=tk.FLAT, padx=20, pady=8,
-                 command=lambda: self.play_special(self.special_char) if self.special_char else None).pack(side=tk.LEFT, padx=5)
+                 command=lambda: self.replay(self.special_text(self.special_char))).pack(side=tk.LEFT, padx=5)
         self.special_stop_btn = tk.Button(btns, text="⏹ Stop", font=('Arial', 11), 
                                          fg='white', bg=self.RED, relief=tk.FLAT, padx=20, pady=8,
                                          command=self.special_stop, state=tk.DISABLED)
@@ -933,50 +968,19 @@ class App:
     def play_special(self, char):
         """Joue un caractère spécial"""
         if char in SPECIAL_CHARS:
-            name, morse = SPECIAL_CHARS[char]
-            # Jouer le morse directement
-            threading.Thread(target=lambda: self.play_morse_direct(morse), daemon=True).start()
+            self.play(self.special_text(char))
     
-    def play_morse_direct(self, morse):
-        """Joue directement un code morse"""
-        dot = 1200 / self.audio.wpm
-        for sym in morse:
-            if sym == '.':
-                dur = dot
-            elif sym == '-':
-                dur = dot * 3
-            else:
-                continue
-            n = int(44100 * dur / 1000)
-            t = np.linspace(0, dur/1000, n, False)
-            wave = np.sin(2 * np.pi * self.audio.frequency * t)
-            att = min(int(0.005 * 44100), n//2)
-            envelope = np.ones(n)
-            envelope[:att] = np.linspace(0, 1, att)
-            envelope[-att:] = np.linspace(1, 0, att)
-            wave = wave * envelope * self.audio.volume
-            
-            # Ajouter le bruit QRM
-            if self.audio.qrm > 0:
-                noise = self.audio.generate_noise(n)
-                wave = wave + noise
-                max_val = np.max(np.abs(wave))
-                if max_val > 1:
-                    wave = wave / max_val
-            
-            wave = (wave * 32767).astype(np.int16)
-            sound = pygame.sndarray.make_sound(np.column_stack((wave, wave)))
-            sound.play()
-            time.sleep(dur / 1000)
-            time.sleep(dot / 1000)
+    def special_text(self, char):
+        """Texte à émettre : les prosigns s'écrivent entre chevrons (<AR>)"""
+        return char if len(char) <= 1 else f"<{char}>"
     
     def get_special_chars(self):
         """Retourne les caractères spéciaux selon la sélection"""
         mode = self.special_combo.get()
         if mode == "Ponctuation":
-            return ['.', ',', '?', '/', '=', '+', '-', '@']
+            return list(PUNCTUATION)
         elif mode == "Prosigns":
-            return ['AR', 'SK', 'BT', 'KN', 'AS', 'HH', 'SOS']
+            return list(PROSIGNS)
         else:
             return list(SPECIAL_CHARS.keys())
     
@@ -994,8 +998,10 @@ class App:
     
     def special_stop(self):
         self.special_running = False
+        self.player.cancel()
         self.special_btn.config(state=tk.NORMAL)
         self.special_stop_btn.config(state=tk.DISABLED)
+        self.flush_logs()
         self.special_feedback.config(text="Entraînement terminé", fg=self.ORANGE)
     
     def update_special_timer(self):
@@ -1026,8 +1032,9 @@ class App:
     
     def special_next(self):
         if not self.special_running: return
-        chars = self.get_special_chars()
-        self.special_char = random.choice(chars)
+        self.special_char = self.next_item(
+            'special', lambda: self.session.random.choice(self.get_special_chars()),
+            lambda c: c in self.get_special_chars(), self.special_text)
         self.special_entry.delete(0, tk.END)
         self.special_display.config(text="?", fg=self.GREEN)
         self.special_name_lbl.config(text="")
@@ -1042,6 +1049,8 @@ class App:
         
         self.special_total += 1
         name, morse = SPECIAL_CHARS[self.special_char]
+        self.log_event(ANSWER, self.special_char, ans, ans == self.special_char)
+        self.confusion.record_answer(self.special_char, ans, whole=True)
         
         if ans == self.special_char:
             self.special_correct += 1
@@ -1104,6 +1113,7 @@ class App:
                                   bg=self.BG3, fg=self.PURPLE, insertbackground=self.PURPLE)
         self.call_entry.pack(pady=10)
         self.call_entry.bind('<Return>', lambda e: self.call_enter())
+        self.call_entry.bind('<Key>', self.log_key)
         
         # Feedback
         self.call_feedback = tk.Label(main, text="Appuyez sur Démarrer", font=('Arial', 11), fg=self.DIM, bg=self.BG)
@@ -1118,7 +1128,10 @@ class App:
         self.call_btn.pack(side=tk.LEFT, padx=5)
         tk.Button(btns, text="🔄 Rejouer", font=('Arial', 11), 
                  fg='white', bg=self.ORANGE, relief=tk.FLAT, padx=20, pady=8,
-                 command=lambda: self.play(self.call_current) if self.call_current else None).pack(side=tk.LEFT, padx=5)
+                 command=lambda: self.replay(self.call_current)).pack(side=tk.LEFT, padx=5)
+        tk.Button(btns, text="🔂 Dernière lettre", font=('Arial', 11), 
+                 fg='white', bg=self.BG3, relief=tk.FLAT, padx=12, pady=8,
+                 command=lambda: self.replay(self.call_current, 'char')).pack(side=tk.LEFT, padx=5)
         self.call_stop_btn = tk.Button(btns, text="⏹ Stop", font=('Arial', 11), 
                                       fg='white', bg=self.RED, relief=tk.FLAT, padx=20, pady=8,
                                       command=self.call_stop, state=tk.DISABLED)
@@ -1138,8 +1151,10 @@ class App:
     
     def call_stop(self):
         self.call_running = False
+        self.player.cancel()
         self.call_btn.config(state=tk.NORMAL)
         self.call_stop_btn.config(state=tk.DISABLED)
+        self.flush_logs()
         self.call_feedback.config(text="Entraînement terminé", fg=self.ORANGE)
     
     def update_call_timer(self):
@@ -1163,21 +1178,26 @@ class App:
         elif self.call_current:
             ans = self.call_entry.get().strip().upper()
             if ans:
+                answered = time.monotonic()
                 self.call_check()
-                self.root.after(600, self.call_next)
+                self.call_next(answered)
             else:
                 self.call_next()
     
-    def call_next(self):
+    def call_next(self, answered=None):
+        """Indicatif suivant ; après une réponse (answered), il part aussitôt et le verdict reste affiché"""
         if not self.call_running: return
         pays = self.pays_combo.get()
         pays = None if pays == "Tous" else pays
-        self.call_current, self.call_country = generate_callsign(pays)
+        self.call_current, self.call_country = self.next_item(
+            'call', lambda: generate_callsign(pays, self.session.random),
+            lambda call: pays is None or call[1] == pays, lambda call: call[0])
         self.call_entry.delete(0, tk.END)
-        self.call_display.config(text="?", fg=self.PURPLE)
-        self.call_country_lbl.config(text="")
-        self.call_feedback.config(text="Écoutez...", fg=self.DIM)
-        self.play(self.call_current)
+        if answered is None:
+            self.call_display.config(text="?", fg=self.PURPLE)
+            self.call_country_lbl.config(text="")
+            self.call_feedback.config(text="Écoutez...", fg=self.DIM)
+        self.play(self.call_current, answered)
         self.call_entry.focus()
     
     def call_check(self):
@@ -1186,6 +1206,7 @@ class App:
         if not ans: return
         
         self.call_total += 1
+        self.log_event(ANSWER, self.call_current, ans, ans == self.call_current)
         if ans == self.call_current:
             self.call_correct += 1
             self.call_feedback.config(text="✓ Correct !", fg=self.GREEN)
@@ -1238,6 +1259,7 @@ class App:
                                      bg=self.BG3, fg=self.ORANGE, insertbackground=self.ORANGE)
         self.contest_entry.pack(pady=10)
         self.contest_entry.bind('<Return>', lambda e: self.contest_check() if self.contest_on else self.contest_start())
+        self.contest_entry.bind('<Key>', self.log_key)
         
         # Feedback
         self.contest_feedback = tk.Label(main, text="", font=('Arial', 11), bg=self.BG)
@@ -1252,7 +1274,10 @@ class App:
         self.contest_btn.pack(side=tk.LEFT, padx=5)
         tk.Button(btns, text="🔄 Rejouer", font=('Arial', 11), 
                  fg='white', bg=self.ORANGE, relief=tk.FLAT, padx=20, pady=8,
-                 command=lambda: self.play(self.contest_call) if self.contest_call else None).pack(side=tk.LEFT, padx=5)
+                 command=lambda: self.replay(self.contest_call)).pack(side=tk.LEFT, padx=5)
+        tk.Button(btns, text="🔂 Dernière lettre", font=('Arial', 11), 
+                 fg='white', bg=self.BG3, relief=tk.FLAT, padx=12, pady=8,
+                 command=lambda: self.replay(self.contest_call, 'char')).pack(side=tk.LEFT, padx=5)
     
     def contest_start(self):
         self.contest_duration = int(self.contest_dur_combo.get())
@@ -1276,7 +1301,9 @@ class App:
     
     def contest_next(self):
         if not self.contest_on: return
-        self.contest_call, self.contest_country = generate_callsign()
+        self.contest_call, self.contest_country = self.next_item(
+            'contest', lambda: generate_callsign(rng=self.session.random),
+            lambda call: True, lambda call: call[0])
         self.contest_entry.delete(0, tk.END)
         self.contest_display.config(text="?", fg=self.ORANGE)
         self.contest_country_lbl.config(text="")
@@ -1289,6 +1316,7 @@ class App:
         ans = self.contest_entry.get().strip().upper()
         if not ans: return
         
+        self.log_event(ANSWER, self.contest_call, ans, ans == self.contest_call)
         if ans == self.contest_call:
             self.contest_qsos += 1
             self.contest_feedback.config(text="✓ QSO !", fg=self.GREEN)
@@ -1302,12 +1330,138 @@ class App:
     
     def contest_end(self):
         self.contest_on = False
+        self.player.cancel()
+        self.flush_logs()
         self.contest_display.config(text="Terminé !", fg=self.GREEN)
         self.contest_feedback.config(text=f"Score final : {self.contest_qsos} QSOs", fg=self.ORANGE)
         self.contest_timer_lbl.config(text="⏱ 0:00")
         self.contest_btn.config(state=tk.NORMAL)
 
+    # ════════════════════════════════════════════════════════════════
+    # STATISTIQUES
+    # ════════════════════════════════════════════════════════════════
+    
+    def show_stats(self):
+        start = time.perf_counter()
+        self.flush_logs()
+        try:
+            # Cumuls par jour gardés en cache : seuls les nouveaux événements sont agrégés
+            self.progress = Progress.open(EVENTS_FILE, os.path.join(cache_home(), "stats.npz"))
+        except (OSError, ValueError):
+            self.progress = Progress()
+        
+        main = tk.Frame(self.content, bg=self.BG)
+        main.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        tk.Label(main, text="📈 Statistiques", font=('Arial', 14, 'bold'), 
+                fg=self.TEXT, bg=self.BG).pack(pady=(0,10))
+        
+        # Caractère et période
+        opts = tk.Frame(main, bg=self.BG)
+        opts.pack(pady=5)
+        answers, accuracy = self.progress.totals()
+        symbols = [s for s, n in zip(STATS_SYMBOLS, answers) if n]
+        tk.Label(opts, text="Caractère :", font=('Arial', 10), fg=self.TEXT, bg=self.BG).pack(side=tk.LEFT)
+        self.stats_combo = ttk.Combobox(opts, values=["Tous"] + symbols, width=6, state='readonly')
+        self.stats_combo.set("Tous")
+        self.stats_combo.pack(side=tk.LEFT, padx=5)
+        self.stats_combo.bind('<<ComboboxSelected>>', lambda e: self.draw_stats())
+        self.stats_bucket_var = tk.StringVar(value="day")
+        for text, value in (("Par jour", "day"), ("Par semaine", "week")):
+            tk.Radiobutton(opts, text=text, variable=self.stats_bucket_var, value=value,
+                          font=('Arial', 10), fg=self.TEXT, bg=self.BG, selectcolor=self.BG3,
+                          activebackground=self.BG, command=self.draw_stats).pack(side=tk.LEFT, padx=10)
+        
+        total = int(answers[-1])
+        summary = f"{total} réponses, {accuracy[-1]:.0%} de réussite" if total else "Aucune réponse enregistrée"
+        self.stats_summary_lbl = tk.Label(main, text=summary, font=('Arial', 10), fg=self.DIM, bg=self.BG)
+        self.stats_summary_lbl.pack(pady=5)
+        
+        # Graphiques : précision, vitesse, latence
+        self.stats_canvas = tk.Canvas(main, bg=self.BG2, highlightthickness=0, width=760, height=480)
+        self.stats_canvas.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.stats_canvas.bind('<Configure>', lambda e: self.draw_stats())
+        self.draw_stats()
+        logging.getLogger(__name__).info("Statistiques affichées en %.1f ms",
+                                         (time.perf_counter() - start) * 1000)
+    
+    def draw_stats(self):
+        """Trace les séries réduites à la largeur du canevas (une valeur par colonne de pixels)"""
+        canvas = self.stats_canvas
+        canvas.delete('all')
+        # Taille demandée tant que le canevas n'est pas affiché
+        width = canvas.winfo_width() if canvas.winfo_ismapped() else int(canvas['width'])
+        height = canvas.winfo_height() if canvas.winfo_ismapped() else int(canvas['height'])
+        symbol = self.stats_combo.get()
+        days, _, accuracy, speed, latency = self.progress.series(
+            None if symbol == "Tous" else symbol, self.stats_bucket_var.get())
+        
+        left, right = 50, width - 15
+        plot_w = max(right - left, 10)
+        charts = [("Précision (%)", accuracy * 100, self.GREEN, 0, 100),
+                  ("Vitesse (WPM)", speed, self.CYAN, None, None),
+                  ("Latence (s)", latency, self.ORANGE, 0, None)]
+        band = height / len(charts)
+        for i, (title, values, color, vmin, vmax) in enumerate(charts):
+            top, bottom = i * band + 25, (i + 1) * band - 20
+            canvas.create_text(left, top - 12, text=title, anchor='w', fill=self.TEXT, font=('Arial', 9, 'bold'))
+            canvas.create_rectangle(left, top, right, bottom, outline=self.BG3)
+            index, mean, low, high = downsample(values, plot_w)
+            present = ~np.isnan(mean)
+            if not present.any():
+                canvas.create_text((left + right) / 2, (top + bottom) / 2, text="Aucune donnée",
+                                  fill=self.DIM, font=('Arial', 9))
+                continue
+            vmin = np.nanmin(low) if vmin is None else vmin
+            vmax = np.nanmax(high) if vmax is None else vmax
+            vmax = vmax if vmax > vmin else vmin + 1
+            x = left + index * plot_w / len(values)
+            scale = (bottom - top) / (vmax - vmin)
+            # Minimum et maximum de chaque colonne, puis la moyenne par-dessus
+            for series, fill, thickness in ((low, self.BG3, 1), (high, self.BG3, 1), (mean, color, 2)):
+                keep = ~np.isnan(series)
+                points = np.column_stack((x[keep], bottom - (series[keep] - vmin) * scale))
+                if len(points) > 1:
+                    canvas.create_line(*points.ravel().tolist(), fill=fill, width=thickness)
+                elif len(points):
+                    px, py = points[0]
+                    canvas.create_oval(px - 2, py - 2, px + 2, py + 2, fill=fill, outline=fill)
+            canvas.create_text(left - 5, top, text=f"{vmax:.0f}" if vmax >= 10 else f"{vmax:.1f}",
+                              anchor='e', fill=self.DIM, font=('Arial', 8))
+            canvas.create_text(left - 5, bottom, text=f"{vmin:.0f}" if vmax >= 10 else f"{vmin:.1f}",
+                              anchor='e', fill=self.DIM, font=('Arial', 8))
+        
+        # Dates de début et de fin
+        if len(days):
+            first, last = (datetime(1970, 1, 1) + timedelta(days=int(d)) for d in (days[0], days[-1]))
+            canvas.create_text(left, height - 8, text=first.strftime("%d/%m/%Y"), anchor='w',
+                              fill=self.DIM, font=('Arial', 8))
+            canvas.create_text(right, height - 8, text=last.strftime("%d/%m/%Y"), anchor='e',
+                              fill=self.DIM, font=('Arial', 8))
+
 if __name__ == "__main__":
+    if '--verbose' in sys.argv:
+        # Journal des latences de lecture (réponse ou soumission -> première tonalité)
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    if '--selftest' in sys.argv:
+        # Contrôle de non-régression : MorseAudio -> décodeur audio, puis flux aplay (lecteur factice)
+        from cw_core.decoder import selftest
+        ok = selftest(MorseAudio())
+        if os.name == 'posix':
+            from cw_core.backends import pipe_check
+            for label, elapsed, passed in pipe_check():
+                print(f"{'OK ' if passed else 'ERR'} PipeBackend {label:<18} {elapsed:.3f} s")
+                ok = ok and passed
+        sys.exit(0 if ok else 1)
+    seed = None
+    if '--seed' in sys.argv:
+        # Rejoue une session : mêmes tirages et même audio, à réglages identiques
+        seed = int(sys.argv[sys.argv.index('--seed') + 1])
     root = tk.Tk()
-    App(root)
+    app = App(root, seed)
     root.mainloop()
+    app.confusion.save(CONFUSION_FILE)
+    if app.events is not None:
+        app.events.close()
+    if app.audio.cache is not None:
+        logging.getLogger(__name__).info("Cache de rendu : %s", app.audio.cache.stats())
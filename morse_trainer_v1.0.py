@@ -12,38 +12,10 @@ from tkinter import font as tkfont
 import random
 import threading
 import time
-import wave
-import struct
-import tempfile
-import os
-import math
 
-try:
-    import numpy as np
-    NUMPY_AVAILABLE = True
-except ImportError:
-    NUMPY_AVAILABLE = False
-
-try:
-    import pygame
-    pygame.mixer.init(frequency=44100, size=-16, channels=1, buffer=512)
-    AUDIO_METHOD = "pygame"
-except:
-    AUDIO_METHOD = None
-
-if AUDIO_METHOD is None:
-    try:
-        import winsound
-        AUDIO_METHOD = "winsound"
-    except:
-        pass
-
-if AUDIO_METHOD is None:
-    import platform
-    if platform.system() == "Linux":
-        AUDIO_METHOD = "aplay"
-    elif platform.system() == "Darwin":
-        AUDIO_METHOD = "afplay"
+from cw_core import MORSE_CODE, REVERSE_MORSE
+from cw_core.player import AudioPlayer
+from cw_core.decoder import AdaptiveDecoder
 
 
 # === COULEURS THEME PRO ===
@@ -72,20 +44,6 @@ class Theme:
     ACCENT_LIGHT = "#e8e8e8"
 
 
-# === CODE MORSE ===
-MORSE_CODE = {
-    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
-    'G': '--.', 'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..',
-    'M': '--', 'N': '-.', 'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.',
-    'S': '...', 'T': '-', 'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-',
-    'Y': '-.--', 'Z': '--..', '0': '-----', '1': '.----', '2': '..---',
-    '3': '...--', '4': '....-', '5': '.....', '6': '-....', '7': '--...',
-    '8': '---..', '9': '----.'
-}
-
-# Dictionnaire inversé pour décoder
-REVERSE_MORSE = {v: k for k, v in MORSE_CODE.items()}
-
 LESSONS = [
     ("Niveau 1", ['E', 'T'], "Fondamentaux", "01"),
     ("Niveau 2", ['A', 'N'], "Point-Trait", "02"),
@@ -100,125 +58,6 @@ LESSONS = [
 ]
 
 
-class AudioPlayer:
-    """Générateur audio"""
-    
-    def __init__(self, frequency=600, wpm=15):
-        self.frequency = frequency
-        self.wpm = wpm
-        self.sample_rate = 44100
-        self.is_playing = False
-        self.temp_files = []
-    
-    def set_wpm(self, wpm):
-        self.wpm = wpm
-    
-    def set_frequency(self, freq):
-        self.frequency = freq
-    
-    def generate_wav_data(self, duration):
-        if NUMPY_AVAILABLE:
-            num_samples = int(self.sample_rate * duration)
-            t = np.linspace(0, duration, num_samples, False)
-            tone = np.sin(2 * np.pi * self.frequency * t)
-            attack = int(0.008 * self.sample_rate)
-            release = int(0.008 * self.sample_rate)
-            envelope = np.ones(num_samples)
-            if attack > 0:
-                envelope[:attack] = np.linspace(0, 1, attack)
-            if release > 0:
-                envelope[-release:] = np.linspace(1, 0, release)
-            audio = (tone * envelope * 0.5 * 32767).astype(np.int16)
-            return audio.tobytes()
-        else:
-            num_samples = int(self.sample_rate * duration)
-            data = []
-            for i in range(num_samples):
-                t = i / self.sample_rate
-                env = 1.0
-                attack_samples = int(0.008 * self.sample_rate)
-                release_samples = int(0.008 * self.sample_rate)
-                if i < attack_samples:
-                    env = i / attack_samples
-                elif i > num_samples - release_samples:
-                    env = (num_samples - i) / release_samples
-                sample = int(32767 * 0.5 * env * math.sin(2 * math.pi * self.frequency * t))
-                data.append(struct.pack('<h', sample))
-            return b''.join(data)
-    
-    def create_wav_file(self, duration):
-        data = self.generate_wav_data(duration)
-        fd, filepath = tempfile.mkstemp(suffix='.wav')
-        os.close(fd)
-        self.temp_files.append(filepath)
-        with wave.open(filepath, 'wb') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(self.sample_rate)
-            wav_file.writeframes(data)
-        return filepath
-    
-    def play_tone(self, duration):
-        if AUDIO_METHOD == "pygame":
-            wav_path = self.create_wav_file(duration)
-            sound = pygame.mixer.Sound(wav_path)
-            sound.play()
-            time.sleep(duration)
-        elif AUDIO_METHOD == "winsound":
-            wav_path = self.create_wav_file(duration)
-            import winsound
-            winsound.PlaySound(wav_path, winsound.SND_FILENAME)
-        elif AUDIO_METHOD in ["aplay", "afplay"]:
-            wav_path = self.create_wav_file(duration)
-            os.system(f"{AUDIO_METHOD} {wav_path} 2>/dev/null")
-        else:
-            time.sleep(duration)
-    
-    def play_morse(self, text, callback=None):
-        self.is_playing = True
-        
-        def _play():
-            dot_duration = 1.2 / self.wpm
-            dash_duration = dot_duration * 3
-            symbol_gap = dot_duration
-            char_gap = dot_duration * 3
-            
-            for char in text.upper():
-                if not self.is_playing:
-                    break
-                morse = MORSE_CODE.get(char, '')
-                if not morse:
-                    continue
-                for i, symbol in enumerate(morse):
-                    if not self.is_playing:
-                        break
-                    if symbol == '.':
-                        self.play_tone(dot_duration)
-                    elif symbol == '-':
-                        self.play_tone(dash_duration)
-                    if i < len(morse) - 1:
-                        time.sleep(symbol_gap)
-                time.sleep(char_gap)
-            
-            self.is_playing = False
-            self.cleanup()
-            if callback:
-                callback()
-        
-        threading.Thread(target=_play, daemon=True).start()
-    
-    def stop(self):
-        self.is_playing = False
-    
-    def cleanup(self):
-        for f in self.temp_files:
-            try:
-                os.remove(f)
-            except:
-                pass
-        self.temp_files = []
-
-
 class RoundedButton(tk.Canvas):
     """Bouton avec coins arrondis"""
     
@@ -496,8 +335,8 @@ class MorseTrainer:
         ).pack(pady=(5, 0))
         
         # Status audio
-        status_color = Theme.SUCCESS if AUDIO_METHOD else Theme.ERROR
-        status_text = "● Audio Ready" if AUDIO_METHOD else "○ Audio Unavailable"
+        status_color = Theme.SUCCESS if self.audio.backend.name else Theme.ERROR
+        status_text = "● Audio Ready" if self.audio.backend.name else "○ Audio Unavailable"
         tk.Label(
             header, text=status_text,
             font=('Segoe UI', 9),
@@ -773,11 +612,8 @@ class MorseTrainer:
         self.char_timeout_id = None
         self.word_timeout_id = None
         
-        # Timing basé sur WPM
-        dot_duration = 1.2 / self.wpm.get()
-        self.dot_threshold = dot_duration * 2  # Seuil point/trait
-        self.char_gap = dot_duration * 3       # Pause entre caractères
-        self.word_gap = dot_duration * 7       # Pause entre mots
+        # Timing adaptatif, initialisé depuis le réglage WPM
+        self.decoder = AdaptiveDecoder(self.wpm.get())
         
         # Header
         header = tk.Frame(self.main_frame, bg=Theme.BG_DARK)
@@ -884,13 +720,14 @@ class MorseTrainer:
             fg_color=Theme.ERROR, hover_color=Theme.BG_CARD_HOVER
         ).pack(side=tk.LEFT, padx=5)
         
-        # Info WPM
-        tk.Label(
-            main_zone,
-            text=f"Vitesse: {self.wpm.get()} WPM | Seuil point/trait: {self.dot_threshold*1000:.0f}ms",
+        # Info WPM (estimée en direct)
+        self.keyer_info = tk.Label(
+            main_zone, text="",
             font=('Segoe UI', 9),
             bg=Theme.BG_DARK, fg=Theme.TEXT_MUTED
-        ).pack(pady=10)
+        )
+        self.keyer_info.pack(pady=10)
+        self._update_keyer_info()
         
         # Bind des touches
         self.root.bind('<KeyPress-space>', self._on_key_press)
@@ -955,6 +792,10 @@ class MorseTrainer:
         self.is_key_pressed = True
         self.key_press_time = time.time()
         
+        # Apprendre la durée du silence qui précède
+        if self.key_release_time:
+            self.decoder.add_space(self.key_press_time - self.key_release_time)
+        
         # Annuler les timeouts en cours
         if self.char_timeout_id:
             self.root.after_cancel(self.char_timeout_id)
@@ -984,14 +825,12 @@ class MorseTrainer:
         duration = self.key_release_time - self.key_press_time
         
         # Déterminer point ou trait
-        if duration < self.dot_threshold:
-            self.current_morse += "."
-        else:
-            self.current_morse += "-"
+        self.current_morse += self.decoder.add_mark(duration)
         
         # Affichage visuel
         self._draw_keyer_indicator(False)
         self.morse_display.config(text=self.current_morse)
+        self._update_keyer_info()
         
         # Prévisualiser le caractère
         if self.current_morse in REVERSE_MORSE:
@@ -1004,72 +843,28 @@ class MorseTrainer:
         
         # Programmer la validation du caractère après une pause
         self.char_timeout_id = self.root.after(
-            int(self.char_gap * 1000),
+            int(self.decoder.char_gap * 1000),
             self._validate_char
         )
     
+    def _update_keyer_info(self):
+        """Affiche la vitesse estimée et le seuil courant"""
+        self.keyer_info.config(
+            text=f"Vitesse estimée: {self.decoder.wpm:.0f} WPM | "
+                 f"Seuil point/trait: {self.decoder.dot_threshold*1000:.0f}ms"
+        )
+    
     def _start_tone(self):
         """Démarre la tonalité en continu"""
         self.tone_playing = True
+        self.audio.backend.reset()
         
         def _play_continuous():
-            sample_rate = 44100
-            
             while self.tone_playing:
                 # Générer un petit segment de son
                 duration = 0.1  # 100ms segments
-                
-                if NUMPY_AVAILABLE:
-                    num_samples = int(sample_rate * duration)
-                    t = np.linspace(0, duration, num_samples, False)
-                    tone = np.sin(2 * np.pi * self.frequency.get() * t)
-                    
-                    # Envelope douce
-                    envelope = np.ones(num_samples)
-                    fade = int(0.005 * sample_rate)
-                    if fade > 0 and fade < num_samples // 2:
-                        envelope[:fade] = np.linspace(0, 1, fade)
-                        envelope[-fade:] = np.linspace(1, 0, fade)
-                    
-                    audio = (tone * envelope * 0.5 * 32767).astype(np.int16)
-                    audio_bytes = audio.tobytes()
-                else:
-                    # Sans numpy
-                    num_samples = int(sample_rate * duration)
-                    audio_bytes = b''
-                    for i in range(num_samples):
-                        t = i / sample_rate
-                        sample = int(32767 * 0.5 * math.sin(2 * math.pi * self.frequency.get() * t))
-                        audio_bytes += struct.pack('<h', sample)
-                
-                # Créer fichier temporaire
-                fd, filepath = tempfile.mkstemp(suffix='.wav')
-                os.close(fd)
-                
-                try:
-                    with wave.open(filepath, 'wb') as wav_file:
-                        wav_file.setnchannels(1)
-                        wav_file.setsampwidth(2)
-                        wav_file.setframerate(sample_rate)
-                        wav_file.writeframes(audio_bytes)
-                    
-                    if AUDIO_METHOD == "pygame":
-                        sound = pygame.mixer.Sound(filepath)
-                        sound.play()
-                        time.sleep(duration * 0.9)  # Légère superposition
-                    elif AUDIO_METHOD == "winsound":
-                        import winsound
-                        winsound.PlaySound(filepath, winsound.SND_FILENAME)
-                    elif AUDIO_METHOD in ["aplay", "afplay"]:
-                        os.system(f"{AUDIO_METHOD} {filepath} 2>/dev/null &")
-                        time.sleep(duration * 0.9)
-                    else:
-                        time.sleep(duration)
-                finally:
-                    try:
-                        os.remove(filepath)
-                    except:
-                        pass
+                audio_bytes = self.audio.generate_segment(duration, self.frequency.get())
+                self.audio.backend.play_segment(audio_bytes)
         
         # Lancer dans un thread séparé
         self.tone_thread = threading.Thread(target=_play_continuous, daemon=True)
@@ -1078,12 +873,7 @@ class MorseTrainer:
     def _stop_tone(self):
         """Arrête la tonalité"""
         self.tone_playing = False
-        
-        if AUDIO_METHOD == "pygame":
-            try:
-                pygame.mixer.stop()
-            except:
-                pass
+        self.audio.backend.stop()
     
     def _validate_char(self):
         """Valide le caractère morse actuel"""
@@ -1101,7 +891,7 @@ class MorseTrainer:
         
         # Programmer l'ajout d'espace après une pause plus longue
         self.word_timeout_id = self.root.after(
-            int(self.word_gap * 1000),
+            int((self.decoder.word_gap - self.decoder.char_gap) * 1000),
             self._add_space
         )
     
@@ -1389,7 +1179,7 @@ class MorseTrainer:
         letters_frame = tk.Frame(scroll_frame, bg=Theme.BG_DARK)
         letters_frame.pack(padx=20)
         
-        for i, char in enumerate(sorted([c for c in MORSE_CODE if c.isalpha()])):
+        for i, char in enumerate(sorted([c for c in MORSE_CODE if len(c) == 1 and c.isalpha()])):
             row, col = divmod(i, 7)
             
             card = tk.Frame(letters_frame, bg=Theme.BG_CARD, padx=12, pady=10)